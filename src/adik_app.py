@@ -6,9 +6,12 @@
     Author: Coolbrother
 """
 import os, sys
+import queue
+import threading
 from adik_sound import AdikSound
 from adik_wave_handler import AdikWaveHandler
 from adik_player import AdikPlayer
+from adik_callback_stats import AdikCallbackStats
 
 # --- fonctions de déboggage -- 
 def beep():
@@ -29,6 +32,10 @@ class AdikApp(object):
         self._ui_app = ui_app  if ui_app is not None else None
         self.player = None
         self.mixer = None
+        self._import_thread = None
+        self._import_cancel = threading.Event()
+        # Événements des threads de travail, traités dans le thread de l'interface (process_events)
+        self._ui_events = queue.Queue()
 
 
     #----------------------------------------
@@ -42,8 +49,8 @@ class AdikApp(object):
     
     #----------------------------------------
 
-    def init_app(self, sample_rate=44100, block_size=256, num_output_channels=2, num_input_channels=1):
-        self.player = AdikPlayer(sample_rate, block_size, num_output_channels, num_input_channels)
+    def init_app(self, sample_rate=44100, block_size=256, num_output_channels=2, num_input_channels=1, audio_driver=None):
+        self.player = AdikPlayer(sample_rate, block_size, num_output_channels, num_input_channels, audio_driver)
         self.mixer = self.player.mixer
         self.player._start_engine()
         self.display_message("AdikApp initialisée.")
@@ -267,11 +274,34 @@ class AdikApp(object):
         end_frame = self.player.get_right_locator()
         
         self.display_message("Mixage des pistes...")
-        self.player.bounce_to_track(start_frame=start_frame, end_frame=end_frame)
+        # Un long mixage est réparti sur tous les coeurs
+        self.player.bounce_to_track(start_frame=start_frame, end_frame=end_frame, num_processes=os.cpu_count() or 1)
         self.display_message("Mixage terminé. Une nouvelle piste a été créée.")
 
     #----------------------------------------
 
+    def undo(self):
+        """ Annule la dernière édition de piste. """
+        label = self.player.undo()
+        if label is None:
+            self.display_message("Rien à annuler.")
+            beep()
+        else:
+            self.display_message(f"Annulé: {label}")
+
+    #----------------------------------------
+
+    def redo(self):
+        """ Rétablit la dernière édition annulée. """
+        label = self.player.redo()
+        if label is None:
+            self.display_message("Rien à rétablir.")
+            beep()
+        else:
+            self.display_message(f"Rétabli: {label}")
+
+    #----------------------------------------
+
     def save_track(self):
         """ Sauvegarde dans un fichier Wav la piste sélectionnée en utilisant les locateurs. """
         if not self._check_locators_for_range(): return
@@ -294,7 +324,7 @@ class AdikApp(object):
         """ Arme/désarme la piste sélectionnée pour l'enregistrement. """
         selected_track = self.player.get_selected_track()
         if selected_track:
-            selected_track._armed = not selected_track._armed
+            selected_track.set_armed(not selected_track.is_armed())
             self.display_message(f"Piste '{selected_track.name}' Armée: {selected_track._armed}")
         else:
             self.display_message("Aucune piste sélectionnée.")
@@ -305,11 +335,11 @@ class AdikApp(object):
         """ Active/désactive le mode solo pour la piste sélectionnée. """
         selected_track = self.player.get_selected_track()
         if selected_track:
-            selected_track._solo = not selected_track._solo
-            if selected_track._solo:
+            selected_track.set_solo(not selected_track.is_solo())
+            if selected_track.is_solo():
                 for track in self.player.track_list:
-                    if track != selected_track and track._solo:
-                        track._solo = False
+                    if track != selected_track and track.is_solo():
+                        track.set_solo(False)
             self.display_message(f"Piste '{selected_track.name}' Solo: {selected_track._solo}")
         else:
             self.display_message("Aucune piste sélectionnée.")
@@ -320,7 +350,7 @@ class AdikApp(object):
         """ Mute/dé-mute la piste sélectionnée. """
         selected_track = self.player.get_selected_track()
         if selected_track:
-            selected_track._muted = not selected_track._muted
+            selected_track.set_muted(not selected_track.is_muted())
             self.display_message(f"Piste '{selected_track.name}' Muette: {selected_track._muted}")
         else:
             self.display_message("Aucune piste sélectionnée.")
@@ -407,6 +437,56 @@ class AdikApp(object):
 
     #----------------------------------------
 
+    def show_track_overview(self, width=60):
+        """
+        Affiche la forme d'onde de la piste sélectionnée sur toute la durée du projet,
+        en 'width' caractères, à partir de la pyramide de crêtes des sons de ses clips.
+        """
+        selected_track = self.player.get_selected_track()
+        if selected_track is None or not selected_track.clips:
+            self.display_message("Aucune piste sélectionnée, ou piste vide.")
+            return
+        self.player._update_total_duration_cache()
+        total_frames = max(self.player.total_duration_frames_cached, 1)
+        # Chaque clip est dessiné sur les colonnes qu'il couvre, à partir des crêtes de son son
+        overview = selected_track.get_overview(width, 0, total_frames)
+        self.display_message(f"{selected_track.name}: |{overview}|")
+
+    #----------------------------------------
+
+    #----------------------------------------
+    # Statistiques du moteur audio
+    #----------------------------------------
+
+    def get_callback_stats(self):
+        """
+        Retourne les statistiques de temps des callbacks audio:
+        temps par phase, charge par rapport au budget temps réel, xruns.
+        """
+        return self.player.get_callback_stats()
+
+    #----------------------------------------
+
+    def show_callback_stats(self):
+        """ Affiche un résumé des statistiques des callbacks audio. """
+        summary = self.get_callback_stats()
+        for line in AdikCallbackStats.format_summary(summary):
+            self.display_message(line)
+        prefetch_stats = self.player.get_prefetch_stats()
+        if prefetch_stats['streamed_sounds']:
+            self.display_message(f"Streaming: {prefetch_stats['streamed_sounds']} sons, "
+                                 f"Fenêtre: {prefetch_stats['window_seconds']:.1f}s, "
+                                 f"Underruns: {prefetch_stats['underruns']} ({prefetch_stats['underrun_frames']} frames)")
+
+    #----------------------------------------
+
+    def reset_callback_stats(self):
+        """ Remet à zéro les statistiques des callbacks audio. """
+        self.player.reset_callback_stats()
+        self.display_message("Statistiques du moteur audio remises à zéro.")
+
+    #----------------------------------------
+
     #----------------------------------------
     # Contrôles de mesure
     #----------------------------------------
@@ -547,6 +627,104 @@ class AdikApp(object):
 
 
     # --- Functions diverses ---
+    def import_sound(self, file_path, track=None):
+        """
+        Importe un fichier audio sur une piste (une nouvelle piste si 'track' est None),
+        sans bloquer l'interface: le fichier est décodé bloc par bloc (AdikWaveHandler.open_wav)
+        dans un thread, et cancel_import() interrompt le décodage.
+        Le thread ne touche ni à l'interface ni aux pistes: la progression (par tranche de 10%)
+        et l'installation du son passent par la file d'événements, traitée par process_events()
+        dans le thread de l'interface.
+        """
+        if self._import_thread is not None and self._import_thread.is_alive():
+            self.display_message("Un import est déjà en cours.")
+            beep()
+            return False
+        if not os.path.exists(file_path):
+            self.display_message(f"Fichier introuvable: {file_path}")
+            return False
+
+        self._import_cancel.clear()
+        self.display_message(f"Import de '{os.path.basename(file_path)}'...", on_status_bar=True)
+        self._import_thread = threading.Thread(target=self._import_runner, args=(file_path, track),
+                                               name="AdikImport", daemon=True)
+        self._import_thread.start()
+        return True
+
+    #----------------------------------------
+
+    def _import_runner(self, file_path, track):
+        """ Thread d'import: décode le fichier, et envoie la progression et le résultat au thread de l'interface. """
+        file_name = os.path.basename(file_path)
+        progress_step = [0] # Prochaine tranche de 10% à afficher
+
+        def on_progress(frames_read, num_frames):
+            percent = frames_read * 100 // num_frames if num_frames else 100
+            if percent >= progress_step[0]:
+                self._ui_events.put(('message', f"Import de '{file_name}': {percent}%"))
+                progress_step[0] = percent - percent % 10 + 10
+            return not self._import_cancel.is_set()
+
+        sound = AdikWaveHandler.open_wav(file_path, progress_callback=on_progress)
+        if sound is None:
+            if self._import_cancel.is_set():
+                self._ui_events.put(('message', f"Import de '{file_name}' annulé."))
+            else:
+                self._ui_events.put(('message', f"Impossible d'importer '{file_name}'."))
+            return
+        self._ui_events.put(('install', file_name, sound, track))
+
+    #----------------------------------------
+
+    def process_events(self):
+        """
+        Traite les événements envoyés par les threads de travail (messages, son importé à installer).
+        À appeler depuis le thread de l'interface (boucle de l'interface, ou après wait_import sans interface).
+        Retourne le nombre d'événements traités.
+        """
+        num_events = 0
+        while True:
+            try:
+                event = self._ui_events.get_nowait()
+            except queue.Empty:
+                return num_events
+            num_events += 1
+            if event[0] == 'message':
+                self.display_message(event[1], on_status_bar=True)
+            elif event[0] == 'install':
+                self._install_imported_sound(*event[1:])
+
+    #----------------------------------------
+
+    def _install_imported_sound(self, file_name, sound, track):
+        """ Installe un son importé sur sa piste (thread de l'interface). """
+        # La piste a pu être supprimée pendant l'import
+        if track is None or track not in self.player.track_list:
+            track = self.player.add_track(os.path.splitext(file_name)[0])
+        track.set_audio_sound(sound)
+        self.player._update_params()
+        self.display_message(f"Fichier '{file_name}' importé sur la piste '{track.name}'.", on_status_bar=True)
+
+    #----------------------------------------
+
+    def wait_import(self, timeout=None):
+        """ Attend la fin de l'import en cours puis traite ses événements (utilisation sans boucle d'interface). """
+        if self._import_thread is not None:
+            self._import_thread.join(timeout)
+        self.process_events()
+
+    #----------------------------------------
+
+    def cancel_import(self):
+        """ Annule l'import en cours. """
+        if self._import_thread is None or not self._import_thread.is_alive():
+            self.display_message("Aucun import en cours.")
+            return
+        self._import_cancel.set()
+        self.display_message("Annulation de l'import...")
+
+    #----------------------------------------
+
     def load_demo(self):
         """ Charger une nouvelle démonstration """
         sample_rate = 44100
@@ -582,15 +760,11 @@ class AdikApp(object):
         if not os.path.exists(file_name1):
             print(f"Erreur: le fichier ({file_name1}, n'existe pas")
             return
-        loaded_sound = AdikWaveHandler.load_wav(file_name1)
-        if loaded_sound:
-            track4.set_audio_sound(loaded_sound)
-            track4.volume = 0.2
-        else:
-            print(f"Erreur: Impossible de charger '{file_name1}' pour les pistes.")
-            return # Quitter si le son ne peut pas être chargé
-        
         self.player._update_params()
+        # Les fichiers longs sont lus en streaming depuis le disque, les autres chargés en arrière-plan
+        track4.volume = 0.2
+        self.import_sound(file_name1, track4)
+
     #----------------------------------------
 
  
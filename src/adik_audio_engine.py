@@ -8,8 +8,12 @@
 """
 import numpy as np
 import threading
+import time
 
-from sounddevice_audio_driver import SoundDeviceAudioDriver
+from adik_track import AdikTrack
+from adik_callback_stats import AdikCallbackStats
+from adik_command_queue import AdikCommandQueue
+from base_audio_driver import BaseAudioDriver
 def beep():
     print("\a")
 
@@ -22,11 +26,15 @@ class AdikAudioEngine:
     masquant les détails d'implémentation de l'API audio (comme sounddevice).
     Elle utilise un "pilote" pour communiquer avec le matériel audio.
     """
-    def __init__(self, player_instance, sample_rate=44100, block_size=1024, num_output_channels=2, num_input_channels=1):
+    AUDIO_DRIVER_NAMES = ("sounddevice", "null", "freerun", "wavfile")
+
+    def __init__(self, player_instance, sample_rate=44100, block_size=1024, num_output_channels=2, num_input_channels=1, audio_driver=None):
         """
         Initialise le moteur audio avec les paramètres de stream.
         Une référence à l'instance de la classe Player est nécessaire
         pour que les callbacks puissent accéder à ses données.
+        audio_driver est soit un nom de pilote (voir AUDIO_DRIVER_NAMES, "sounddevice" par défaut),
+        soit une instance de BaseAudioDriver déjà configurée.
         """
         self.sample_rate = sample_rate
         self.block_size = block_size
@@ -43,26 +51,73 @@ class AdikAudioEngine:
             self._metronome = None
             self._transport = None
             self._loop = None
-        self._lock = threading.Lock()
-
-        # L'instance du pilote audio, qui est responsable de la communication
-        # avec le matériel (ici, sounddevice)
-        self._audio_driver = SoundDeviceAudioDriver(
-            sample_rate,
-            block_size,
-            num_output_channels,
-            num_input_channels
-        )
-
-       
+        # Verrou des threads hors audio (interface, édition): le callback ne le prend jamais.
+        # Les changements d'état lus par le callback lui sont envoyés par la file de commandes.
+        self._lock = threading.RLock()
+        self._command_queue = AdikCommandQueue()
         # Statut du moteur
         self._is_running_output = False
         self._is_running_input = False
         self._is_running_duplex = False
+        # Liste des pistes vue par le thread audio, installée par commande avec les buffers du mixeur
+        self._track_list = []
+        # Statistiques de temps des callbacks, mises à jour à chaque bloc
+        self._callback_stats = AdikCallbackStats(sample_rate)
+        # Étages du rendu d'un bloc, exécutés dans l'ordre par render_block
+        self._render_stages = []
+        self._init_render_stages()
+
+        # Buffers de travail préalloués (sortie master et un buffer par piste),
+        # pour que le callback n'alloue aucun tableau en régime établi.
+        self._use_scratch_buffers = True
+        self._master_buffer = None
+        self._bus_buffer = None # Sortie du mixeur, avant addition au buffer master
+        self._track_buffers = None
+        self.update_buffers()
+        # Pool de threads de rendu des pistes (optionnel, voir set_render_threads)
+        self._render_pool = None
+        self.render_pool_min_tracks = 8 # En dessous, les pistes sont lues par le callback seul
+
+        # L'instance du pilote audio, qui est responsable de la communication
+        # avec le matériel (sounddevice par défaut)
+        self._audio_driver = self._create_audio_driver(audio_driver)
 
         print(f"AdikAudioEngine initialisé (SR: {self.sample_rate}, Block Size: {self.block_size}, Out Channels: {self.num_output_channels})")
 
     #----------------------------------------
+
+    def _create_audio_driver(self, audio_driver):
+        """
+        Crée le pilote audio demandé.
+        sounddevice n'est importé que si ce pilote est choisi; s'il n'est pas disponible
+        (pas de PortAudio, pas de carte son), le moteur utilise le pilote nul.
+        """
+        if isinstance(audio_driver, BaseAudioDriver):
+            return audio_driver
+        driver_name = audio_driver or "sounddevice"
+        driver_args = (self.sample_rate, self.block_size, self.num_output_channels, self.num_input_channels)
+
+        if driver_name == "sounddevice":
+            try:
+                from sounddevice_audio_driver import SoundDeviceAudioDriver
+                return SoundDeviceAudioDriver(*driver_args)
+            except (ImportError, OSError) as e:
+                print(f"AdikAudioEngine: sounddevice indisponible ({e}). Utilisation du pilote nul.")
+                driver_name = "null"
+
+        if driver_name == "null":
+            from null_audio_driver import NullAudioDriver
+            return NullAudioDriver(*driver_args)
+        elif driver_name == "freerun":
+            from null_audio_driver import FreeRunAudioDriver
+            return FreeRunAudioDriver(*driver_args)
+        elif driver_name == "wavfile":
+            from wav_file_audio_driver import WavFileDriver
+            return WavFileDriver(*driver_args)
+
+        raise ValueError(f"Pilote audio inconnu: {driver_name}. Pilotes disponibles: {', '.join(self.AUDIO_DRIVER_NAMES)}")
+
+    #----------------------------------------
     
     def start_output_stream(self):
         """Démarre le stream de sortie via le pilote."""
@@ -74,10 +129,13 @@ class AdikAudioEngine:
         self._audio_driver.start_output_stream(self._output_callback_function)
         """
 
+        # Le stream est marqué actif avant son démarrage: les commandes postées entre-temps
+        # sont exécutées par le premier bloc
+        with self._lock:
+            self._is_running_output = True
+            self._is_running_input = False  # S'assurer que les autres streams sont à False
+            self._is_running_duplex = False
         self._audio_driver.start_output_stream(self._audio_output_callback)
-        self._is_running_output = True
-        self._is_running_input = False  # S'assurer que les autres streams sont à False
-        self._is_running_duplex = False
 
         print("Engine: Stream de sortie démarré.")
 
@@ -86,7 +144,9 @@ class AdikAudioEngine:
     def stop_output_stream(self):
         """Arrête le stream de sortie via le pilote."""
         self._audio_driver.stop_output_stream()
-        self._is_running_output = False
+        with self._lock:
+            self._is_running_output = False
+            self._drain_commands_if_stopped()
         print("Engine: Stream de sortie arrêté.")
 
     #----------------------------------------
@@ -131,11 +191,12 @@ class AdikAudioEngine:
         """
 
         # Le pilote SoundDeviceAudioDriver gère un seul stream pour le duplex
+        with self._lock:
+            self._is_running_duplex = True
+            # S'assurer que les streams duplex sont à False
+            self._is_running_output = False
+            self._is_running_input = False
         self._audio_driver.start_duplex_stream(self._audio_duplex_callback)
-        self._is_running_duplex = True
-        # S'assurer que les streams duplex sont à False
-        self._is_running_output = False
-        self._is_running_input = False
         print("Engine: Stream duplex démarré.")
         
     #----------------------------------------
@@ -143,7 +204,9 @@ class AdikAudioEngine:
     def stop_duplex_stream(self):
         """Arrête le stream duplex via le pilote."""
         self._audio_driver.stop_duplex_stream()
-        self._is_running_duplex = False
+        with self._lock:
+            self._is_running_duplex = False
+            self._drain_commands_if_stopped()
         print("Engine: Stream duplex arrêté.")
 
     #----------------------------------------
@@ -170,6 +233,453 @@ class AdikAudioEngine:
 
     #----------------------------------------
 
+    # --- File de commandes vers le thread audio ---
+    def post_command(self, func, *args):
+        """
+        Exécute func(*args) dans le thread audio, au début du prochain bloc, sans attendre.
+        Si aucun stream ne rend de blocs, la commande est exécutée tout de suite.
+        """
+        with self._lock:
+            if self.is_running():
+                self._command_queue.post(func, *args)
+                return
+            func(*args)
+
+    #----------------------------------------
+
+    def send_command(self, func, *args, timeout=1.0):
+        """
+        Comme post_command, mais attend que la commande soit exécutée et retourne son résultat.
+        Seul le thread appelant attend, jamais le thread audio.
+        """
+        result = []
+        done_event = threading.Event()
+        def command():
+            try:
+                result.append(func(*args))
+            finally:
+                done_event.set()
+
+        self.post_command(command)
+        if not done_event.wait(timeout):
+            print(f"Engine: Commande {getattr(func, '__name__', func)} non exécutée après {timeout}s.")
+            return None
+        return result[0] if result else None
+
+    #----------------------------------------
+
+    def _drain_commands_if_stopped(self):
+        """ Exécute les commandes restées en file quand plus aucun stream ne rend de blocs. """
+        if not self.is_running():
+            self._command_queue.drain()
+
+    #----------------------------------------
+
+    def set_scratch_buffers_mode(self, enabled):
+        """
+        Active ou désactive l'utilisation des buffers de travail préalloués dans les callbacks.
+        """
+        with self._lock:
+            self._use_scratch_buffers = enabled
+        print(f"Engine: Buffers préalloués {'activés' if enabled else 'désactivés'}.")
+
+    #----------------------------------------
+
+    def update_buffers(self, num_tracks=None):
+        """
+        (Ré)alloue les buffers de travail du moteur, en dehors du callback audio.
+        Doit être appelée quand la taille de bloc ou le nombre de pistes change.
+        """
+        if num_tracks is None:
+            num_tracks = len(self._player.track_list) if self._player is not None else 0
+        block_samples = self.block_size * self.num_output_channels
+
+        # Allocation hors verrou, puis simple échange des références sous verrou
+        master_buffer = self._master_buffer
+        if master_buffer is None or master_buffer.size != block_samples:
+            master_buffer = np.zeros(block_samples, dtype=np.float32)
+        bus_buffer = self._bus_buffer
+        if bus_buffer is None or bus_buffer.size != block_samples:
+            bus_buffer = np.zeros(block_samples, dtype=np.float32)
+        track_buffers = self._track_buffers
+        if track_buffers is None or track_buffers.shape != (num_tracks, block_samples):
+            track_buffers = np.zeros((num_tracks, block_samples), dtype=np.float32)
+
+        # Tableaux du mixeur reconstruits pour la liste de pistes actuelle
+        mixer = self._player.mixer if self._player is not None else None
+        track_list = list(self._player.track_list) if self._player is not None else []
+        mixer_arrays = mixer.build_arrays(track_list) if mixer is not None else None
+
+        self.post_command(self._install_buffers, master_buffer, bus_buffer, track_buffers,
+                          mixer, mixer_arrays, track_list)
+
+    #----------------------------------------
+
+    def set_render_threads(self, num_threads, min_tracks=None):
+        """
+        Active la lecture parallèle des pistes par un pool de 'num_threads' threads persistants
+        (mode de mixage matriciel), ou la désactive avec 0.
+        min_tracks: nombre de pistes à partir duquel le pool est utilisé.
+        Le pool est créé et arrêté hors du callback; son installation passe par la file de commandes.
+        """
+        if min_tracks is not None:
+            self.render_pool_min_tracks = max(1, min_tracks)
+        old_pool = self._render_pool
+        if old_pool is not None and old_pool.num_workers == num_threads:
+            return
+        render_pool = None
+        if num_threads > 0:
+            from adik_render_pool import AdikRenderPool
+            render_pool = AdikRenderPool(num_threads)
+        # Le callback n'utilise plus l'ancien pool une fois la commande exécutée.
+        # Le ticket décide, une seule fois, si la commande installe le pool ou si elle a été abandonnée:
+        # dict.setdefault est atomique, la commande et ce thread ne peuvent pas gagner tous les deux.
+        ticket = {}
+        self.send_command(self._install_render_pool, render_pool, ticket)
+        if ticket.setdefault('state', 'cancelled') == 'cancelled':
+            # Commande non exécutée à temps: elle n'installera plus rien, le nouveau pool est arrêté
+            if render_pool is not None:
+                render_pool.close()
+            print("Engine: Erreur: Le pool de rendu n'a pas pu être installé.")
+            return
+        if old_pool is not None:
+            old_pool.close()
+        print(f"Engine: Lecture parallèle des pistes {'sur ' + str(num_threads) + ' threads' if num_threads > 0 else 'désactivée'}.")
+
+    #----------------------------------------
+
+    def _install_render_pool(self, render_pool, ticket):
+        """ Commande: installe le pool de threads de rendu, sauf si set_render_threads a abandonné l'installation. """
+        if ticket.setdefault('state', 'installed') != 'installed':
+            return False
+        self._render_pool = render_pool
+        return True
+
+    #----------------------------------------
+
+    def _install_buffers(self, master_buffer, bus_buffer, track_buffers, mixer, mixer_arrays, track_list):
+        """ Commande: installe les buffers, les tableaux du mixeur et la liste des pistes du thread audio. """
+        self._master_buffer = master_buffer
+        self._bus_buffer = bus_buffer
+        self._track_buffers = track_buffers
+        self._track_list = track_list
+        if mixer is not None:
+            mixer.set_arrays(mixer_arrays, track_list)
+
+    #----------------------------------------
+
+    def set_block_size(self, block_size):
+        """
+        Change la taille de bloc du moteur. Les buffers de travail sont redimensionnés
+        hors du callback, et le stream actif est redémarré avec la nouvelle taille.
+        """
+        if block_size <= 0 or block_size == self.block_size:
+            return
+        was_output = self._is_running_output
+        was_input = self._is_running_input
+        was_duplex = self._is_running_duplex
+        if was_output or was_input or was_duplex:
+            self.stop_stream()
+
+        self.block_size = block_size
+        self._audio_driver.block_size = block_size
+        self.update_buffers()
+        print(f"Engine: Taille de bloc changée à {self.block_size} frames.")
+
+        if was_duplex:
+            self.start_duplex_stream()
+        else:
+            if was_output:
+                self.start_output_stream()
+            if was_input:
+                self.start_input_stream()
+
+    #----------------------------------------
+
+    def get_callback_stats(self):
+        """
+        Retourne une copie des statistiques des callbacks (voir AdikCallbackStats.get_summary).
+        Lecture sans verrou: les valeurs d'un bloc en cours peuvent être partiellement à jour.
+        """
+        return self._callback_stats.get_summary()
+
+    #----------------------------------------
+
+    def reset_callback_stats(self):
+        """ Remet à zéro les statistiques des callbacks. """
+        self.post_command(self._callback_stats.reset)
+
+    #----------------------------------------
+
+    def _get_output_buffer(self, num_frames):
+        """
+        Retourne le buffer de sortie du bloc, rempli de zéros.
+        Utilise le buffer master préalloué quand c'est possible.
+        """
+        num_samples = num_frames * self.num_output_channels
+        if self._use_scratch_buffers and num_samples <= self._master_buffer.size:
+            output_buffer = self._master_buffer[:num_samples]
+            output_buffer.fill(0.0)
+            return output_buffer
+        return np.zeros(num_samples, dtype=np.float32)
+
+    #----------------------------------------
+
+    def _get_track_buffer(self, track_idx, num_frames):
+        """
+        Retourne le buffer de travail préalloué de la piste, ou None
+        s'il n'existe pas (la piste allouera alors son propre bloc).
+        """
+        if not self._use_scratch_buffers:
+            return None
+        track_buffers = self._track_buffers
+        if track_idx >= track_buffers.shape[0] or num_frames * self.num_output_channels > track_buffers.shape[1]:
+            return None
+        return track_buffers[track_idx]
+
+    #----------------------------------------
+
+    def _mix_tracks_with_mixer(self, output_buffer, num_frames):
+        """
+        Mixe toutes les pistes par le mixeur: chaque piste lit son bloc brut dans son
+        buffer de travail, la matrice des gains est calculée en une fois, et le mix est
+        un seul produit matriciel des blocs empilés.
+        Retourne False si ce mode n'est pas utilisable pour ce bloc (l'appelant mixe alors piste par piste).
+        """
+        if AdikTrack.mix_mode != AdikTrack.MIX_MODE_MATRIX or not self._use_scratch_buffers:
+            return False
+        track_list = self._track_list
+        mixer = self._player.mixer
+        track_buffers = self._track_buffers
+        num_samples = num_frames * self.num_output_channels
+        if len(track_list) != mixer.num_slots or len(track_list) != track_buffers.shape[0] \
+                or num_samples > track_buffers.shape[1]:
+            return False
+
+        recording_replace = self._transport._recording and self._transport.recording_mode == AdikTrack.RECORDING_MODE_REPLACE
+        gain_matrix, active = mixer.compute_gains(recording_replace)
+
+        render_pool = self._render_pool
+        if render_pool is not None and len(track_list) >= self.render_pool_min_tracks:
+            # Pistes lues en parallèle par les threads du pool, chacune dans sa ligne de track_buffers
+            render_pool.render(track_list, track_buffers, active, num_frames)
+        else:
+            for track_idx, track in enumerate(track_list):
+                if active[track_idx]:
+                    track.get_audio_block(num_frames, track_buffers[track_idx], apply_gain=False)
+                else:
+                    # Piste inaudible: son gain est nul, on avance seulement sa position
+                    track.playback_position += num_frames
+
+        track_blocks = track_buffers[:, :num_samples].reshape(len(track_list), num_frames, self.num_output_channels)
+        bus_buffer = self._bus_buffer[:num_samples]
+        mixer.mix_blocks(track_blocks, gain_matrix, bus_buffer.reshape(num_frames, self.num_output_channels))
+        np.add(output_buffer, bus_buffer, out=output_buffer)
+        return True
+
+    #----------------------------------------
+
+    #----------------------------------------
+    # Graphe de rendu: étages ordonnés, communs à tous les streams
+    #----------------------------------------
+
+    def _init_render_stages(self):
+        """
+        Construit la liste ordonnée des étages de rendu d'un bloc.
+        Chaque étage est un tuple (nom, fonction, phase), où la fonction a la signature
+        func(outdata, indata, output_buffer, num_frames), et phase est l'index
+        de la phase dans AdikCallbackStats à laquelle son temps est compté.
+        """
+        self._render_stages = [
+            ("input", self._stage_input_capture, AdikCallbackStats.PHASE_INPUT),
+            ("metronome", self._stage_metronome, AdikCallbackStats.PHASE_METRONOME),
+            ("tracks", self._stage_track_sources, AdikCallbackStats.PHASE_TRACKS),
+            ("master", self._stage_master_bus, AdikCallbackStats.PHASE_OUTPUT),
+            ("transport", self._stage_transport, AdikCallbackStats.PHASE_TRANSPORT),
+        ]
+
+    #----------------------------------------
+
+    def get_render_stage_names(self):
+        """ Retourne les noms des étages de rendu, dans leur ordre d'exécution. """
+        return [stage[0] for stage in self._render_stages]
+
+    #----------------------------------------
+
+    def add_render_stage(self, name, stage_func, before=None, phase=AdikCallbackStats.PHASE_OTHER):
+        """
+        Ajoute un étage de rendu, avant l'étage nommé 'before' ou à la fin.
+        stage_func(outdata, indata, output_buffer, num_frames) est appelée à chaque bloc, dans le thread audio
+        et sans verrou: l'état qu'elle lit doit lui être envoyé par la file de commandes (post_command).
+        Retourne True si l'étage a été ajouté.
+        """
+        if name in self.get_render_stage_names():
+            print(f"Engine: L'étage de rendu '{name}' existe déjà.")
+            return False
+        # Nouvelle liste, installée par commande: le callback n'itère jamais une liste en cours de modification
+        render_stages = list(self._render_stages)
+        insert_idx = len(render_stages)
+        if before is not None:
+            names = [stage[0] for stage in render_stages]
+            if before not in names:
+                print(f"Engine: Étage de rendu '{before}' introuvable.")
+                return False
+            insert_idx = names.index(before)
+        render_stages.insert(insert_idx, (name, stage_func, phase))
+        self.post_command(self._install_render_stages, render_stages)
+        return True
+
+    #----------------------------------------
+
+    def remove_render_stage(self, name):
+        """ Retire un étage de rendu. Retourne True si l'étage a été retiré. """
+        render_stages = [stage for stage in self._render_stages if stage[0] != name]
+        if len(render_stages) == len(self._render_stages):
+            print(f"Engine: Étage de rendu '{name}' introuvable.")
+            return False
+        self.post_command(self._install_render_stages, render_stages)
+        return True
+
+    #----------------------------------------
+
+    def _install_render_stages(self, render_stages):
+        """ Commande: installe la nouvelle liste des étages de rendu. """
+        self._render_stages = render_stages
+
+    #----------------------------------------
+
+    def render_block(self, outdata, indata, num_frames):
+        """
+        Rend un bloc en exécutant les étages de rendu dans l'ordre.
+        outdata: buffer (frames, canaux) du pilote, ou None pour un stream d'entrée seul.
+        indata: buffer d'entrée du pilote, ou None pour un stream de sortie seul.
+        Exécutée dans le thread audio: les changements d'état y arrivent par la file de commandes.
+        """
+        stats = self._callback_stats
+        # Les commandes de l'interface sont exécutées avant tout le reste du bloc
+        if self._command_queue:
+            commands_start_ns = time.perf_counter_ns()
+            self._command_queue.drain()
+            stats.add_phase_time(stats.PHASE_COMMANDS, time.perf_counter_ns() - commands_start_ns)
+
+        output_buffer = self._get_output_buffer(num_frames)
+        for _, stage_func, phase in self._render_stages:
+            stage_start_ns = time.perf_counter_ns()
+            stage_func(outdata, indata, output_buffer, num_frames)
+            stats.add_phase_time(phase, time.perf_counter_ns() - stage_start_ns)
+
+    #----------------------------------------
+
+    def _stage_input_capture(self, outdata, indata, output_buffer, num_frames):
+        """ Étage d'entrée: copie le bloc d'entrée dans le buffer d'enregistrement. """
+        if self._transport._recording and indata is not None and indata.size > 0:
+            # Ajoute les données d'entrée au buffer circulaire d'enregistrement du transport.
+            self._transport.write_recording_block(indata)
+
+    #----------------------------------------
+
+    def _stage_metronome(self, outdata, indata, output_buffer, num_frames):
+        """ Étage du métronome: déclenche les clics et les mixe dans le buffer de sortie. """
+        if not self._metronome.is_clicking():
+            return
+
+        current_beat_index = self._metronome.playback_frame // self._metronome.frames_per_beat
+        next_beat_index = (self._metronome.playback_frame + num_frames) // self._metronome.frames_per_beat
+
+        # Si le métronome vient d'être démarré et que la position est à zéro, on clique immédiatement.
+        if self._metronome.playback_frame == 0 and not self._metronome.is_click_playing():
+            beep()
+            self._metronome.beat_count = 0
+            self._metronome.play_click()
+        
+        # Si, on détecte le passage au battement suivant
+        if current_beat_index < next_beat_index:
+            if self._metronome.playback_frame > 0:
+                self._metronome.play_click()
+                self._metronome._increment_beat_count() # Incrémenter le compteur ici
+                
+        # Mixage du son du métronome dans le buffer de sortie
+        self._metronome.mix_click_data(output_buffer, num_frames)
+
+    #----------------------------------------
+
+    def _stage_track_sources(self, outdata, indata, output_buffer, num_frames):
+        """ Étage des pistes: mixe les pistes audibles dans le buffer de sortie, en mode lecture. """
+        if not self._transport._playing:
+            return
+
+        # Mixage de toutes les pistes par le mixeur, sinon piste par piste
+        if self._mix_tracks_with_mixer(output_buffer, num_frames):
+            return
+
+        track_list = self._track_list
+        solo_active = any(track.is_solo() for track in track_list)
+        for track_idx, track in enumerate(track_list):
+            track_buffer = self._get_track_buffer(track_idx, num_frames)
+            should_mix_track = True
+            if solo_active and not track.is_solo():
+                should_mix_track = False
+            if track.is_muted():
+                should_mix_track = False
+            if track.is_armed() and self._transport._recording and self._transport.recording_mode == track.RECORDING_MODE_REPLACE:
+                should_mix_track = False
+
+            if should_mix_track:
+                if track.length_frames > 0:
+                    try:
+                        track.mix_sound_data(output_buffer, num_frames, track_buffer)
+                    except Exception as e:
+                        print(f"Erreur lors de l'appel de mix_sound_data pour la piste {track.name}: {e}")
+                else:
+                    track.get_audio_block(num_frames, track_buffer)
+            else: # not should_mix_track
+                track.get_audio_block(num_frames, track_buffer)
+
+    #----------------------------------------
+
+    def _stage_master_bus(self, outdata, indata, output_buffer, num_frames):
+        """ Étage master: copie le buffer de sortie vers le buffer du pilote. """
+        if outdata is not None:
+            outdata[:] = output_buffer.reshape((num_frames, self.num_output_channels))
+
+    #----------------------------------------
+
+    def _stage_transport(self, outdata, indata, output_buffer, num_frames):
+        """
+        Étage du transport: avance les positions, gère le bouclage et l'arrêt en fin de morceau.
+        La position du métronome avance aussi quand le player est en pause.
+        """
+        if not self._transport._playing:
+            if self._metronome.is_clicking():
+                self._metronome.playback_frame += num_frames
+            return
+
+        # Mettre à jour la position du player et du métronome uniquement en mode lecture
+        self._player.current_playback_frame += num_frames
+        self._metronome.playback_frame = self._player.current_playback_frame
+        self._player.current_time_seconds_cached = self._player.current_playback_frame / self.sample_rate
+
+        # Gérer le bouclage
+        if self._loop.is_looping() and self._player.current_playback_frame >= self._loop._loop_end_frame:
+            self._player.current_playback_frame = self._loop._loop_start_frame
+            self._metronome.playback_frame = self._player.current_playback_frame
+            for track in self._track_list:
+                track.playback_position = self._player.current_playback_frame
+            print(f"Player: Boucle terminée, repositionnement à {self._player.current_playback_frame} frames.")
+        
+        # Gérer l'arrêt en fin de lecture si le bouclage n'est pas actif
+        elif not self._loop.is_looping():
+            all_tracks_finished = True
+            for track in self._track_list:
+                if track.clips and self._player.current_playback_frame < track.end_frame:
+                    all_tracks_finished = False
+                    break
+            if all_tracks_finished and not self._transport._recording:
+                print("Player: Toutes les pistes ont fini de jouer. Arrêt automatique.")
+                self._transport._playing = False
+
+    #----------------------------------------
+
     #----------------------------------------
     # Les fonctions de callback audio déplacées depuis AdikPlayer
     #----------------------------------------
@@ -180,212 +690,48 @@ class AdikAudioEngine:
         Callback audio pour l'enregistrement (stream d'entrée).
         Cette fonction est exécutée dans un thread séparé.
         """
-        # Note: Cette fonction sera utilisée pour un stream d'entrée pur.
-        # Pour le duplex, on utilise _audio_duplex_callback.
+        # Note: Cette fonction sera utilisée pour un stream d'entrée pur,
+        # à côté d'un stream de sortie qui rend les blocs: seul l'étage d'entrée est exécuté ici.
         if status:
             print(f"Status du callback d'entrée: {status}", flush=True)
             beep()
             
-        with self._lock:
-            # On vérifie si le player est en train d'enregistrer.
-            if self._transport._recording and indata is not None and indata.size > 0:
-                # Ajoute les données d'entrée au buffer d'enregistrement du transport.
-                self._transport.recording_buffer = np.append(
-                    self._transport.recording_buffer, 
-                    indata.astype(np.float32).flatten()
-                )
+        self._callback_stats.count_status(status)
+        self._stage_input_capture(None, indata, None, frames)
 
     #----------------------------------------
     
     def _audio_output_callback(self, outdata, num_frames, time_info, status):
         """
         Callback audio pour la lecture (stream de sortie).
-        Le callback audio principal, avec une gestion améliorée du métronome.
         """
-        # Note: Cette fonction sera utilisée pour un stream de sortie pur.
-        # Pour le duplex, on utilise _audio_duplex_callback.
-        if status:
-            print(f"Status du callback audio: {status}", flush=True)
-            beep()
-            
-        with self._lock:
-            # 1. Remplissage du buffer de sortie avec des zéros
-            output_buffer = np.zeros(num_frames * self.num_output_channels, dtype=np.float32)
-
-            # 2. Logique de déclenchement du métronome
-            if self._metronome.is_clicking():
-                current_beat_index = self._metronome.playback_frame // self._metronome.frames_per_beat
-                next_beat_index = (self._metronome.playback_frame + num_frames) // self._metronome.frames_per_beat
-
-                # Si le métronome vient d'être démarré et que la position est à zéro, on clique immédiatement.
-                if self._metronome.playback_frame == 0 and not self._metronome.is_click_playing():
-                    beep()
-                    self._metronome.beat_count = 0
-                    self._metronome.play_click()
-                
-                # Si, on détecte le passage au battement suivant
-                if current_beat_index < next_beat_index:
-                    if self._metronome.playback_frame > 0:
-                        self._metronome.play_click()
-                        self._metronome._increment_beat_count() # Incrémenter le compteur ici
-                        
-                # 3. Mixage du son du métronome dans le buffer de sortie
-                self._metronome.mix_click_data(output_buffer, num_frames)
-                
-            # 4. Traitement de la lecture si le player est en mode PLAY
-            # Mettre à jour la position du métronome même si le player est en pause
-            if not self._transport._playing:
-                if self._metronome.is_clicking():
-                    self._metronome.playback_frame += num_frames
-                    pass
-            else: # self._playing
-                solo_active = any(track.is_solo() for track in self._player.track_list)
-
-                for track in self._player.track_list:
-                    should_mix_track = True
-                    if solo_active and not track.is_solo():
-                        should_mix_track = False
-                    if track.is_muted():
-                        should_mix_track = False
-                    if track.is_armed() and self._transport._recording and self._transport.recording_mode == track.RECORDING_MODE_REPLACE:
-                        should_mix_track = False
-
-                    if should_mix_track:
-                        if track.audio_sound and track.audio_sound.length_frames > 0:
-                            try:
-                                track.mix_sound_data(output_buffer, num_frames)
-                            except Exception as e:
-                                print(f"Erreur lors de l'appel de mix_sound_data pour la piste {track.name}: {e}")
-                        else:
-                            track.get_audio_block(num_frames)
-                    else: # not should_mix_track
-                        track.get_audio_block(num_frames)
-                
-                # Mettre à jour la position du player et du métronome uniquement en mode lecture
-                self._player.current_playback_frame += num_frames
-                self._metronome.playback_frame = self._player.current_playback_frame
-                self._player.current_time_seconds_cached = self._player.current_playback_frame / self.sample_rate
-
-                # Gérer le bouclage
-                if self._loop.is_looping() and self._player.current_playback_frame >= self._loop._loop_end_frame:
-                    self._player.current_playback_frame = self._loop._loop_start_frame
-                    self._metronome.playback_frame = self._player.current_playback_frame
-                    for track in self._player.track_list:
-                        track.playback_position = self._player.current_playback_frame
-                    print(f"Player: Boucle terminée, repositionnement à {self._player.current_playback_frame} frames.")
-                
-                # Gérer l'arrêt en fin de lecture si le bouclage n'est pas actif
-                elif not self._loop.is_looping():
-                    all_tracks_finished = True
-                    for track in self._player.track_list:
-                        if track.audio_sound:
-                            if self._player.current_playback_frame < (track.offset_frames + track.audio_sound.length_frames):
-                                all_tracks_finished = False
-                                break
-                    if all_tracks_finished and not self._transport._recording:
-                        print("Player: Toutes les pistes ont fini de jouer. Arrêt automatique.")
-                        self._transport._playing = False
-            
-            # Copie le buffer de sortie vers le buffer sounddevice
-            outdata[:] = output_buffer.reshape((num_frames, self.num_output_channels))
+        self._run_render_callback(outdata, None, num_frames, status, "audio")
 
     #----------------------------------------
 
     def _audio_duplex_callback(self, indata, outdata, num_frames, time_info, status):
         """
         Callback audio unique pour le stream duplex.
-        Combine la logique des callbacks d'entrée et de sortie.
         """
+        self._run_render_callback(outdata, indata, num_frames, status, "duplex")
+
+    #----------------------------------------
+
+    def _run_render_callback(self, outdata, indata, num_frames, status, stream_name):
+        """
+        Corps commun des callbacks de sortie et duplex: rend le bloc par render_block
+        et met à jour les statistiques. Aucun verrou n'est pris dans le thread audio.
+        """
+        start_ns = time.perf_counter_ns()
         if status:
-            print(f"Status du callback duplex: {status}", flush=True)
+            print(f"Status du callback {stream_name}: {status}", flush=True)
             beep()
 
-        # Logique d'entrée (recording)
-        # Identique à _audio_input_callback
-        with self._lock:
-            # 1. Remplissage du buffer de d'entrée
-            if self._transport._recording and indata is not None and indata.size > 0:
-                self._transport.recording_buffer = np.append(
-                    self._transport.recording_buffer, 
-                    indata.astype(np.float32).flatten()
-                )
-
-            # Logique de sortie (playback + metronome)
-            # Identique à _audio_output_callback
-            # 2. Remplissage du buffer de sortie avec des zéros
-            output_buffer = np.zeros(num_frames * self.num_output_channels, dtype=np.float32)
-
-            # 3. Logique de déclenchement du métronome
-            if self._metronome.is_clicking():
-                current_beat_index = self._metronome.playback_frame // self._metronome.frames_per_beat
-                next_beat_index = (self._metronome.playback_frame + num_frames) // self._metronome.frames_per_beat
-
-                # Si le métronome vient d'être démarré et que la position est à zéro, on clique immédiatement.
-                if self._metronome.playback_frame == 0 and not self._metronome.is_click_playing():
-                    beep()
-                    self._metronome.beat_count = 0
-                    self._metronome.play_click()
-                
-                # Si, on détecte le passage au battement suivant
-                if current_beat_index < next_beat_index:
-                    if self._metronome.playback_frame > 0:
-                        self._metronome.play_click()
-                        self._metronome._increment_beat_count()
-                        
-                # 4. Mixage du son du métronome dans le buffer de sortie
-                self._metronome.mix_click_data(output_buffer, num_frames)
-            
-            # 5. Traitement de la lecture si le player est en mode PLAY
-            if not self._transport._playing:
-                if self._metronome.is_clicking():
-                    self._metronome.playback_frame += num_frames
-                    pass
-            else: # self._playing
-                solo_active = any(track.is_solo() for track in self._player.track_list)
-
-                for track in self._player.track_list:
-                    should_mix_track = True
-                    if solo_active and not track.is_solo():
-                        should_mix_track = False
-                    if track.is_muted():
-                        should_mix_track = False
-                    if track.is_armed() and self._transport._recording and self._transport.recording_mode == track.RECORDING_MODE_REPLACE:
-                        should_mix_track = False
-
-                    if should_mix_track:
-                        if track.audio_sound and track.audio_sound.length_frames > 0:
-                            try:
-                                track.mix_sound_data(output_buffer, num_frames)
-                            except Exception as e:
-                                print(f"Erreur lors de l'appel de mix_sound_data pour la piste {track.name}: {e}")
-                        else:
-                            track.get_audio_block(num_frames)
-                    else:
-                        track.get_audio_block(num_frames)
-                
-                self._player.current_playback_frame += num_frames
-                self._metronome.playback_frame = self._player.current_playback_frame
-                self._player.current_time_seconds_cached = self._player.current_playback_frame / self.sample_rate
-
-                if self._loop.is_looping() and self._player.current_playback_frame >= self._loop._loop_end_frame:
-                    self._player.current_playback_frame = self._loop._loop_start_frame
-                    self._metronome.playback_frame = self._metronome._loop_start_frame
-                    for track in self._player.track_list:
-                        track.playback_position = self._player.current_playback_frame
-                    print(f"Player: Boucle terminée, repositionnement à {self._player.current_playback_frame} frames.")
-                
-                elif not self._loop.is_looping():
-                    all_tracks_finished = True
-                    for track in self._player.track_list:
-                        if track.audio_sound:
-                            if self._player.current_playback_frame < (track.offset_frames + track.audio_sound.length_frames):
-                                all_tracks_finished = False
-                                break
-                    if all_tracks_finished and not self._transport._recording:
-                        print("Player: Toutes les pistes ont fini de jouer. Arrêt automatique.")
-                        self._transport._playing = False
-            
-            outdata[:] = output_buffer.reshape((num_frames, self.num_output_channels))
+        stats = self._callback_stats
+        stats.begin_block(start_ns)
+        stats.count_status(status)
+        self.render_block(outdata, indata, num_frames)
+        stats.end_block(num_frames, time.perf_counter_ns())
 
     #----------------------------------------
 
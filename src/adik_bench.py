@@ -0,0 +1,750 @@
+#!/usr/bin/env python3
+"""
+    File: adik_bench.py
+    Benchmarks for the audio kernels of adiktracks (timings only, correctness tests are in tests/)
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from adik_sound import AdikSound
+from adik_track import AdikTrack
+
+#----------------------------------------
+
+def _make_track(num_frames, num_channels=2, sample_rate=44100):
+    """ Crée une piste contenant un bruit blanc, pour les mesures. """
+    track = AdikTrack(name="Bench", sample_rate=sample_rate, num_channels=num_channels)
+    audio_data = np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32)
+    track.set_audio_sound(AdikSound(name="Bench Sound", audio_data=audio_data,
+                                    sample_rate=sample_rate, num_channels=num_channels))
+    track.volume = 0.8
+    track.left_gain = 0.7
+    track.right_gain = 0.9
+    return track
+
+#----------------------------------------
+
+def _run_mix(track_list, mix_mode, block_size, num_blocks, num_channels):
+    """
+    Mixe toutes les pistes bloc par bloc avec le noyau demandé.
+    Retourne le mix complet et la durée en secondes.
+    """
+    saved_mode = AdikTrack.mix_mode
+    AdikTrack.mix_mode = mix_mode
+    for track in track_list:
+        track.set_playback_position(0)
+
+    mix_buffer = np.zeros(num_blocks * block_size * num_channels, dtype=np.float32)
+    start_time = time.perf_counter()
+    for block_idx in range(num_blocks):
+        start_idx = block_idx * block_size * num_channels
+        output_buffer = mix_buffer[start_idx : start_idx + block_size * num_channels]
+        for track in track_list:
+            track.mix_sound_data(output_buffer, block_size)
+    elapsed = time.perf_counter() - start_time
+
+    AdikTrack.mix_mode = saved_mode
+    return mix_buffer, elapsed
+
+#----------------------------------------
+
+def bench_mix_kernels(num_tracks=12, block_size=1024, num_blocks=50, num_channels=2, sample_rate=44100):
+    """
+    Compare l'ancien mixage échantillon par échantillon et le mixage vectorisé.
+    """
+    track_list = [_make_track(block_size * num_blocks, num_channels, sample_rate) for _ in range(num_tracks)]
+
+    _, loop_time = _run_mix(track_list, AdikTrack.MIX_MODE_LOOP, block_size, num_blocks, num_channels)
+    _, vec_time = _run_mix(track_list, AdikTrack.MIX_MODE_VECTORIZED, block_size, num_blocks, num_channels)
+
+    budget = num_blocks * block_size / sample_rate
+    print(f"Mixage de {num_tracks} pistes, {num_blocks} blocs de {block_size} frames ({budget:.2f}s d'audio)")
+    print(f"  Boucle:    {loop_time:.4f}s ({loop_time / budget * 100:.1f}% du temps réel)")
+    print(f"  Vectorisé: {vec_time:.4f}s ({vec_time / budget * 100:.1f}% du temps réel)")
+    print(f"  Accélération: x{loop_time / max(vec_time, 1e-9):.1f}")
+    return loop_time, vec_time
+
+#----------------------------------------
+
+def _make_player(num_tracks, block_size, num_blocks, num_channels, sample_rate, audio_driver="null"):
+    """ Crée un player avec des pistes assez longues pour tout le test. """
+    from adik_player import AdikPlayer
+    player = AdikPlayer(sample_rate, block_size, num_channels, 1, audio_driver)
+    for _ in range(num_tracks):
+        track = player.add_track()
+        audio_data = np.random.uniform(-0.5, 0.5, block_size * num_blocks * 2 * num_channels).astype(np.float32)
+        track.set_audio_sound(AdikSound(name="Bench Sound", audio_data=audio_data,
+                                        sample_rate=sample_rate, num_channels=num_channels))
+    player._update_params()
+    return player
+
+#----------------------------------------
+
+def _measure_callback_allocations(player, num_blocks):
+    """
+    Appelle le callback de sortie bloc par bloc sous tracemalloc.
+    Retourne le pic d'allocation (en octets) observé pendant un seul bloc.
+    """
+    engine = player.audio_engine
+    block_size = engine.block_size
+    outdata = np.zeros((block_size, engine.num_output_channels), dtype=np.float32)
+
+    player.set_position(0)
+    player.transport._playing = True
+    # Quelques blocs de chauffe avant la mesure
+    for _ in range(4):
+        engine._audio_output_callback(outdata, block_size, None, None)
+
+    max_peak = 0
+    tracemalloc.start()
+    for _ in range(num_blocks):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        engine._audio_output_callback(outdata, block_size, None, None)
+        _, peak = tracemalloc.get_traced_memory()
+        max_peak = max(max_peak, peak - current)
+    tracemalloc.stop()
+    player.transport._playing = False
+    return max_peak
+
+#----------------------------------------
+
+def _time_callback(player, num_blocks):
+    """ Retourne le temps moyen d'un appel au callback de sortie, en secondes. """
+    engine = player.audio_engine
+    block_size = engine.block_size
+    outdata = np.zeros((block_size, engine.num_output_channels), dtype=np.float32)
+    player.set_position(0)
+    player.transport._playing = True
+    start_time = time.perf_counter()
+    for _ in range(num_blocks):
+        engine._audio_output_callback(outdata, block_size, None, None)
+    elapsed = time.perf_counter() - start_time
+    player.transport._playing = False
+    return elapsed / num_blocks
+
+#----------------------------------------
+
+def bench_callback_track_scaling(track_counts=(1, 4, 16, 64), block_size=512, num_blocks=100, num_channels=2, sample_rate=44100):
+    """
+    Mesure le coût d'un bloc du callback selon le nombre de pistes,
+    pour le mixage vectorisé piste par piste et pour le mixage matriciel du mixeur.
+    """
+    budget = block_size / sample_rate
+    print(f"Coût du callback par bloc de {block_size} frames (budget temps réel: {budget * 1000:.2f} ms)")
+    saved_mode = AdikTrack.mix_mode
+    for num_tracks in track_counts:
+        player = _make_player(num_tracks, block_size, num_blocks, num_channels, sample_rate)
+        AdikTrack.mix_mode = AdikTrack.MIX_MODE_VECTORIZED
+        vec_time = _time_callback(player, num_blocks)
+        AdikTrack.mix_mode = AdikTrack.MIX_MODE_MATRIX
+        matrix_time = _time_callback(player, num_blocks)
+        print(f"  {num_tracks:4d} pistes: Vectorisé {vec_time * 1000:.3f} ms, Matriciel {matrix_time * 1000:.3f} ms")
+    AdikTrack.mix_mode = saved_mode
+
+#----------------------------------------
+
+def bench_callback_throughput(num_tracks=16, block_size=512, audio_seconds=60.0, num_channels=2, sample_rate=44100):
+    """
+    Mesure le débit du callback de sortie avec le pilote FreeRun, qui enchaîne les blocs
+    sans attendre la carte son. Le projet est joué jusqu'à l'arrêt automatique en fin de morceau.
+    Le résultat est exprimé en multiple du temps réel.
+    """
+    num_blocks = int(audio_seconds * sample_rate / block_size) // 2
+    player = _make_player(num_tracks, block_size, num_blocks, num_channels, sample_rate, audio_driver="freerun")
+    driver = player.audio_engine._audio_driver
+    player.set_position(0)
+    player.transport._playing = True
+
+    driver.blocks_processed = 0
+    start_time = time.perf_counter()
+    player.audio_engine.start_output_stream()
+    while player.transport._playing:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start_time
+    num_blocks_played = driver.blocks_processed
+    player.audio_engine.stop_output_stream()
+
+    realtime_factor = (num_blocks_played * block_size / sample_rate) / elapsed
+    print(f"Débit du callback ({num_tracks} pistes, bloc de {block_size} frames, pilote FreeRun):")
+    print(f"  {num_blocks_played} blocs en {elapsed:.2f}s, soit x{realtime_factor:.1f} le temps réel")
+    return realtime_factor
+
+#----------------------------------------
+
+def bench_stream_open(num_tracks=4, seconds=30.0, num_channels=2, sample_rate=44100, directory=None):
+    """
+    Mesure avec tracemalloc la mémoire allouée à l'ouverture de fichiers WAV (PCM 16 et 24 bits, float 32 bits)
+    chargés en mémoire et ouverts en streaming: en streaming, elle ne doit pas dépendre de leur durée.
+    Les fichiers sont écrits dans 'directory', ou dans un répertoire temporaire supprimé ensuite.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="adik_bench_") as temp_dir:
+            return bench_stream_open(num_tracks, seconds, num_channels, sample_rate, temp_dir)
+    import soundfile as sf
+    from adik_wave_handler import AdikWaveHandler
+
+    num_frames = int(seconds * sample_rate)
+    file_paths = []
+    for track_idx in range(num_tracks):
+        subtype = ('PCM_16', 'PCM_24', 'FLOAT')[track_idx % 3]
+        file_path = os.path.join(directory, f"adik_bench_stream_{track_idx}.wav")
+        sf.write(file_path, np.random.uniform(-0.5, 0.5, (num_frames, num_channels)).astype(np.float32),
+                 sample_rate, subtype=subtype)
+        file_paths.append(file_path)
+
+    open_bytes = []
+    for open_func in (AdikWaveHandler.load_wav, AdikWaveHandler.stream_wav):
+        tracemalloc.start()
+        sounds = [open_func(file_path) for file_path in file_paths]
+        open_bytes.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        del sounds
+
+    print(f"Ouverture de {num_tracks} fichiers de {seconds:.0f}s:")
+    print(f"  Mémoire allouée: {open_bytes[0] / 1e6:.1f} Mo chargés, {open_bytes[1] / 1e6:.3f} Mo en streaming")
+    return open_bytes[1]
+
+#----------------------------------------
+
+def bench_peak_overview(minutes=5.0, width=120, num_channels=2, sample_rate=44100):
+    """
+    Compare le calcul d'une vue d'ensemble de 'width' colonnes par parcours des données brutes
+    et par la pyramide de crêtes du son.
+    """
+    num_frames = int(minutes * 60 * sample_rate)
+    sound = AdikSound(name="Bench Peaks", audio_data=np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32),
+                      sample_rate=sample_rate, num_channels=num_channels)
+    start_time = time.perf_counter()
+    peaks = sound.get_peaks()
+    compute_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    frames = sound.audio_data.reshape(-1, num_channels)
+    column_starts = np.linspace(0, num_frames, width, endpoint=False).astype(np.int64)
+    np.maximum.reduceat(frames, column_starts)
+    raw_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    peaks.get_peaks(0, num_frames, width)
+    peak_time = time.perf_counter() - start_time
+    print(f"Vue d'ensemble de {width} colonnes sur {minutes:.0f} min d'audio:")
+    print(f"  Calcul de la pyramide: {compute_time:.3f}s")
+    print(f"  Données brutes: {raw_time * 1000:.2f} ms, Pyramide: {peak_time * 1000:.3f} ms")
+    return raw_time / max(peak_time, 1e-9)
+
+#----------------------------------------
+
+def bench_clip_edits(minutes=10.0, num_edits=20, block_size=512, num_channels=2, sample_rate=44100):
+    """
+    Mesure le temps des éditions (effacement, suppression, prise en remplacement) sur une longue piste:
+    seuls les clips changent, alors qu'une piste à buffer unique recopierait tout son son à chaque édition.
+    """
+    num_frames = int(minutes * 60 * sample_rate)
+    track = _make_track(num_frames, num_channels, sample_rate)
+    take_data = np.random.uniform(-0.5, 0.5, sample_rate * num_channels).astype(np.float32)
+    step = num_frames // (num_edits + 1)
+
+    start_time = time.perf_counter()
+    for edit_idx in range(num_edits):
+        edit_frame = (edit_idx + 1) * step
+        track.erase_range(edit_frame, edit_frame + block_size)
+        track.delete_range(edit_frame + 2 * block_size, edit_frame + 3 * block_size)
+        track.arrange_take(take_data, edit_frame + 4 * block_size, edit_frame + 4 * block_size + sample_rate,
+                           AdikTrack.RECORDING_MODE_REPLACE, num_channels)
+    edit_time = (time.perf_counter() - start_time) / (3 * num_edits)
+
+    # Coût d'une copie complète du son, ce que faisait chaque édition
+    start_time = time.perf_counter()
+    track.clips[0].sound.audio_data.copy()
+    copy_time = time.perf_counter() - start_time
+
+    out = AdikSound.new_audio_data(block_size * num_channels)
+    start_time = time.perf_counter()
+    for block_idx in range(100):
+        track.read_audio_block(block_idx * step // 100, block_size, out)
+    block_time = (time.perf_counter() - start_time) / 100
+    print(f"Éditions sur une piste de {minutes:.0f} min ({len(track.clips)} clips après {3 * num_edits} éditions):")
+    print(f"  Par édition: {edit_time * 1000:.3f} ms, Copie complète du son: {copy_time * 1000:.1f} ms, "
+          f"Lecture d'un bloc: {block_time * 1e6:.1f} µs")
+    return copy_time / max(edit_time, 1e-9)
+
+#----------------------------------------
+
+def bench_clip_index_scaling(clip_counts=(500, 1000, 5000, 10000), num_tracks=4, clip_frames=256, block_size=512, num_blocks=200,
+                             num_channels=2, sample_rate=44100):
+    """
+    Mesure le coût d'un bloc du callback selon le nombre de clips par piste (boucle de batterie découpée,
+    toujours assez de clips pour les blocs joués):
+    grâce à l'index des clips, il doit rester à peu près constant.
+    Mesure aussi une recherche après un seek, et une recherche par parcours de tous les clips pour comparaison.
+    """
+    from adik_clip import AdikClip
+    source_frames = sample_rate * 10
+    print(f"Coût du callback par bloc de {block_size} frames selon le nombre de clips ({num_tracks} pistes, clips de {clip_frames} frames):")
+    for num_clips in clip_counts:
+        player = _make_player(num_tracks, block_size, 0, num_channels, sample_rate)
+        for track in player.track_list:
+            sound = AdikSound(name="Bench Loop", audio_data=np.random.uniform(-0.5, 0.5, source_frames * num_channels).astype(np.float32),
+                              sample_rate=sample_rate, num_channels=num_channels)
+            track._set_clips([AdikClip(sound, clip_idx * clip_frames, (clip_idx * 997) % (source_frames - clip_frames), clip_frames)
+                              for clip_idx in range(num_clips)])
+        player._update_params()
+        callback_time = _time_callback(player, num_blocks)
+
+        track = player.track_list[0]
+        seek_positions = np.random.randint(0, num_clips * clip_frames, 1000).tolist()
+        start_time = time.perf_counter()
+        for frame_pos in seek_positions:
+            track._clip_index.find(frame_pos, block_size)
+        seek_time = (time.perf_counter() - start_time) / len(seek_positions)
+
+        start_time = time.perf_counter()
+        for frame_pos in seek_positions[:100]:
+            [clip for clip in track.clips if clip.timeline_start < frame_pos + block_size and clip.timeline_end > frame_pos]
+        scan_time = (time.perf_counter() - start_time) / 100
+        print(f"  {num_clips:6d} clips: Callback {callback_time * 1000:.3f} ms, Seek {seek_time * 1e6:.2f} µs, "
+              f"Parcours de tous les clips {scan_time * 1e6:.1f} µs")
+
+#----------------------------------------
+
+def bench_undo(minutes=60.0, num_channels=1, sample_rate=44100):
+    """
+    Mesure le temps d'une suppression, de son annulation et de son rétablissement sur une piste de 'minutes' minutes,
+    puis le temps d'annulation d'une prise dont le son a été écrit sur le disque (budget mémoire nul).
+    """
+    from adik_player import AdikPlayer
+    player = AdikPlayer(sample_rate, 512, 2, 1, "null")
+    track = player.add_track()
+    num_frames = int(minutes * 60 * sample_rate)
+    track.set_audio_sound(AdikSound(name="Bench Long", audio_data=np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32),
+                                    sample_rate=sample_rate, num_channels=num_channels))
+    player._update_params()
+
+    start_time = time.perf_counter()
+    player.delete_audio_from_track(0, num_frames // 3, num_frames // 3 + sample_rate * 10)
+    edit_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    player.undo()
+    undo_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    player.redo()
+    redo_time = time.perf_counter() - start_time
+
+    # Prise sur toute la piste, puis annulée: son son n'est plus gardé que par l'historique
+    undo_manager = player.undo_manager
+    take_data = np.random.uniform(-0.5, 0.5, sample_rate * 60 * 2).astype(np.float32)
+    before_clips = track.get_clips()
+    track.arrange_take(take_data, 0, sample_rate * 60, AdikTrack.RECORDING_MODE_REPLACE, 2)
+    undo_manager.record_clips(track, before_clips, "Prise")
+    player.undo()
+    saved_budget = undo_manager.memory_budget
+    start_time = time.perf_counter()
+    undo_manager.set_memory_budget(0)
+    spill_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    player.redo()
+    spilled_redo_time = time.perf_counter() - start_time
+    summary = undo_manager.get_summary()
+    undo_manager.clear()
+    undo_manager.set_memory_budget(saved_budget)
+
+    print(f"Historique d'annulation sur une piste de {minutes:.0f} min ({num_frames * num_channels * 4 / 1e6:.0f} Mo):")
+    print(f"  Suppression: {edit_time * 1000:.2f} ms, Annulation: {undo_time * 1000:.2f} ms, Rétablissement: {redo_time * 1000:.2f} ms")
+    print(f"  Prise de 60 s écrite sur le disque: {spill_time * 1000:.1f} ms, rétablie en {spilled_redo_time * 1000:.2f} ms "
+          f"({summary['spilled_sounds']} son(s) sur le disque)")
+    return undo_time
+
+#----------------------------------------
+
+def bench_chunk_storage(minutes=10.0, num_appends=200, block_size=512, num_blocks=2000, num_channels=2, sample_rate=44100):
+    """
+    Compare un son stocké par morceaux (AdikChunkSound) à un buffer contigu:
+    coût d'un ajout à la fin d'un son de 'minutes' minutes, copie puis effacement d'un son dérivé
+    (morceaux partagés), et lecture de blocs dans le callback sans joindre les morceaux.
+    """
+    from adik_chunk_sound import AdikChunkSound
+    num_frames = int(minutes * 60 * sample_rate)
+    audio_data = np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32)
+    append_data = np.random.uniform(-0.5, 0.5, block_size * num_channels).astype(np.float32)
+
+    # Ajout à la fin: le buffer contigu est recopié à chaque fois
+    contiguous_data = audio_data
+    start_time = time.perf_counter()
+    for _ in range(num_appends // 20):
+        contiguous_data = np.append(contiguous_data, append_data)
+    contiguous_append_time = (time.perf_counter() - start_time) / (num_appends // 20)
+    chunk_sound = AdikChunkSound(name="Bench Chunks", audio_data=audio_data, sample_rate=sample_rate, num_channels=num_channels)
+    start_time = time.perf_counter()
+    for _ in range(num_appends):
+        chunk_sound.append_data(append_data)
+    chunk_append_time = (time.perf_counter() - start_time) / num_appends
+
+    # Son dérivé: seuls les morceaux effacés sont copiés
+    start_time = time.perf_counter()
+    derived_sound = chunk_sound.copy()
+    derived_sound.erase_range(num_frames // 2, num_frames // 2 + sample_rate)
+    derive_time = time.perf_counter() - start_time
+    shared_chunks = sum(chunk is derived_chunk for chunk, derived_chunk in zip(chunk_sound.storage.chunks, derived_sound.storage.chunks))
+
+    # Lecture de blocs consécutifs, comme le callback
+    out = np.zeros((block_size, num_channels), dtype=np.float32)
+    contiguous_2d = audio_data.reshape(-1, num_channels)
+    start_time = time.perf_counter()
+    for block_idx in range(num_blocks):
+        frame_pos = block_idx * block_size
+        out[:] = contiguous_2d[frame_pos : frame_pos + block_size]
+    contiguous_read_time = (time.perf_counter() - start_time) / num_blocks
+    start_time = time.perf_counter()
+    for block_idx in range(num_blocks):
+        chunk_sound.read_frames(block_idx * block_size, block_size, out)
+    chunk_read_time = (time.perf_counter() - start_time) / num_blocks
+
+    print(f"Stockage par morceaux, son de {minutes:.0f} min ({audio_data.nbytes / 1e6:.0f} Mo), morceaux de {chunk_sound.storage.chunk_frames} frames:")
+    print(f"  Ajout de {block_size} frames: contigu: {contiguous_append_time * 1000:.2f} ms, morceaux: {chunk_append_time * 1000:.4f} ms")
+    print(f"  Copie + effacement de 1 s: {derive_time * 1000:.2f} ms, morceaux partagés: {shared_chunks}/{len(chunk_sound.storage.chunks)}")
+    print(f"  Lecture d'un bloc: contigu: {contiguous_read_time * 1e6:.1f} us, morceaux: {chunk_read_time * 1e6:.1f} us")
+    return chunk_append_time
+
+#----------------------------------------
+def bench_parallel_render(track_counts=(2, 8, 32, 64), block_sizes=(256, 1024, 4096), num_threads=None, num_blocks=50,
+                          num_channels=2, sample_rate=44100):
+    """
+    Compare le temps d'un bloc du callback avec les pistes lues par le callback seul,
+    puis par le pool de threads de rendu (AdikRenderPool), selon le nombre de pistes et la taille de bloc.
+    Affiche, pour chaque taille de bloc, le nombre de pistes à partir duquel le pool est plus rapide.
+    """
+    if num_threads is None:
+        num_threads = min(8, os.cpu_count() or 1)
+    crossovers = {}
+    print(f"Lecture parallèle des pistes ({num_threads} threads), temps moyen d'un bloc:")
+    for block_size in block_sizes:
+        crossovers[block_size] = None
+        for num_tracks in track_counts:
+            player = _make_player(num_tracks, block_size, num_blocks, num_channels, sample_rate)
+            serial_time = _time_callback(player, num_blocks)
+            player.set_render_threads(num_threads, min_tracks=1)
+            parallel_time = _time_callback(player, num_blocks)
+            player.set_render_threads(0)
+
+            if crossovers[block_size] is None and parallel_time < serial_time:
+                crossovers[block_size] = num_tracks
+            print(f"  Bloc de {block_size:5d} frames, {num_tracks:3d} pistes: callback seul: {serial_time * 1000:.3f} ms, "
+                  f"pool: {parallel_time * 1000:.3f} ms ({serial_time / parallel_time:.2f}x)")
+    for block_size, num_tracks in crossovers.items():
+        crossover_text = f"à partir de {num_tracks} pistes" if num_tracks is not None else "jamais dans cette plage"
+        print(f"  Bloc de {block_size} frames: pool plus rapide {crossover_text}")
+    return crossovers
+
+#----------------------------------------
+
+def bench_parallel_bounce(num_tracks=40, minutes=0.5, process_counts=None, num_channels=2, sample_rate=44100):
+    """
+    Mesure le temps du mixage hors ligne (AdikParallelBounce) de 'num_tracks' pistes de 'minutes' minutes
+    selon le nombre de processus.
+    Pour un projet d'une heure: bench_parallel_bounce(minutes=60).
+    """
+    from adik_bounce import AdikParallelBounce
+    if process_counts is None:
+        max_processes = os.cpu_count() or 1
+        process_counts = sorted({1, 2, 4, max_processes} & set(range(1, max_processes + 1)))
+    num_frames = int(minutes * 60 * sample_rate)
+    track_list = []
+    for track_idx in range(num_tracks):
+        track = AdikTrack(name=f"Bench {track_idx + 1}", sample_rate=sample_rate, num_channels=num_channels)
+        track.set_audio_sound(AdikSound(name="Bench Sound", audio_data=np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32),
+                                        sample_rate=sample_rate, num_channels=num_channels))
+        track.pan = (track_idx % 5 - 2) * 0.2
+        track_list.append(track)
+
+    times = {}
+    for num_processes in process_counts:
+        start_time = time.perf_counter()
+        AdikParallelBounce(num_processes).render(track_list, 0, num_frames, num_channels)
+        times[num_processes] = time.perf_counter() - start_time
+
+    print(f"Mixage hors ligne de {num_tracks} pistes de {minutes:g} min ({num_tracks * num_frames * num_channels * 4 / 1e6:.0f} Mo):")
+    for num_processes, elapsed in times.items():
+        print(f"  {num_processes:2d} processus: {elapsed:.2f} s ({times[process_counts[0]] / elapsed:.2f}x)")
+    return times
+
+#----------------------------------------
+
+def bench_bounce(minutes=5.0, num_tracks=8, block_size=512, loop_seconds=2.0, num_channels=2, sample_rate=44100):
+    """
+    Compare le mixage hors ligne (bounce) de 'num_tracks' pistes de 'minutes' minutes:
+    l'ancien mixage bloc par bloc (mix_sound_data, noyau vectorisé et, sur 'loop_seconds' secondes,
+    noyau par boucle extrapolé), et le mixage sur toute la plage par AdikTrack.mix_range.
+    """
+    from adik_player import AdikPlayer
+    player = AdikPlayer(sample_rate, block_size, num_channels, 1, "null")
+    num_frames = int(minutes * 60 * sample_rate)
+    for track_idx in range(num_tracks):
+        track = player.add_track()
+        # Pistes stéréo et sons mono, avec des clips séparés par un trou
+        sound_channels = 1 if track_idx % 2 else num_channels
+        track.set_audio_sound(AdikSound(name="Bench Sound", audio_data=np.random.uniform(-0.5, 0.5, num_frames * sound_channels).astype(np.float32),
+                                        sample_rate=sample_rate, num_channels=sound_channels), offset_frames=track_idx * 1000)
+        track.erase_range(num_frames // 3, num_frames // 3 + sample_rate * 10)
+        track.pan = (track_idx % 5 - 2) * 0.2
+    player._update_params()
+    track_edit = player.track_edit
+    tracks_to_mix = list(player.track_list)
+
+    start_time = time.perf_counter()
+    track_edit._mix_tracks_by_blocks(tracks_to_mix, 0, num_frames)
+    block_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    track_edit._mix_tracks(tracks_to_mix, 0, num_frames)
+    range_time = time.perf_counter() - start_time
+
+    saved_mix_mode = AdikTrack.mix_mode
+    AdikTrack.mix_mode = AdikTrack.MIX_MODE_LOOP
+    loop_frames = int(loop_seconds * sample_rate)
+    start_time = time.perf_counter()
+    track_edit._mix_tracks_by_blocks(tracks_to_mix, 0, loop_frames)
+    loop_time = (time.perf_counter() - start_time) * num_frames / loop_frames
+    AdikTrack.mix_mode = saved_mix_mode
+
+    print(f"Mixage hors ligne de {num_tracks} pistes de {minutes:g} min:")
+    print(f"  Bloc par bloc ({block_size} frames), noyau par boucle (extrapolé): {loop_time:.1f} s")
+    print(f"  Bloc par bloc ({block_size} frames), noyau vectorisé: {block_time:.2f} s")
+    print(f"  Toute la plage (mix_range): {range_time:.2f} s ({block_time / range_time:.1f}x)")
+    return range_time
+
+#----------------------------------------
+
+def bench_wav_export(minutes=5.0, num_channels=2, sample_rate=44100, directory=None):
+    """
+    Compare le pic mémoire (tracemalloc) et le temps de la sauvegarde d'une plage d'un son de 'minutes' minutes:
+    copie de la plage puis écriture en un appel (ancienne sauvegarde), et écriture bloc par bloc (save_wav).
+    Le fichier est écrit dans 'directory', ou dans un répertoire temporaire supprimé ensuite.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="adik_bench_") as temp_dir:
+            return bench_wav_export(minutes, num_channels, sample_rate, temp_dir)
+    import soundfile as sf
+    from adik_wave_handler import AdikWaveHandler
+    num_frames = int(minutes * 60 * sample_rate)
+    sound = AdikSound(name="Bench Export", audio_data=np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32),
+                      sample_rate=sample_rate, num_channels=num_channels)
+    file_path = os.path.join(directory, "adik_bench_export.wav")
+    start_frame = num_frames // 10
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    data_to_save = sound.audio_data[start_frame * num_channels:].copy()
+    sf.write(file_path, data_to_save.reshape(-1, num_channels), sample_rate, subtype='PCM_16')
+    copy_time = time.perf_counter() - start_time
+    copy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del data_to_save
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    AdikWaveHandler.save_wav(file_path, sound, start_frame, subtype='PCM_16')
+    stream_time = time.perf_counter() - start_time
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    os.remove(file_path)
+
+    print(f"Sauvegarde de {minutes * 0.9:g} min d'un son de {minutes:g} min ({sound.audio_data.nbytes / 1e6:.0f} Mo) en PCM 16 bits:")
+    print(f"  Copie puis écriture: {copy_time:.2f} s, pic mémoire: {copy_peak / 1e6:.1f} Mo")
+    print(f"  Écriture par blocs: {stream_time:.2f} s, pic mémoire: {stream_peak / 1e6:.1f} Mo")
+    return stream_peak
+
+#----------------------------------------
+
+def bench_wav_import(minutes=5.0, num_channels=2, sample_rate=44100, directory=None):
+    """
+    Compare le pic mémoire (tracemalloc) et le temps du chargement d'un fichier PCM 16 bits de 'minutes' minutes:
+    sf.read(always_2d=True) puis construction du son (ancien load_wav), et lecture par blocs
+    dans un buffer alloué d'avance (import_wav).
+    Le fichier est écrit dans 'directory', ou dans un répertoire temporaire supprimé ensuite.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="adik_bench_") as temp_dir:
+            return bench_wav_import(minutes, num_channels, sample_rate, temp_dir)
+    import soundfile as sf
+    from adik_wave_handler import AdikWaveHandler
+    num_frames = int(minutes * 60 * sample_rate)
+    file_path = os.path.join(directory, "adik_bench_import.wav")
+    sf.write(file_path, np.random.uniform(-0.5, 0.5, (num_frames, num_channels)).astype(np.float32), sample_rate, subtype='PCM_16')
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    audio_data, file_sample_rate = sf.read(file_path, dtype='float32', always_2d=True)
+    sound = AdikSound(name="Bench Import", audio_data=audio_data,
+                      sample_rate=file_sample_rate, num_channels=audio_data.shape[1])
+    AdikWaveHandler.init_peaks(sound, file_path)
+    read_time = time.perf_counter() - start_time
+    read_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del audio_data, sound
+
+    progress_calls = []
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    sound = AdikWaveHandler.import_wav(file_path, progress_callback=lambda frames_read, total: progress_calls.append(frames_read))
+    import_time = time.perf_counter() - start_time
+    import_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    os.remove(file_path)
+
+    print(f"Chargement d'un fichier PCM 16 bits de {minutes:g} min ({sound.audio_data.nbytes / 1e6:.0f} Mo décodés):")
+    print(f"  sf.read puis construction: {read_time:.2f} s, pic mémoire: {read_peak / 1e6:.1f} Mo")
+    print(f"  Lecture par blocs: {import_time:.2f} s, pic mémoire: {import_peak / 1e6:.1f} Mo ({len(progress_calls)} appels de progression)")
+    return import_peak
+
+#----------------------------------------
+
+def bench_compact_sound(num_tracks=16, block_size=512, num_blocks=200, num_channels=2, sample_rate=44100):
+    """
+    Compare la mémoire et le coût d'un bloc du callback pour des pistes stockées en float32,
+    en int16 et en float16 (AdikCompactSound, converties en float32 bloc par bloc).
+    Affiche aussi le pic d'allocation d'un bloc du callback pour chaque format.
+    """
+    from adik_compact_sound import AdikCompactSound
+    player = _make_player(num_tracks, block_size, num_blocks, num_channels, sample_rate)
+    # Des sons 16 bits, comme ceux d'un fichier PCM 16 bits
+    for track in player.track_list:
+        sound = track.clips[0].sound
+        sound.set_audio_data(np.round(sound.audio_data * 32768.0).astype(np.float32) / np.float32(32768.0))
+    float_sounds = [track.clips[0].sound for track in player.track_list]
+    block_bytes = block_size * num_channels * np.dtype(np.float32).itemsize
+
+    print(f"Sons compacts ({num_tracks} pistes, blocs de {block_size} frames):")
+    for sample_format in ("float32", "int16", "float16"):
+        for track, float_sound in zip(player.track_list, float_sounds):
+            if sample_format == "float32":
+                sound = float_sound
+            else:
+                # Échelle des fichiers 16 bits: l'int16 garde exactement les samples
+                sound = AdikCompactSound.from_sound(float_sound, sample_format,
+                                                    scale=1.0 / 32768.0 if sample_format == "int16" else None)
+            track.set_audio_sound(sound)
+        player._update_params()
+        memory_size = sum(track.clips[0].sound.get_memory_size() for track in player.track_list)
+        block_time = _time_callback(player, num_blocks)
+        alloc_peak = _measure_callback_allocations(player, num_blocks)
+        print(f"  {sample_format:7}: {memory_size / 1e6:.1f} Mo, {block_time * 1e6:.0f} µs par bloc, "
+              f"allocations par bloc: {alloc_peak} octets (bloc: {block_bytes})")
+
+#----------------------------------------
+
+def _loop_sine_wave(freq, dur, amp, sample_rate, num_channels):
+    """ Ancien générateur sinus (boucles Python, un math.sin par frame), gardé pour la comparaison. """
+    import math
+    num_frames = int(sample_rate * dur)
+    audio_buffer = np.zeros(num_frames * num_channels, dtype=np.float32)
+    for frame_idx in range(num_frames):
+        current_time = float(frame_idx) / sample_rate
+        sample_value = amp * math.sin(current_time * 2 * math.pi * freq)
+        for channel_idx in range(num_channels):
+            audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
+    return audio_buffer
+
+#----------------------------------------
+
+def _loop_square_wave(freq, dur, amp, sample_rate, num_channels, duty_cycle):
+    """ Ancien générateur d'onde carrée (boucles Python), gardé pour la comparaison. """
+    import math
+    num_frames = int(sample_rate * dur)
+    audio_buffer = np.zeros(num_frames * num_channels, dtype=np.float32)
+    for frame_idx in range(num_frames):
+        current_time = float(frame_idx) / sample_rate
+        sample_value = amp if math.fmod(current_time * freq, 1.0) < duty_cycle else -amp
+        for channel_idx in range(num_channels):
+            audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
+    return audio_buffer
+
+#----------------------------------------
+
+def _loop_white_noise(dur, amp, sample_rate, num_channels):
+    """ Ancien générateur de bruit blanc (un np.random.uniform par sample), gardé pour la comparaison. """
+    total_samples = int(sample_rate * dur) * num_channels
+    audio_buffer = np.zeros(total_samples, dtype=np.float32)
+    for sample_idx in range(total_samples):
+        audio_buffer[sample_idx] = np.random.uniform(-amp, amp)
+    return audio_buffer
+
+#----------------------------------------
+
+def _time_call(func, *args, **kwargs):
+    """ Retourne (résultat, durée en secondes) d'un appel. """
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+#----------------------------------------
+
+def bench_generators(sample_rate=44100):
+    """
+    Compare les anciens générateurs (boucles Python) et les générateurs vectorisés d'AdikSound,
+    avec les sons de load_demo et les clics du métronome.
+    """
+    cases = [
+        ("Sinus 440 Hz, 3 s, stéréo", lambda: _loop_sine_wave(440, 3, 0.2, sample_rate, 2),
+         lambda: AdikSound.sine_wave(freq=440, dur=3, amp=0.2, sample_rate=sample_rate, num_channels=2)),
+        ("Carré 220 Hz, 2 s, mono", lambda: _loop_square_wave(220, 2, 0.1, sample_rate, 1, 0.6),
+         lambda: AdikSound.square_wave(freq=220, dur=2, amp=0.1, sample_rate=sample_rate, num_channels=1, duty_cycle=0.6)),
+        ("Bruit blanc, 5 s, mono", lambda: _loop_white_noise(5, 0.1, sample_rate, 1),
+         lambda: AdikSound.white_noise(dur=5, amp=0.1, sample_rate=sample_rate, num_channels=1, seed=1)),
+        ("Clic du métronome, 50 ms, stéréo", lambda: _loop_sine_wave(880, 0.05, 0.2, sample_rate, 2),
+         lambda: AdikSound.sine_wave(freq=880, dur=0.05, amp=0.2, sample_rate=sample_rate, num_channels=2)),
+    ]
+    print("Générateurs de formes d'onde (boucles Python / vectorisés):")
+    for label, loop_func, vec_func in cases:
+        _, loop_time = _time_call(loop_func)
+        _, vec_time = _time_call(vec_func)
+        print(f"  {label}: {loop_time * 1000:.1f} ms / {vec_time * 1000:.2f} ms "
+              f"(x{loop_time / max(vec_time, 1e-9):.0f})")
+
+    _, saw_time = _time_call(AdikSound.saw_wave, freq=110, dur=5, amp=0.3, sample_rate=sample_rate, num_channels=2)
+    _, triangle_time = _time_call(AdikSound.triangle_wave, freq=110, dur=5, amp=0.3, sample_rate=sample_rate, num_channels=2)
+    print(f"  Dent de scie / triangle, 5 s, stéréo: {saw_time * 1000:.2f} ms / {triangle_time * 1000:.2f} ms")
+
+#----------------------------------------
+
+BENCHES = {
+    "mix_kernels": bench_mix_kernels,
+    "callback_track_scaling": bench_callback_track_scaling,
+    "callback_throughput": bench_callback_throughput,
+    "stream_open": bench_stream_open,
+    "peak_overview": bench_peak_overview,
+    "clip_edits": bench_clip_edits,
+    "clip_index_scaling": bench_clip_index_scaling,
+    "undo": bench_undo,
+    "chunk_storage": bench_chunk_storage,
+    "parallel_render": bench_parallel_render,
+    "parallel_bounce": bench_parallel_bounce,
+    "bounce": bench_bounce,
+    "wav_export": bench_wav_export,
+    "wav_import": bench_wav_import,
+    "compact_sound": bench_compact_sound,
+    "generators": bench_generators,
+}
+
+#========================================
+
+if __name__ == "__main__":
+    # Les mesures demandées sur la ligne de commande, ou toutes avec "all" (plusieurs minutes)
+    bench_names = sys.argv[1:]
+    if bench_names == ["all"]:
+        bench_names = list(BENCHES)
+    unknown_names = [name for name in bench_names if name not in BENCHES]
+    if not bench_names or unknown_names:
+        if unknown_names:
+            print(f"Mesures inconnues: {', '.join(unknown_names)}")
+        print(f"Usage: python3 adik_bench.py all | {' '.join(BENCHES)}")
+        sys.exit(1)
+    for name in bench_names:
+        BENCHES[name]()
+
+#----------------------------------------
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+    File: adik_bounce.py
+    Offline bounce of the tracks, split in time slices across a process pool with shared-memory buffers
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# État d'un processus de rendu: segments de mémoire partagée attachés et description des pistes
+_worker_state = {}
+
+class AdikParallelBounce:
+    """
+    Mixage hors ligne (bounce) réparti sur plusieurs processus.
+    Les frames des sons joués par les clips dans la zone de mixage sont copiées une fois, déjà converties
+    aux canaux de leur piste, dans des segments de mémoire partagée (multiprocessing.shared_memory).
+    La zone de mixage est découpée en tranches de temps: chaque processus mixe toutes les pistes
+    sur ses tranches, directement dans le buffer de mixage partagé (les tranches ne se recouvrent pas).
+    Les processus ne reçoivent que des noms de segments et des positions: aucune donnée audio n'est sérialisée.
+    """
+    COPY_FRAMES = 65536 # Taille des blocs de copie des sons vers la mémoire partagée
+    RENDER_FRAMES = 65536 # Taille des blocs de mixage dans un processus
+    SLICES_PER_PROCESS = 4 # Tranches de temps par processus, pour équilibrer la charge
+    MIN_SLICE_FRAMES = 1 << 20 # Tranche minimale (~24 s à 44,1 kHz): un mixage court reste dans le processus courant
+
+    def __init__(self, num_processes=None):
+        self.num_processes = max(1, num_processes or os.cpu_count() or 1)
+
+    #----------------------------------------
+
+    def render(self, track_list, start_frame, end_frame, output_channels):
+        """
+        Mixe les pistes de 'track_list' sur [start_frame, end_frame) avec leurs gains de mixage
+        (AdikTrack.get_mix_gains). Retourne le buffer de mixage (1D entrelacé, 'output_channels' canaux).
+        Avec un seul processus, ou une seule tranche, le mixage est fait dans le processus courant.
+        """
+        mix_length = max(0, end_frame - start_frame)
+        segments = []
+        try:
+            sound_specs, track_specs = self._share_sounds(track_list, start_frame, end_frame, segments)
+            mix_segment = self._create_segment(mix_length * output_channels * 4, segments)
+            mix_spec = (mix_segment.name, mix_length, output_channels)
+
+            slices = self.get_slices(mix_length)
+            num_processes = min(self.num_processes, len(slices))
+            if num_processes <= 1:
+                AdikParallelBounce._init_worker(sound_specs, track_specs, mix_spec)
+                try:
+                    for slice_start, slice_length in slices:
+                        AdikParallelBounce._render_slice(slice_start, slice_length)
+                finally:
+                    _worker_state.clear()
+            else:
+                # spawn: les processus ne copient pas l'état du player (threads audio, verrous)
+                with ProcessPoolExecutor(max_workers=num_processes, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=AdikParallelBounce._init_worker,
+                                         initargs=(sound_specs, track_specs, mix_spec)) as executor:
+                    list(executor.map(AdikParallelBounce._render_slice, *zip(*slices)))
+
+            # Copie hors de la mémoire partagée, libérée ensuite
+            mix_data = np.array(np.ndarray(mix_length * output_channels, dtype=np.float32, buffer=mix_segment.buf))
+            return mix_data
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    #----------------------------------------
+
+    def get_slices(self, mix_length):
+        """ Retourne les tranches de temps (début, longueur) du mixage, d'au moins MIN_SLICE_FRAMES frames sauf la dernière. """
+        slice_frames = max(self.MIN_SLICE_FRAMES, math.ceil(mix_length / (self.num_processes * self.SLICES_PER_PROCESS)))
+        return [(slice_start, min(slice_frames, mix_length - slice_start))
+                for slice_start in range(0, mix_length, slice_frames)]
+
+    #----------------------------------------
+
+    @staticmethod
+    def _create_segment(num_bytes, segments):
+        """ Crée un segment de mémoire partagée (rempli de zéros) et l'ajoute à 'segments' pour sa libération. """
+        segment = shared_memory.SharedMemory(create=True, size=max(1, num_bytes))
+        segments.append(segment)
+        return segment
+
+    #----------------------------------------
+
+    def _share_sounds(self, track_list, start_frame, end_frame, segments):
+        """
+        Copie dans la mémoire partagée les frames des sons joués dans la zone de mixage,
+        une fois par son et par nombre de canaux de piste.
+        Retourne (sound_specs, track_specs):
+        - sound_specs: clé -> (nom du segment, première frame copiée, nombre de frames, canaux),
+        - track_specs: une entrée (gains, clips) par piste, chaque clip étant (clé, position dans le mix, frames, frame du son).
+        """
+        spans = {} # clé -> [son, première frame, fin]
+        track_specs = []
+        for track in track_list:
+            clip_specs = []
+            index = track._clip_index
+            first, last = index.find(start_frame, end_frame - start_frame)
+            for clip in index.clips[first:last]:
+                overlap_start = max(start_frame, clip.timeline_start)
+                overlap_end = min(end_frame, clip.timeline_end)
+                if overlap_start >= overlap_end:
+                    continue
+                source_start = clip.source_start + overlap_start - clip.timeline_start
+                source_end = source_start + overlap_end - overlap_start
+                key = (id(clip.sound), track.num_channels)
+                span = spans.get(key)
+                if span is None:
+                    spans[key] = [clip.sound, source_start, source_end]
+                else:
+                    span[1] = min(span[1], source_start)
+                    span[2] = max(span[2], source_end)
+                clip_specs.append((key, overlap_start - start_frame, overlap_end - overlap_start, source_start))
+            if clip_specs:
+                track_specs.append((track.get_mix_gains(), clip_specs))
+
+        sound_specs = {}
+        for key, (sound, span_start, span_end) in spans.items():
+            num_channels = key[1]
+            num_frames = span_end - span_start
+            segment = self._create_segment(num_frames * num_channels * 4, segments)
+            frames_2d = np.ndarray((num_frames, num_channels), dtype=np.float32, buffer=segment.buf)
+            # Les frames au-delà de la fin du son restent à zéro (segment neuf)
+            for frame_pos in range(0, num_frames, self.COPY_FRAMES):
+                frames_to_copy = min(self.COPY_FRAMES, num_frames - frame_pos)
+                sound.read_frames(span_start + frame_pos, frames_to_copy, frames_2d[frame_pos : frame_pos + frames_to_copy])
+            del frames_2d
+            sound_specs[key] = (segment.name, span_start, num_frames, num_channels)
+        return sound_specs, track_specs
+
+    #----------------------------------------
+
+    @staticmethod
+    def _init_worker(sound_specs, track_specs, mix_spec):
+        """ Initialisation d'un processus: attache les segments de mémoire partagée. """
+        segments = []
+        sounds = {}
+        for key, (segment_name, span_start, num_frames, num_channels) in sound_specs.items():
+            segment = shared_memory.SharedMemory(name=segment_name)
+            segments.append(segment)
+            sounds[key] = (np.ndarray((num_frames, num_channels), dtype=np.float32, buffer=segment.buf), span_start)
+        mix_name, mix_length, output_channels = mix_spec
+        mix_segment = shared_memory.SharedMemory(name=mix_name)
+        segments.append(mix_segment)
+        _worker_state['segments'] = segments
+        _worker_state['sounds'] = sounds
+        _worker_state['tracks'] = track_specs
+        _worker_state['mix'] = np.ndarray((mix_length, output_channels), dtype=np.float32, buffer=mix_segment.buf)
+        _worker_state['buffer'] = np.zeros((AdikParallelBounce.RENDER_FRAMES, output_channels), dtype=np.float32)
+
+    #----------------------------------------
+
+    @staticmethod
+    def _render_slice(slice_start, slice_length):
+        """
+        Mixe toutes les pistes sur la tranche [slice_start, slice_start + slice_length) du buffer de mixage.
+        Chaque morceau de clip est multiplié par les gains de sa piste (une piste mono est répartie
+        sur les canaux de sortie), puis additionné en place au buffer de mixage.
+        """
+        sounds = _worker_state['sounds']
+        mix_2d = _worker_state['mix']
+        gain_buffer = _worker_state['buffer']
+        slice_end = slice_start + slice_length
+        for gains, clip_specs in _worker_state['tracks']:
+            for key, mix_pos, num_frames, source_start in clip_specs:
+                overlap_start = max(slice_start, mix_pos)
+                overlap_end = min(slice_end, mix_pos + num_frames)
+                if overlap_start >= overlap_end:
+                    continue
+                sound_frames, span_start = sounds[key]
+                source_pos = source_start + overlap_start - mix_pos - span_start
+                for frame_pos in range(overlap_start, overlap_end, AdikParallelBounce.RENDER_FRAMES):
+                    frames_to_mix = min(AdikParallelBounce.RENDER_FRAMES, overlap_end - frame_pos)
+                    source_frames = sound_frames[source_pos + frame_pos - overlap_start : source_pos + frame_pos - overlap_start + frames_to_mix]
+                    block = gain_buffer[:frames_to_mix]
+                    np.multiply(source_frames, gains, out=block)
+                    np.add(mix_2d[frame_pos : frame_pos + frames_to_mix], block, out=mix_2d[frame_pos : frame_pos + frames_to_mix])
+        return slice_length
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    from adik_track import AdikTrack
+    from adik_sound import AdikSound
+    track_list = []
+    for track_idx in range(4):
+        track = AdikTrack(name=f"Piste {track_idx + 1}", num_channels=2)
+        track.set_audio_sound(AdikSound.sine_wave(freq=220 * (track_idx + 1), dur=2, amp=0.2), offset_frames=track_idx * 1000)
+        track_list.append(track)
+    mix_data = AdikParallelBounce(num_processes=2).render(track_list, 0, 44100 * 3, 2)
+    print(mix_data.size, float(np.abs(mix_data).max()))
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+    File: adik_callback_stats.py
+    Per-block timing statistics of the audio callbacks
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+class AdikCallbackStats:
+    """
+    Statistiques des callbacks audio, mises à jour à chaque bloc.
+    Mesure le temps passé dans chaque phase du callback (en nanosecondes, avec time.perf_counter_ns),
+    le rapport entre le temps du bloc et son budget temps réel (num_frames / sample_rate),
+    et compte les underflows et overflows signalés par le pilote.
+    Tous les tableaux sont préalloués: les mises à jour par bloc n'allouent aucun tableau.
+    """
+    PHASE_NAMES = ('commands', 'input', 'metronome', 'tracks', 'output', 'transport', 'other')
+    PHASE_COMMANDS = 0 # Exécution des commandes postées par l'interface
+    PHASE_INPUT = 1 # Capture de l'entrée
+    PHASE_METRONOME = 2
+    PHASE_TRACKS = 3 # Mixage des pistes
+    PHASE_OUTPUT = 4 # Bus master: copie vers le buffer du pilote
+    PHASE_TRANSPORT = 5 # Avance de la position, boucle et fin de morceau
+    PHASE_OTHER = 6 # Étages de rendu ajoutés
+    # Histogramme des durées par phase: case i = durée < 2**i microsecondes
+    NUM_TIME_BINS = 24
+    # Histogramme des rapports au budget: cases de RATIO_BIN_WIDTH, la dernière case reçoit tout le reste
+    RATIO_BIN_WIDTH = 0.05
+    NUM_RATIO_BINS = 41 # 0 à 2.0, puis > 2.0
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        num_phases = len(self.PHASE_NAMES)
+        self._block_start_ns = 0
+        self._block_phase_ns = np.zeros(num_phases, dtype=np.int64) # Durées des phases du bloc en cours
+        self.phase_total_ns = np.zeros(num_phases, dtype=np.int64)
+        self.phase_max_ns = np.zeros(num_phases, dtype=np.int64)
+        self.phase_histograms = np.zeros((num_phases, self.NUM_TIME_BINS), dtype=np.int64)
+        self.ratio_histogram = np.zeros(self.NUM_RATIO_BINS, dtype=np.int64)
+        self.reset()
+
+    #----------------------------------------
+
+    def reset(self):
+        """ Remet toutes les statistiques à zéro. """
+        self.phase_total_ns.fill(0)
+        self.phase_max_ns.fill(0)
+        self.phase_histograms.fill(0)
+        self.ratio_histogram.fill(0)
+        self.block_count = 0
+        self.total_ns = 0
+        self.max_block_ns = 0
+        self.last_ratio = 0.0
+        self.max_ratio = 0.0
+        self.ratio_sum = 0.0
+        self.deadline_misses = 0 # Blocs dont le traitement a dépassé le budget temps réel
+        self.output_underflows = 0
+        self.output_overflows = 0
+        self.input_underflows = 0
+        self.input_overflows = 0
+
+    #----------------------------------------
+
+    def begin_block(self, start_ns):
+        """ Début d'un bloc: start_ns est l'instant d'entrée dans le callback. """
+        self._block_start_ns = start_ns
+        self._block_phase_ns.fill(0)
+
+    #----------------------------------------
+
+    def add_phase_time(self, phase_idx, phase_ns):
+        """ Ajoute une durée (en ns) à une phase du bloc en cours (index dans PHASE_NAMES). """
+        self._block_phase_ns[phase_idx] += phase_ns
+
+    #----------------------------------------
+
+    def count_status(self, status):
+        """ Compte les underflows et overflows signalés par le pilote (sounddevice.CallbackFlags). """
+        if not status:
+            return
+        if getattr(status, 'output_underflow', False):
+            self.output_underflows += 1
+        if getattr(status, 'output_overflow', False):
+            self.output_overflows += 1
+        if getattr(status, 'input_underflow', False):
+            self.input_underflows += 1
+        if getattr(status, 'input_overflow', False):
+            self.input_overflows += 1
+
+    #----------------------------------------
+
+    def end_block(self, num_frames, end_ns):
+        """
+        Fin du bloc: end_ns est l'instant de sortie du callback.
+        Met à jour les totaux, les maximums et les histogrammes.
+        """
+        for phase_idx in range(len(self.PHASE_NAMES)):
+            phase_ns = int(self._block_phase_ns[phase_idx])
+            self.phase_total_ns[phase_idx] += phase_ns
+            if phase_ns > self.phase_max_ns[phase_idx]:
+                self.phase_max_ns[phase_idx] = phase_ns
+            time_bin = min((phase_ns // 1000).bit_length(), self.NUM_TIME_BINS - 1)
+            self.phase_histograms[phase_idx, time_bin] += 1
+
+        block_ns = end_ns - self._block_start_ns
+        self.block_count += 1
+        self.total_ns += block_ns
+        if block_ns > self.max_block_ns:
+            self.max_block_ns = block_ns
+
+        budget_ns = num_frames * 1e9 / self.sample_rate
+        ratio = block_ns / budget_ns if budget_ns > 0 else 0.0
+        self.last_ratio = ratio
+        self.ratio_sum += ratio
+        if ratio > self.max_ratio:
+            self.max_ratio = ratio
+        if ratio > 1.0:
+            self.deadline_misses += 1
+        ratio_bin = min(int(ratio / self.RATIO_BIN_WIDTH), self.NUM_RATIO_BINS - 1)
+        self.ratio_histogram[ratio_bin] += 1
+
+    #----------------------------------------
+
+    def get_summary(self):
+        """
+        Retourne une copie des statistiques sous forme de dictionnaire.
+        Les durées sont en microsecondes.
+        """
+        block_count = max(self.block_count, 1)
+        phases = {}
+        for phase_idx, phase_name in enumerate(self.PHASE_NAMES):
+            phases[phase_name] = {
+                'mean_us': self.phase_total_ns[phase_idx] / block_count / 1000,
+                'max_us': self.phase_max_ns[phase_idx] / 1000,
+                'histogram': self.phase_histograms[phase_idx].copy(),
+            }
+        return {
+            'block_count': self.block_count,
+            'mean_block_us': self.total_ns / block_count / 1000,
+            'max_block_us': self.max_block_ns / 1000,
+            'last_ratio': self.last_ratio,
+            'mean_ratio': self.ratio_sum / block_count,
+            'max_ratio': self.max_ratio,
+            'deadline_misses': self.deadline_misses,
+            'output_underflows': self.output_underflows,
+            'output_overflows': self.output_overflows,
+            'input_underflows': self.input_underflows,
+            'input_overflows': self.input_overflows,
+            'phases': phases,
+            'ratio_histogram': self.ratio_histogram.copy(),
+        }
+
+    #----------------------------------------
+
+    @staticmethod
+    def format_summary(summary):
+        """ Retourne un résumé lisible des statistiques, ligne par ligne. """
+        lines = [
+            f"Blocs: {summary['block_count']}, Temps moyen: {summary['mean_block_us']:.1f} µs, Max: {summary['max_block_us']:.1f} µs",
+            f"Charge: {summary['last_ratio'] * 100:.1f}% (moy {summary['mean_ratio'] * 100:.1f}%, max {summary['max_ratio'] * 100:.1f}%), "
+            f"Échéances manquées: {summary['deadline_misses']}",
+            f"Xruns: Sortie underflow {summary['output_underflows']}, overflow {summary['output_overflows']}; "
+            f"Entrée underflow {summary['input_underflows']}, overflow {summary['input_overflows']}",
+        ]
+        phase_strs = [f"{name}: {values['mean_us']:.1f}/{values['max_us']:.1f}" for name, values in summary['phases'].items()]
+        lines.append("Phases (moy/max µs): " + ", ".join(phase_strs))
+        return lines
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    stats = AdikCallbackStats(44100)
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+    File: adik_chunk_sound.py
+    Sound stored in fixed-size chunks, shared copy-on-write with the sounds derived from it
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_sound import AdikSound
+from adik_chunk_storage import AdikChunkStorage
+
+class AdikChunkSound(AdikSound):
+    """
+    Son stocké par morceaux (AdikChunkStorage) au lieu d'un seul buffer contigu.
+    - append_data() et resize() ne recopient pas le son: O(taille ajoutée + un morceau).
+    - copy() crée un son dérivé qui partage tous les morceaux; erase_range() et write_frames()
+      ne copient que les morceaux modifiés.
+    - read_frames() lit un bloc morceau par morceau: le callback audio n'a pas besoin de joindre les morceaux.
+    audio_data joint les morceaux en un buffer (copie) pour les fonctions qui ont besoin de tout le son.
+    """
+    is_chunked = True
+
+    def __init__(self, name="Untitled Sound", audio_data=None, sample_rate=44100, num_channels=1,
+                 storage=None, chunk_frames=AdikChunkStorage.CHUNK_FRAMES):
+        if storage is None:
+            storage = AdikChunkStorage(num_channels, chunk_frames)
+            if audio_data is not None:
+                storage.append(np.asarray(audio_data, dtype=np.float32))
+        self.storage = storage
+        self._joined_data = None # Buffer joint, gardé jusqu'à la prochaine modification
+        self._is_initialized = False
+        super().__init__(name=name, audio_data=None, sample_rate=sample_rate, num_channels=num_channels)
+        # Le constructeur de base installe un buffer vide: ignoré, les données sont dans le stockage
+        self._is_initialized = True
+
+    #----------------------------------------
+
+    @property
+    def audio_data(self):
+        """ Buffer complet du son (1D entrelacé), joint à la demande. """
+        if self._joined_data is None:
+            self._joined_data = self.storage.to_array()
+        return self._joined_data
+
+    @audio_data.setter
+    def audio_data(self, audio_data):
+        if not self._is_initialized or audio_data is None:
+            return
+        # Un nouveau buffer complet remplace le stockage
+        self.storage = AdikChunkStorage.from_array(np.asarray(audio_data, dtype=np.float32).reshape(-1),
+                                                   self.num_channels, self.storage.chunk_frames)
+        self._joined_data = None
+
+    #----------------------------------------
+
+    def update_params(self):
+        """ Les longueurs viennent du stockage, sans joindre les morceaux. """
+        self._length_frames = self.storage.num_frames
+        self._length_samples = self.storage.num_frames * self.num_channels
+        self._length_seconds = self.storage.num_frames / self.sample_rate if self.sample_rate > 0 else 0.0
+
+    #----------------------------------------
+
+    def get_length_samples(self):
+        return self._length_samples
+
+    #----------------------------------------
+
+    def get_length_frames(self):
+        return self._length_frames
+
+    #----------------------------------------
+
+    def get_duration_seconds(self):
+        return self._length_seconds
+
+    #----------------------------------------
+
+    def get_memory_size(self):
+        """ Mémoire des morceaux en RAM (les morceaux partagés avec un autre son sont comptés pour chacun). """
+        return self.storage.nbytes
+
+    #----------------------------------------
+
+    def move_to_file(self, file_path):
+        """ Écrit le son dans un fichier .npy; les morceaux deviennent des vues en lecture seule de sa projection mémoire. """
+        np.save(file_path, self.storage.to_array())
+        self.storage = AdikChunkStorage.from_array(np.load(file_path, mmap_mode='r'), self.num_channels,
+                                                   self.storage.chunk_frames, copy=False)
+        self._joined_data = None
+
+    #----------------------------------------
+
+    def _on_modified(self, start_frame, end_frame=None):
+        """ Après une modification des frames [start_frame, end_frame): longueurs, buffer joint et crêtes. """
+        self._joined_data = None
+        self.update_params()
+        # Seules les crêtes de la zone modifiée sont recalculées
+        if self._peaks is not None:
+            self._peaks.update_range(start_frame, end_frame)
+
+    #----------------------------------------
+
+    def append_data(self, data):
+        """ Ajoute des données à la fin du son, sans recopier les morceaux existants. """
+        start_frame = self.storage.num_frames
+        self.storage.append(np.asarray(data, dtype=np.float32))
+        self._on_modified(start_frame)
+
+    #----------------------------------------
+
+    def append_chunk(self, chunk_data):
+        """ Ajoute un morceau plein, adopté sans copie s'il tombe sur une frontière de morceau. """
+        start_frame = self.storage.num_frames
+        self.storage.append_chunk(chunk_data)
+        self._on_modified(start_frame)
+
+    #----------------------------------------
+
+    def resize(self, num_frames):
+        """ Raccourcit le son, ou l'allonge avec du silence, sans recopier les morceaux gardés. """
+        start_frame = min(num_frames, self.storage.num_frames)
+        self.storage.resize(num_frames)
+        self._on_modified(start_frame)
+
+    #----------------------------------------
+
+    def write_frames(self, start_frame, data):
+        """ Remplace les frames à partir de start_frame. Seuls les morceaux touchés sont copiés s'ils sont partagés. """
+        data = np.asarray(data, dtype=np.float32)
+        self.storage.write(start_frame, data)
+        self._on_modified(start_frame, start_frame + data.size // self.num_channels)
+
+    #----------------------------------------
+
+    def erase_range(self, start_frame, end_frame):
+        """ Remplace les frames [start_frame, end_frame) par du silence. """
+        self.storage.fill(start_frame, end_frame)
+        self._on_modified(start_frame, end_frame)
+
+    #----------------------------------------
+
+    def copy(self, name=None):
+        """ Retourne un son dérivé qui partage tous les morceaux de celui-ci (copie à l'écriture). """
+        sound = AdikChunkSound(name=name if name is not None else f"{self.name}_copy",
+                               sample_rate=self.sample_rate, num_channels=self.num_channels,
+                               storage=self.storage.copy())
+        sound.derive_peaks(self, sound.length_frames)
+        return sound
+
+    #----------------------------------------
+
+    def _get_frames(self, start_frame, num_frames):
+        """ Vue sans copie si les frames tiennent dans un morceau, sinon copie des morceaux concernés. """
+        frames = self.storage.get_view(start_frame, num_frames)
+        if frames is None:
+            frames = np.zeros((num_frames, self.num_channels), dtype=np.float32)
+            self.storage.read(start_frame, num_frames, frames)
+        return frames
+
+    #----------------------------------------
+
+    def read_frames(self, start_frame, num_frames, out):
+        """ Comme AdikSound.read_frames, morceau par morceau, sans joindre les morceaux ni allouer de buffer. """
+        num_frames = min(num_frames, self.length_frames - start_frame, out.shape[0])
+        if start_frame < 0 or num_frames <= 0:
+            return 0
+        if out.shape[1] == self.num_channels:
+            return self.storage.read(start_frame, num_frames, out)
+        for block_pos, chunk_frames in self.storage.iter_blocks(start_frame, num_frames):
+            AdikSound.copy_frames(chunk_frames, out[block_pos : block_pos + chunk_frames.shape[0]])
+        return num_frames
+
+    #----------------------------------------
+
+    def __str__(self):
+        return (f"AdikChunkSound(Name='{self.name}', SR={self.sample_rate}, "
+                f"Channels={self.num_channels}, Duration={self.get_duration_seconds():.2f}s, "
+                f"Samples={self.get_length_samples()}, Chunks={len(self.storage.chunks)})")
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    sound = AdikChunkSound(name="Chunks", audio_data=np.random.uniform(-0.5, 0.5, 200000).astype(np.float32))
+    derived_sound = sound.copy()
+    derived_sound.erase_range(1000, 2000)
+    shared_chunks = sum(chunk is derived_chunk for chunk, derived_chunk in zip(sound.storage.chunks, derived_sound.storage.chunks))
+    print(derived_sound, f"Morceaux partagés: {shared_chunks}")
+    input("It's OK...")
+
+#----------------------------------------
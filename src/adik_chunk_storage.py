@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+    File: adik_chunk_storage.py
+    Paged audio storage: fixed-size chunks shared copy-on-write between sounds
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_sound import AdikSound
+
+class AdikChunkStorage:
+    """
+    Stockage audio par pages: une liste de morceaux (chunks) de 'chunk_frames' frames,
+    chacun un tableau float32 (frames, canaux). Le dernier morceau n'est rempli que jusqu'à num_frames.
+    - Ajouter des frames ne remplit que le dernier morceau et en alloue de nouveaux: O(taille ajoutée + un morceau),
+      sans recopier ce qui est déjà stocké.
+    - copy() partage tous les morceaux avec le nouveau stockage (copie à l'écriture):
+      un morceau partagé est marqué en lecture seule, et un stockage le copie avant de l'écrire.
+    - read() lit un bloc morceau par morceau, sans jamais joindre les morceaux.
+    """
+    CHUNK_FRAMES = 65536
+
+    def __init__(self, num_channels, chunk_frames=CHUNK_FRAMES):
+        self.num_channels = num_channels
+        self.chunk_frames = chunk_frames
+        self.chunks = []
+        self.num_frames = 0
+
+    #----------------------------------------
+
+    @classmethod
+    def from_array(cls, audio_data, num_channels, chunk_frames=CHUNK_FRAMES, copy=True):
+        """
+        Crée un stockage à partir d'un buffer 1D entrelacé.
+        Avec copy=False, les morceaux sont des vues du buffer, en lecture seule (ex: np.memmap d'un fichier):
+        seuls les morceaux écrits ensuite sont copiés en mémoire.
+        """
+        storage = cls(num_channels, chunk_frames)
+        num_frames = audio_data.size // num_channels
+        if copy:
+            storage.append(audio_data[:num_frames * num_channels])
+            return storage
+        frames_2d = audio_data[:num_frames * num_channels].reshape(num_frames, num_channels)
+        for start_frame in range(0, num_frames, chunk_frames):
+            chunk = frames_2d[start_frame : start_frame + chunk_frames]
+            if chunk.shape[0] < chunk_frames:
+                # Dernier morceau incomplet: copié à sa taille pleine, pour les ajouts suivants
+                full_chunk = np.zeros((chunk_frames, num_channels), dtype=np.float32)
+                full_chunk[:chunk.shape[0]] = chunk
+                chunk = full_chunk
+            else:
+                chunk = chunk.view()
+                chunk.flags.writeable = False
+            storage.chunks.append(chunk)
+        storage.num_frames = num_frames
+        return storage
+
+    #----------------------------------------
+
+    @property
+    def nbytes(self):
+        """ Mémoire des morceaux en RAM (les morceaux projetés depuis un fichier ne comptent pas). """
+        return sum(chunk.nbytes for chunk in self.chunks if not AdikSound.is_file_mapped(chunk))
+
+    #----------------------------------------
+
+    def copy(self):
+        """ Retourne un stockage qui partage tous les morceaux de celui-ci, en copie à l'écriture. """
+        for chunk in self.chunks:
+            chunk.flags.writeable = False
+        storage = AdikChunkStorage(self.num_channels, self.chunk_frames)
+        storage.chunks = list(self.chunks)
+        storage.num_frames = self.num_frames
+        return storage
+
+    #----------------------------------------
+
+    def _new_chunk(self):
+        return np.zeros((self.chunk_frames, self.num_channels), dtype=np.float32)
+
+    #----------------------------------------
+
+    def _get_writable_chunk(self, chunk_idx):
+        """ Retourne le morceau, copié d'abord s'il est partagé (copie à l'écriture). """
+        chunk = self.chunks[chunk_idx]
+        if not chunk.flags.writeable:
+            chunk = np.array(chunk, dtype=np.float32)
+            self.chunks[chunk_idx] = chunk
+        return chunk
+
+    #----------------------------------------
+
+    def append(self, audio_data):
+        """ Ajoute des frames à la fin (buffer 1D entrelacé, ou 2D (frames, canaux)). """
+        frames_2d = audio_data.reshape(-1, self.num_channels)
+        num_frames = frames_2d.shape[0]
+        data_pos = 0
+        while data_pos < num_frames:
+            chunk_idx, chunk_pos = divmod(self.num_frames, self.chunk_frames)
+            if chunk_idx == len(self.chunks):
+                self.chunks.append(self._new_chunk())
+            chunk = self._get_writable_chunk(chunk_idx)
+            frames_to_copy = min(self.chunk_frames - chunk_pos, num_frames - data_pos)
+            chunk[chunk_pos : chunk_pos + frames_to_copy] = frames_2d[data_pos : data_pos + frames_to_copy]
+            data_pos += frames_to_copy
+            self.num_frames += frames_to_copy
+
+    #----------------------------------------
+
+    def append_chunk(self, chunk_data):
+        """
+        Ajoute un morceau complet sans le copier, s'il tombe sur une frontière de morceau
+        (ex: morceau plein de l'enregistrement); sinon, ses frames sont copiées.
+        Le stockage devient propriétaire du tableau.
+        """
+        chunk = chunk_data.reshape(-1, self.num_channels)
+        if self.num_frames % self.chunk_frames == 0 and chunk.shape[0] == self.chunk_frames and chunk.dtype == np.float32:
+            del self.chunks[self.num_frames // self.chunk_frames:]
+            self.chunks.append(chunk)
+            self.num_frames += self.chunk_frames
+        else:
+            self.append(chunk)
+
+    #----------------------------------------
+
+    def resize(self, num_frames):
+        """ Raccourcit le stockage, ou l'allonge avec du silence. """
+        num_frames = max(0, num_frames)
+        if num_frames < self.num_frames:
+            del self.chunks[-(-num_frames // self.chunk_frames):]
+            self.num_frames = num_frames
+            return
+        # Les frames au-delà de l'ancienne fin dans le dernier morceau peuvent contenir d'anciennes données
+        chunk_idx, chunk_pos = divmod(self.num_frames, self.chunk_frames)
+        if chunk_pos > 0:
+            self._get_writable_chunk(chunk_idx)[chunk_pos:] = 0.0
+        while len(self.chunks) * self.chunk_frames < num_frames:
+            self.chunks.append(self._new_chunk())
+        self.num_frames = num_frames
+
+    #----------------------------------------
+
+    def write(self, start_frame, audio_data):
+        """
+        Écrit des frames à partir de start_frame, dans les limites du stockage: comme pour fill(),
+        les frames avant le début du stockage (start_frame négatif) sont ignorées.
+        Seuls les morceaux touchés sont copiés s'ils sont partagés.
+        """
+        frames_2d = audio_data.reshape(-1, self.num_channels)
+        num_frames = min(frames_2d.shape[0], self.num_frames - start_frame)
+        data_pos = max(0, -start_frame)
+        while data_pos < num_frames:
+            chunk_idx, chunk_pos = divmod(start_frame + data_pos, self.chunk_frames)
+            frames_to_copy = min(self.chunk_frames - chunk_pos, num_frames - data_pos)
+            self._get_writable_chunk(chunk_idx)[chunk_pos : chunk_pos + frames_to_copy] = frames_2d[data_pos : data_pos + frames_to_copy]
+            data_pos += frames_to_copy
+
+    #----------------------------------------
+
+    def fill(self, start_frame, end_frame, value=0.0):
+        """ Remplit les frames [start_frame, end_frame) avec 'value' (silence par défaut). """
+        frame_pos = max(0, start_frame)
+        end_frame = min(end_frame, self.num_frames)
+        while frame_pos < end_frame:
+            chunk_idx, chunk_pos = divmod(frame_pos, self.chunk_frames)
+            frames_to_fill = min(self.chunk_frames - chunk_pos, end_frame - frame_pos)
+            self._get_writable_chunk(chunk_idx)[chunk_pos : chunk_pos + frames_to_fill] = value
+            frame_pos += frames_to_fill
+
+    #----------------------------------------
+
+    def get_view(self, start_frame, num_frames):
+        """ Retourne une vue (frames, canaux) sans copie si le bloc tient dans un seul morceau, sinon None. """
+        chunk_idx, chunk_pos = divmod(start_frame, self.chunk_frames)
+        if start_frame < 0 or chunk_pos + num_frames > self.chunk_frames or start_frame + num_frames > self.num_frames:
+            return None
+        return self.chunks[chunk_idx][chunk_pos : chunk_pos + num_frames]
+
+    #----------------------------------------
+
+    def iter_blocks(self, start_frame, num_frames):
+        """ Parcourt le bloc morceau par morceau: (position dans le bloc, vue (frames, canaux) du morceau). """
+        num_frames = min(num_frames, self.num_frames - start_frame)
+        block_pos = 0
+        while block_pos < num_frames:
+            chunk_idx, chunk_pos = divmod(start_frame + block_pos, self.chunk_frames)
+            frames_to_read = min(self.chunk_frames - chunk_pos, num_frames - block_pos)
+            yield block_pos, self.chunks[chunk_idx][chunk_pos : chunk_pos + frames_to_read]
+            block_pos += frames_to_read
+
+    #----------------------------------------
+
+    def read(self, start_frame, num_frames, out):
+        """
+        Copie les frames à partir de start_frame dans 'out' (frames, canaux), morceau par morceau.
+        Retourne le nombre de frames copiées.
+        """
+        if start_frame < 0:
+            return 0
+        num_frames = max(0, min(num_frames, self.num_frames - start_frame, out.shape[0]))
+        block_pos = 0
+        while block_pos < num_frames:
+            chunk_idx, chunk_pos = divmod(start_frame + block_pos, self.chunk_frames)
+            frames_to_read = min(self.chunk_frames - chunk_pos, num_frames - block_pos)
+            out[block_pos : block_pos + frames_to_read] = self.chunks[chunk_idx][chunk_pos : chunk_pos + frames_to_read]
+            block_pos += frames_to_read
+        return num_frames
+
+    #----------------------------------------
+
+    def to_array(self):
+        """ Retourne tout le stockage dans un seul buffer 1D entrelacé (copie). """
+        audio_data = np.empty((self.num_frames, self.num_channels), dtype=np.float32)
+        self.read(0, self.num_frames, audio_data)
+        return audio_data.reshape(-1)
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    storage = AdikChunkStorage(2, chunk_frames=4)
+    storage.append(np.arange(20, dtype=np.float32))
+    shared = storage.copy()
+    shared.fill(1, 3)
+    print(storage.to_array(), shared.to_array(), sum(a is b for a, b in zip(storage.chunks, shared.chunks)))
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+    File: adik_clip.py
+    Clip object: a region of a source sound placed on the timeline of a track
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+from adik_sound import AdikSound
+
+class AdikClip:
+    """
+    Région d'un son source placée sur la timeline d'une piste:
+    les frames [source_start, source_start + length) du son sont jouées à partir de timeline_start.
+    Un clip ne copie pas les données du son: couper, déplacer ou effacer un morceau de piste
+    ne fait que créer de nouveaux clips sur le même son.
+    Un clip n'est pas modifié une fois placé sur une piste (la piste remplace sa liste de clips),
+    le callback audio peut donc le lire sans verrou.
+    """
+    _next_id = 0
+
+    def __init__(self, sound, timeline_start=0, source_start=0, length=None, name=None):
+        self.id = AdikClip._next_id
+        AdikClip._next_id += 1
+        self.sound = sound
+        self.name = name if name is not None else sound.name
+        self.timeline_start = int(timeline_start)
+        self.source_start = max(0, int(source_start))
+        max_length = max(0, sound.length_frames - self.source_start)
+        self.length = max_length if length is None else max(0, min(int(length), max_length))
+        # Vue (frames, canaux de la piste) du son, construite par prepare()
+        self._playback_data = None
+        self._playback_source = None
+        self._playback_channels = None # Canaux de la dernière vue demandée, pour refresh()
+        sound.register_clip(self)
+
+    #----------------------------------------
+
+    @property
+    def timeline_end(self):
+        """ Frame de la timeline qui suit la dernière frame du clip. """
+        return self.timeline_start + self.length
+
+    #----------------------------------------
+
+    @property
+    def source_end(self):
+        return self.source_start + self.length
+
+    #----------------------------------------
+
+    def copy(self, timeline_start=None, source_start=None, length=None):
+        """ Retourne un nouveau clip sur le même son, avec les champs donnés modifiés. """
+        clip = AdikClip(self.sound,
+                        self.timeline_start if timeline_start is None else timeline_start,
+                        self.source_start if source_start is None else source_start,
+                        self.length if length is None else length,
+                        self.name)
+        # Même son: la vue de lecture peut être partagée
+        clip._playback_data = self._playback_data
+        clip._playback_source = self._playback_source
+        clip._playback_channels = self._playback_channels
+        return clip
+
+    #----------------------------------------
+
+    def trimmed(self, start_frame, end_frame):
+        """
+        Retourne la partie du clip comprise entre les frames [start_frame, end_frame) de la timeline,
+        ou None si le clip n'y a aucune frame.
+        """
+        new_start = max(self.timeline_start, start_frame)
+        new_end = min(self.timeline_end, end_frame)
+        if new_end <= new_start:
+            return None
+        if new_start == self.timeline_start and new_end == self.timeline_end:
+            return self
+        return self.copy(timeline_start=new_start,
+                         source_start=self.source_start + (new_start - self.timeline_start),
+                         length=new_end - new_start)
+
+    #----------------------------------------
+
+    def prepare(self, num_channels):
+        """
+        Construit la vue de lecture (frames, canaux de la piste) du son.
+        Sans copie si le son a déjà les canaux de la piste, sinon convertie une seule fois ici,
+        hors du callback audio. Pas de vue pour un son lu en streaming, stocké par morceaux
+        ou en format compact: ses blocs sont lus (et convertis) par read_frames().
+        Pas de vue convertie non plus pour un son projeté depuis un fichier, qui resterait sinon en mémoire.
+        À appeler dans le thread de l'interface: la conversion alloue un buffer de la taille du son.
+        """
+        self._playback_channels = num_channels
+        sound = self.sound
+        if sound.is_streaming or sound.is_chunked or sound.is_compact or sound.audio_data is None:
+            self.release_playback_data()
+            return
+
+        source_data = sound.audio_data
+        if (self._playback_source is source_data and self._playback_data is not None
+                and self._playback_data.shape[1] == num_channels):
+            return
+        num_frames = source_data.size // sound.num_channels
+        if sound.num_channels == num_channels:
+            playback_data = source_data[:num_frames * num_channels]
+        elif AdikSound.is_file_mapped(source_data):
+            self.release_playback_data()
+            return
+        else:
+            playback_data = AdikSound.convert_channels(source_data, sound.num_channels, num_channels, num_frames)
+        self._playback_data = playback_data.reshape(num_frames, num_channels)
+        self._playback_source = source_data
+
+    #----------------------------------------
+
+    def refresh(self):
+        """ Reconstruit la vue de lecture après un changement du buffer du son (thread de l'interface). """
+        if self._playback_channels is not None:
+            self.prepare(self._playback_channels)
+
+    #----------------------------------------
+
+    def release_playback_data(self):
+        """ Oublie la vue de lecture, qui sera reconstruite par prepare(). """
+        self._playback_data = None
+        self._playback_source = None
+
+    #----------------------------------------
+
+    def get_playback_data(self, num_channels):
+        """
+        Retourne la vue de lecture (frames, canaux) du son, ou None pour un son en streaming, par morceaux ou compact.
+        Appelée par le callback audio: la vue n'est jamais construite ici. Si le buffer du son a été remplacé
+        depuis prepare(), elle retourne None, et le clip est lu bloc par bloc par read_frames()
+        jusqu'à ce que refresh() reconstruise la vue dans le thread de l'interface.
+        """
+        sound = self.sound
+        if sound.is_streaming or sound.is_chunked or sound.is_compact:
+            return None
+        playback_data = self._playback_data
+        if (playback_data is None or self._playback_source is not sound.audio_data
+                or playback_data.shape[1] != num_channels):
+            return None
+        return playback_data
+
+    #----------------------------------------
+
+    def get_overlap(self, frame_pos, num_frames):
+        """
+        Retourne (début dans le bloc, début dans le son, nombre de frames) de la partie du clip
+        qui tombe dans le bloc [frame_pos, frame_pos + num_frames) de la timeline.
+        Le nombre de frames est 0 si le clip n'est pas dans le bloc.
+        """
+        overlap_start = max(frame_pos, self.timeline_start)
+        overlap_end = min(frame_pos + num_frames, self.timeline_end)
+        if overlap_end <= overlap_start:
+            return 0, 0, 0
+        return (overlap_start - frame_pos,
+                self.source_start + (overlap_start - self.timeline_start),
+                overlap_end - overlap_start)
+
+    #----------------------------------------
+
+    def __str__(self):
+        return (f"AdikClip(ID={self.id}, Sound='{self.sound.name}', Timeline={self.timeline_start}-{self.timeline_end}, "
+                f"Source={self.source_start}-{self.source_end})")
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    sound = AdikSound.sine_wave(dur=1, amp=0.5)
+    clip = AdikClip(sound, timeline_start=1000)
+    print(clip, clip.trimmed(2000, 3000))
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+    File: adik_clip_index.py
+    Interval index of the clips of a track, for the block lookup of the audio callback
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+class AdikClipIndex:
+    """
+    Index des clips d'une piste, triés par début sur la timeline.
+    Les clips qui recouvrent un bloc sont tous dans l'intervalle d'index [first, last):
+    - last: premier clip qui commence après la fin du bloc (bisection sur les débuts),
+    - first: premier clip dont la fin, ou celle d'un clip précédent, dépasse le début du bloc
+      (bisection sur le maximum cumulé des fins, qui est croissant).
+    Un clip de l'intervalle peut ne pas toucher le bloc (clip court après un long clip superposé):
+    l'appelant vérifie chaque clip.
+    Un seek coûte O(log n); en lecture séquentielle, le curseur du bloc précédent est avancé
+    en O(1) amorti. L'index n'est pas modifié une fois construit: la piste le remplace à chaque édition.
+    """
+    def __init__(self, clips):
+        self.clips = clips
+        self.starts = [clip.timeline_start for clip in clips]
+        self.max_ends = list(accumulate((clip.timeline_end for clip in clips), max))
+        self.has_streaming = any(clip.sound.is_streaming for clip in clips)
+
+    #----------------------------------------
+
+    def __len__(self):
+        return len(self.starts)
+
+    #----------------------------------------
+
+    def find(self, frame_pos, num_frames):
+        """ Retourne l'intervalle d'index (first, last) des clips qui peuvent recouvrir le bloc, par bisection. """
+        return (bisect_right(self.max_ends, frame_pos),
+                bisect_left(self.starts, frame_pos + num_frames))
+
+    #----------------------------------------
+
+    def find_from_cursor(self, frame_pos, num_frames, cursor):
+        """
+        Comme find(), en partant du curseur [index, début, fin, first, last] du bloc précédent,
+        puis met à jour le curseur en place (sans allocation).
+        Le curseur n'est avancé que si le bloc suit ou recouvre le précédent sans le dépasser en arrière;
+        sinon (seek, bouclage, autre index) l'intervalle est retrouvé par bisection.
+        """
+        block_end = frame_pos + num_frames
+        if cursor[0] is self and cursor[1] <= frame_pos <= cursor[2] <= block_end:
+            first = cursor[3]
+            last = cursor[4]
+            max_ends = self.max_ends
+            starts = self.starts
+            num_clips = len(starts)
+            while first < num_clips and max_ends[first] <= frame_pos:
+                first += 1
+            while last < num_clips and starts[last] < block_end:
+                last += 1
+        else:
+            first = bisect_right(self.max_ends, frame_pos)
+            last = bisect_left(self.starts, block_end)
+            cursor[0] = self
+        cursor[1] = frame_pos
+        cursor[2] = block_end
+        cursor[3] = first
+        cursor[4] = last
+        return first, last
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    from adik_sound import AdikSound
+    from adik_clip import AdikClip
+    sound = AdikSound.sine_wave(dur=1, amp=0.5)
+    index = AdikClipIndex([AdikClip(sound, clip_idx * 1000, clip_idx * 100, 1000) for clip_idx in range(20)])
+    cursor = [None, 0, 0, 0, 0]
+    print(index.find(2500, 512), index.find_from_cursor(2500, 512, cursor), index.find_from_cursor(3012, 512, cursor))
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+    File: adik_command_queue.py
+    Single Producer / Single Consumer command queue between the UI thread and the audio thread
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+from collections import deque
+
+class AdikCommandQueue:
+    """
+    File de commandes sans verrou côté audio.
+    Le thread de l'interface poste des commandes (fonction, arguments),
+    le callback audio les exécute toutes au début de chaque bloc.
+    Repose sur deque.append et deque.popleft, qui sont atomiques:
+    le callback n'attend jamais un verrou tenu par l'interface.
+    """
+    def __init__(self):
+        self._queue = deque()
+        self.posted_count = 0
+        self.executed_count = 0
+
+    #----------------------------------------
+
+    def __len__(self):
+        return len(self._queue)
+
+    #----------------------------------------
+
+    def post(self, func, *args):
+        """ Côté producteur: ajoute une commande à la file. """
+        self._queue.append((func, args))
+        self.posted_count += 1
+
+    #----------------------------------------
+
+    def drain(self):
+        """
+        Côté consommateur: exécute toutes les commandes en attente, dans l'ordre.
+        Une commande en erreur est affichée et n'empêche pas les suivantes.
+        Retourne le nombre de commandes exécutées.
+        """
+        num_commands = 0
+        queue = self._queue
+        while queue:
+            func, args = queue.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"CommandQueue: Erreur dans la commande {getattr(func, '__name__', func)}: {e}")
+            num_commands += 1
+        self.executed_count += num_commands
+        return num_commands
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    queue = AdikCommandQueue()
+    queue.post(print, "Commande exécutée")
+    print(queue.drain())
+
+#----------------------------------------
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+    File: adik_compact_sound.py
+    Sound kept in memory as int16 or float16 samples, converted to float32 block by block
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import numpy as np
+
+from adik_sound import AdikSound
+
+class AdikCompactSound(AdikSound):
+    """
+    Son gardé en mémoire dans un format compact: int16 ou float16 (2 octets par sample au lieu de 4),
+    avec un facteur d'échelle (sample float32 = sample stocké * scale).
+    Seuls les blocs lus (lecture, mixage, crêtes, export) sont convertis en float32:
+    read_frames() convertit directement dans le buffer de la piste, sans buffer intermédiaire.
+    Un fichier 16 bits chargé en int16 occupe en mémoire la même taille que sur le disque.
+
+    Comme pour AdikStreamSound, les fonctions d'édition qui ont besoin de tout le buffer (audio_data)
+    le convertissent en entier une seule fois: le son n'est alors plus compact.
+    """
+    is_compact = True
+    SAMPLE_FORMATS = ("int16", "float16")
+    CONVERT_FRAMES = 65536 # Taille des blocs de conversion
+
+    def __init__(self, name="Untitled Sound", compact_data=None, scale=1.0, sample_rate=44100, num_channels=1):
+        if compact_data is None:
+            compact_data = np.array([], dtype=np.int16)
+        if compact_data.dtype.name not in self.SAMPLE_FORMATS:
+            raise ValueError(f"Format compact non géré: {compact_data.dtype.name}.")
+        self.compact_data = np.ascontiguousarray(compact_data).reshape(-1)
+        self.sample_format = self.compact_data.dtype.name
+        self.scale = np.float32(scale)
+        self._local = threading.local() # Buffers de conversion, un par thread lecteur
+        self._audio_data = None # Buffer float32 complet, seulement s'il est demandé
+
+        super().__init__(name=name, audio_data=None, sample_rate=sample_rate, num_channels=num_channels)
+        # Le constructeur de base a installé un buffer vide: on revient au stockage compact
+        self._audio_data = None
+        self.update_params()
+
+    #----------------------------------------
+
+    @classmethod
+    def from_sound(cls, sound, sample_format="int16", name=None, scale=None):
+        """
+        Retourne une version compacte de 'sound', convertie bloc par bloc (sans buffer float32 complet).
+        En int16, l'échelle par défaut est calculée sur la crête du son, pour garder toute la résolution
+        des sons faibles; scale=1/32768 garde exactement un son issu d'un fichier 16 bits.
+        """
+        if sample_format not in cls.SAMPLE_FORMATS:
+            raise ValueError(f"Format compact non géré: {sample_format}.")
+        num_channels = sound.num_channels
+        compact_data = np.empty(sound.length_frames * num_channels, dtype=sample_format)
+        compact_2d = compact_data.reshape(-1, num_channels)
+        if scale is None and sample_format == "float16":
+            scale = 1.0
+        elif scale is None:
+            peak = 0.0
+            for frames in sound.iter_blocks(0, -1, cls.CONVERT_FRAMES):
+                peak = max(peak, float(np.max(np.abs(frames), initial=0.0)))
+            scale = peak / 32767.0 if peak > 0 else 1.0 / 32768.0
+        inv_scale = np.float32(1.0 / scale)
+        frame_pos = 0
+        for frames in sound.iter_blocks(0, -1, cls.CONVERT_FRAMES):
+            dest = compact_2d[frame_pos : frame_pos + frames.shape[0]]
+            if sample_format == "int16":
+                np.clip(np.rint(frames * inv_scale), -32768, 32767, out=dest, casting='unsafe')
+            else:
+                dest[:] = frames
+            frame_pos += frames.shape[0]
+        return cls(name=name if name is not None else sound.name, compact_data=compact_data, scale=scale,
+                   sample_rate=sound.sample_rate, num_channels=num_channels)
+
+    #----------------------------------------
+
+    @property
+    def audio_data(self):
+        """
+        Buffer complet du son (1D entrelacé, float32). Pour un son compact, il est converti en entier
+        à la première demande, et le son n'est plus compact ensuite.
+        Le callback audio peut lire le son pendant la conversion: le buffer float32 est installé
+        avant que is_compact passe à False, et le buffer compact n'est libéré qu'ensuite.
+        """
+        if self._audio_data is None and self.is_compact:
+            print(f"AdikCompactSound '{self.name}': Conversion complète en float32.")
+            decoded_data = np.empty(self.compact_data.size, dtype=np.float32)
+            self._convert_frames(self.compact_data, decoded_data)
+            self._audio_data = decoded_data
+            self.is_compact = False
+            self.compact_data = None
+            self.refresh_clips()
+        return self._audio_data
+
+    @audio_data.setter
+    def audio_data(self, audio_data):
+        # Un nouveau buffer (édition) remplace le stockage compact
+        self._audio_data = audio_data
+        if audio_data is not None and audio_data.size > 0:
+            self.is_compact = False
+            self.compact_data = None
+
+    #----------------------------------------
+
+    def update_params(self):
+        """ Les longueurs d'un son compact viennent du buffer compact. """
+        if not self.is_compact:
+            super().update_params()
+            return
+        self._length_samples = self.compact_data.size
+        self._length_frames = self._length_samples // self.num_channels if self.num_channels > 0 else 0
+        self._length_seconds = self._length_frames / self.sample_rate if self.sample_rate > 0 else 0.0
+
+    #----------------------------------------
+
+    def get_length_samples(self):
+        return self._length_samples
+
+    #----------------------------------------
+
+    def get_length_frames(self):
+        return self._length_frames
+
+    #----------------------------------------
+
+    def get_duration_seconds(self):
+        return self._length_seconds
+
+    #----------------------------------------
+
+    def get_memory_size(self):
+        """ Mémoire du buffer compact (hors fichier projeté en mémoire). """
+        if not self.is_compact:
+            return super().get_memory_size()
+        if AdikSound.is_file_mapped(self.compact_data):
+            return 0
+        return self.compact_data.nbytes
+
+    #----------------------------------------
+
+    def move_to_file(self, file_path):
+        """ Écrit le buffer compact dans un fichier .npy et le remplace par sa projection mémoire. """
+        if not self.is_compact:
+            super().move_to_file(file_path)
+            return
+        np.save(file_path, self.compact_data)
+        self.compact_data = np.load(file_path, mmap_mode='r')
+
+    #----------------------------------------
+
+    def _get_buffer(self, num_frames):
+        """ Retourne le buffer de conversion du thread appelant, agrandi si nécessaire. """
+        buffer = getattr(self._local, 'decoded', None)
+        if buffer is None or buffer.shape[0] < num_frames:
+            buffer = np.empty((num_frames, self.num_channels), dtype=np.float32)
+            self._local.decoded = buffer
+        return buffer[:num_frames]
+
+    #----------------------------------------
+
+    def _get_compact_frames(self, compact_data, start_frame, num_frames):
+        """ Vue (frames, canaux) du buffer compact 'compact_data', sans copie. """
+        start_sample = start_frame * self.num_channels
+        end_sample = (start_frame + num_frames) * self.num_channels
+        return compact_data[start_sample:end_sample].reshape(num_frames, self.num_channels)
+
+    #----------------------------------------
+
+    def _convert_frames(self, compact_frames, out):
+        """
+        Convertit des frames compactes en float32 dans 'out'. La copie avec conversion puis la multiplication
+        en place évitent le buffer de conversion qu'allouerait np.multiply sur deux types différents.
+        """
+        np.copyto(out, compact_frames, casting='unsafe')
+        np.multiply(out, self.scale, out=out)
+
+    #----------------------------------------
+
+    def _get_frames(self, start_frame, num_frames):
+        """ Frames converties en float32 dans le buffer de conversion du thread appelant. """
+        # Référence locale: le buffer compact reste valide pendant la lecture, même si une conversion complète le libère
+        compact_data = self.compact_data
+        if compact_data is None or not self.is_compact:
+            return super()._get_frames(start_frame, num_frames)
+        decoded = self._get_buffer(num_frames)
+        self._convert_frames(self._get_compact_frames(compact_data, start_frame, num_frames), decoded)
+        return decoded
+
+    #----------------------------------------
+
+    def read_frames(self, start_frame, num_frames, out):
+        """ Comme AdikSound.read_frames; avec les mêmes canaux, la conversion est faite directement dans 'out'. """
+        compact_data = self.compact_data
+        if compact_data is None or not self.is_compact:
+            return super().read_frames(start_frame, num_frames, out)
+        num_frames = min(num_frames, self.length_frames - start_frame, out.shape[0])
+        if start_frame < 0 or num_frames <= 0:
+            return 0
+        if out.shape[1] == self.num_channels:
+            self._convert_frames(self._get_compact_frames(compact_data, start_frame, num_frames), out[:num_frames])
+        else:
+            AdikSound.copy_frames(self._get_frames(start_frame, num_frames), out[:num_frames])
+        return num_frames
+
+    #----------------------------------------
+
+    def __str__(self):
+        # Sans passer par audio_data, qui convertirait tout le son
+        return (f"AdikCompactSound(Name='{self.name}', SR={self.sample_rate}, "
+                f"Channels={self.num_channels}, Duration={self.get_duration_seconds():.2f}s, "
+                f"Samples={self.get_length_samples()}, Format={self.sample_format if self.is_compact else 'float32'})")
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    sound = AdikSound.sine_wave(freq=440, dur=1, amp=0.5, num_channels=2)
+    compact_sound = AdikCompactSound.from_sound(sound, "int16")
+    out = np.zeros((512, 2), dtype=np.float32)
+    compact_sound.read_frames(1000, 512, out)
+    print(compact_sound, compact_sound.get_memory_size(), float(np.abs(out - sound._get_frames(1000, 512)).max()))
+    input("It's OK...")
+
+#----------------------------------------
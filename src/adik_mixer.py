@@ -2,13 +2,153 @@
 import numpy as np
 
 class AdikMixer:
+    """
+    État du mixeur sous forme de tableaux NumPy (structure de tableaux), indexés par slot de piste.
+    Le slot d'une piste est son index dans la liste des pistes du player.
+    Les pistes écrivent leurs paramètres dans ces tableaux (voir AdikTrack._set_mixer_param),
+    et la matrice des gains (pistes x canaux de sortie) est calculée en une fois pour chaque bloc.
+    """
+    PARAM_NAMES = ('volume', 'volume_mix', 'pan', 'left_gain', 'right_gain')
+    FLAG_NAMES = ('muted', 'solo', 'armed')
+
     def __init__(self, sample_rate=44100, num_channels=2):
         self.sample_rate = sample_rate
         self.num_channels = num_channels
+        self.num_slots = 0
+        self._slot_tracks = [] # Piste de chaque slot
+        # Fonction qui envoie une commande au thread audio (AdikAudioEngine.post_command)
+        self._post_command = None
+        self.set_arrays(self.build_arrays([]), [])
         print(f"AdikMixer initialisé (SR: {self.sample_rate}, Channels: {self.num_channels})")
 
     #----------------------------------------
 
+    def build_arrays(self, track_list):
+        """
+        Construit les tableaux du mixeur à partir des paramètres actuels des pistes.
+        Alloue de nouveaux tableaux: à appeler en dehors du callback audio.
+        """
+        num_tracks = len(track_list)
+        # Les pistes sont rattachées au mixeur dès maintenant: leurs changements de paramètres
+        # postés avant l'installation des tableaux y seront appliqués ensuite
+        for track in track_list:
+            track._mixer = self
+        arrays = {}
+        for name in self.PARAM_NAMES:
+            arrays[name] = np.array([getattr(track, name) for track in track_list], dtype=np.float32).reshape(num_tracks)
+        arrays['muted'] = np.array([track.is_muted() for track in track_list], dtype=bool).reshape(num_tracks)
+        arrays['solo'] = np.array([track.is_solo() for track in track_list], dtype=bool).reshape(num_tracks)
+        arrays['armed'] = np.array([track.is_armed() for track in track_list], dtype=bool).reshape(num_tracks)
+
+        # Buffers de travail pour le calcul des gains
+        arrays['track_gain'] = np.zeros(num_tracks, dtype=np.float32)
+        arrays['active'] = np.zeros(num_tracks, dtype=bool)
+        arrays['gain_matrix'] = np.zeros((num_tracks, self.num_channels), dtype=np.float32)
+        return arrays
+
+    #----------------------------------------
+
+    def set_arrays(self, arrays, track_list):
+        """
+        Installe les tableaux construits par build_arrays, et attache chaque piste à son slot.
+        """
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.num_slots = len(track_list)
+        self._slot_tracks = list(track_list)
+        for slot, track in enumerate(track_list):
+            track._attach_mixer(self, slot)
+
+    #----------------------------------------
+
+    def set_command_poster(self, post_command):
+        """
+        Définit la fonction qui envoie les changements de paramètres au thread audio.
+        Sans elle, les paramètres sont écrits directement.
+        """
+        self._post_command = post_command
+
+    #----------------------------------------
+
+    def set_track_param(self, track, name, value):
+        """
+        Change un paramètre ou un drapeau d'une piste. Le changement est envoyé au thread audio;
+        le slot de la piste n'est résolu qu'à l'exécution, après les changements de liste de pistes en attente.
+        """
+        if self._post_command is not None:
+            self._post_command(self._write_track_param, track, name, value)
+        else:
+            self._write_track_param(track, name, value)
+
+    #----------------------------------------
+
+    def _write_track_param(self, track, name, value):
+        slot = track._mixer_slot
+        if 0 <= slot < self.num_slots and self._slot_tracks[slot] is track:
+            getattr(self, name)[slot] = value
+
+    #----------------------------------------
+
+    def set_param(self, slot, name, value):
+        """
+        Écrit un paramètre (volume, pan...) ou un drapeau (muted, solo, armed) d'une piste.
+        """
+        if 0 <= slot < self.num_slots:
+            getattr(self, name)[slot] = value
+
+    #----------------------------------------
+
+    def compute_gains(self, recording_replace=False):
+        """
+        Calcule la matrice des gains (pistes x canaux de sortie) pour le bloc courant,
+        en appliquant les règles de solo, de mute et d'armement.
+        Reproduit le gain de get_audio_block (volume et panoramique) suivi de celui
+        de mix_sound_data (volume, volume_mix, gain gauche/droit).
+        Les calculs se font en place dans des tableaux préalloués.
+        Retourne la matrice des gains et le masque des pistes actives.
+        """
+        active = self.active
+        track_gain = self.track_gain
+        gain_matrix = self.gain_matrix
+
+        # Pistes audibles: non muettes, solo si un solo existe, pas armées en enregistrement par remplacement
+        np.logical_not(self.muted, out=active)
+        if self.solo.any():
+            np.logical_and(active, self.solo, out=active)
+        if recording_replace:
+            # active & ~armed
+            np.greater(active, self.armed, out=active)
+
+        # Gain global par piste: volume (get_audio_block) * volume * volume_mix (mix_sound_data)
+        np.multiply(self.volume, self.volume, out=track_gain)
+        track_gain *= self.volume_mix
+        track_gain *= active
+
+        if self.num_channels == 2:
+            # Loi de panoramique de get_audio_block, puis gains gauche/droit
+            np.subtract(1.0, self.pan, out=gain_matrix[:, 0])
+            np.add(1.0, self.pan, out=gain_matrix[:, 1])
+            gain_matrix[:, 0] *= self.left_gain
+            gain_matrix[:, 1] *= self.right_gain
+            gain_matrix[:, 0] *= track_gain
+            gain_matrix[:, 1] *= track_gain
+        else:
+            np.multiply(track_gain, self.left_gain, out=gain_matrix[:, 0])
+
+        return gain_matrix, active
+
+    #----------------------------------------
+
+    def mix_blocks(self, track_blocks, gain_matrix, output_2d):
+        """
+        Mixe les blocs empilés des pistes (pistes, frames, canaux) dans output_2d (frames, canaux)
+        par un seul produit matriciel par lot: pour chaque canal, sortie = blocs^T . gains.
+        Le contenu de output_2d est remplacé.
+        """
+        np.matmul(track_blocks.transpose(2, 1, 0), gain_matrix.T[:, :, None], out=output_2d.T[:, :, None])
+
+    #----------------------------------------
+
     def mix_buffers(self, input_buffers, num_frames):
         """
         Function dépréciée, n'est plus utilisée
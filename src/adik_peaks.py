@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+    File: adik_peaks.py
+    Multi-resolution waveform peak cache of a sound
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import numpy as np
+
+class AdikPeaks:
+    """
+    Pyramide de crêtes d'un son: min, max et somme des carrés (pour le RMS) par canal,
+    sur des cases de 256, 4096 et 65536 frames.
+    Le premier niveau est calculé depuis les données du son, bloc par bloc (sons en streaming compris),
+    les niveaux suivants depuis le niveau précédent.
+    Une vue d'ensemble de N colonnes ne lit alors que quelques cases par colonne,
+    quelle que soit la durée du son.
+    """
+    BIN_SIZES = (256, 4096, 65536)
+    READ_FRAMES = 65536 * 4 # Frames lues à la fois pendant le calcul
+    SIDECAR_SUFFIX = ".peaks.npz"
+    OVERVIEW_CHARS = " ▁▂▃▄▅▆▇█"
+
+    def __init__(self, sound):
+        self.sound = sound
+        self.num_channels = sound.num_channels
+        self.num_frames = 0
+        self.mins = []
+        self.maxs = []
+        self.sum_squares = []
+        self._resize(0)
+
+    #----------------------------------------
+
+    def _resize(self, num_frames):
+        """ Redimensionne les niveaux pour 'num_frames' frames, en gardant les cases du début. """
+        for level_idx, bin_size in enumerate(self.BIN_SIZES):
+            num_bins = -(-num_frames // bin_size)
+            new_mins = np.zeros((num_bins, self.num_channels), dtype=np.float32)
+            new_maxs = np.zeros((num_bins, self.num_channels), dtype=np.float32)
+            new_sum_squares = np.zeros((num_bins, self.num_channels), dtype=np.float64)
+            if level_idx < len(self.mins):
+                num_kept = min(num_bins, len(self.mins[level_idx]))
+                new_mins[:num_kept] = self.mins[level_idx][:num_kept]
+                new_maxs[:num_kept] = self.maxs[level_idx][:num_kept]
+                new_sum_squares[:num_kept] = self.sum_squares[level_idx][:num_kept]
+                self.mins[level_idx] = new_mins
+                self.maxs[level_idx] = new_maxs
+                self.sum_squares[level_idx] = new_sum_squares
+            else:
+                self.mins.append(new_mins)
+                self.maxs.append(new_maxs)
+                self.sum_squares.append(new_sum_squares)
+        self.num_frames = num_frames
+
+    #----------------------------------------
+
+    def compute(self):
+        """ Calcule toute la pyramide. """
+        self._resize(0)
+        self.update_range(0, self.sound.length_frames)
+        return self
+
+    #----------------------------------------
+
+    def update_range(self, start_frame, end_frame=None):
+        """
+        Recalcule les cases qui couvrent les frames [start_frame, end_frame) du son, après une édition.
+        Si la longueur du son a changé, les niveaux sont redimensionnés et tout ce qui suit
+        start_frame est recalculé (les données ont été décalées).
+        """
+        num_frames = self.sound.length_frames
+        if num_frames != self.num_frames or end_frame is None:
+            self._resize(num_frames)
+            end_frame = num_frames
+        start_frame = max(0, start_frame)
+        end_frame = min(num_frames, end_frame)
+        if end_frame <= start_frame:
+            return
+
+        base_size = self.BIN_SIZES[0]
+        start_bin = start_frame // base_size
+        end_bin = -(-end_frame // base_size)
+        self._compute_base_bins(start_bin, end_bin)
+        for level_idx in range(1, len(self.BIN_SIZES)):
+            ratio = self.BIN_SIZES[level_idx] // self.BIN_SIZES[level_idx - 1]
+            start_bin //= ratio
+            end_bin = -(-end_bin // ratio)
+            self._compute_level_bins(level_idx, start_bin, end_bin, ratio)
+
+    #----------------------------------------
+
+    def _compute_base_bins(self, start_bin, end_bin):
+        """ Calcule les cases [start_bin, end_bin) du premier niveau depuis les données du son. """
+        base_size = self.BIN_SIZES[0]
+        mins, maxs, sum_squares = self.mins[0], self.maxs[0], self.sum_squares[0]
+        end_frame = min(end_bin * base_size, self.num_frames)
+        for read_start in range(start_bin * base_size, end_frame, self.READ_FRAMES):
+            num_read = min(self.READ_FRAMES, end_frame - read_start)
+            frames = self.sound._get_frames(read_start, num_read)
+            bin_idx = read_start // base_size
+            num_full_bins = num_read // base_size
+            if num_full_bins:
+                # Canaux transposés en lignes contiguës: les réductions sur le dernier axe sont bien plus rapides
+                full_bins = np.ascontiguousarray(frames[:num_full_bins * base_size].T).reshape(self.num_channels, num_full_bins, base_size)
+                mins[bin_idx : bin_idx + num_full_bins] = full_bins.min(axis=2).T
+                maxs[bin_idx : bin_idx + num_full_bins] = full_bins.max(axis=2).T
+                sum_squares[bin_idx : bin_idx + num_full_bins] = np.einsum('cbi,cbi->cb', full_bins, full_bins).T
+            if num_read > num_full_bins * base_size:
+                # Dernière case du son, incomplète
+                last_bin = frames[num_full_bins * base_size:]
+                mins[bin_idx + num_full_bins] = last_bin.min(axis=0)
+                maxs[bin_idx + num_full_bins] = last_bin.max(axis=0)
+                sum_squares[bin_idx + num_full_bins] = np.square(last_bin, dtype=np.float64).sum(axis=0)
+
+    #----------------------------------------
+
+    def _compute_level_bins(self, level_idx, start_bin, end_bin, ratio):
+        """ Calcule les cases [start_bin, end_bin) d'un niveau en regroupant les cases du niveau précédent. """
+        end_bin = min(end_bin, len(self.mins[level_idx]))
+        if end_bin <= start_bin:
+            return
+        child_start = start_bin * ratio
+        child_end = min(end_bin * ratio, len(self.mins[level_idx - 1]))
+        group_starts = np.arange(0, child_end - child_start, ratio)
+        self.mins[level_idx][start_bin:end_bin] = np.minimum.reduceat(self.mins[level_idx - 1][child_start:child_end], group_starts)
+        self.maxs[level_idx][start_bin:end_bin] = np.maximum.reduceat(self.maxs[level_idx - 1][child_start:child_end], group_starts)
+        self.sum_squares[level_idx][start_bin:end_bin] = np.add.reduceat(self.sum_squares[level_idx - 1][child_start:child_end], group_starts)
+
+    #----------------------------------------
+
+    def copy_for(self, sound):
+        """ Retourne une copie de la pyramide pour un autre son (un son édité), à mettre à jour avec update_range. """
+        peaks = AdikPeaks.__new__(AdikPeaks)
+        peaks.sound = sound
+        peaks.num_channels = self.num_channels
+        peaks.num_frames = self.num_frames
+        peaks.mins = [level.copy() for level in self.mins]
+        peaks.maxs = [level.copy() for level in self.maxs]
+        peaks.sum_squares = [level.copy() for level in self.sum_squares]
+        return peaks
+
+    #----------------------------------------
+
+    def get_peaks(self, start_frame, end_frame, num_columns):
+        """
+        Retourne (mins, maxs, rms) pour 'num_columns' colonnes couvrant les frames [start_frame, end_frame),
+        chacun sous forme de tableau (colonnes, canaux).
+        Utilise le niveau le plus grossier dont les cases restent plus petites qu'une colonne.
+        """
+        start_frame = max(0, start_frame)
+        end_frame = min(self.num_frames, end_frame)
+        if end_frame <= start_frame or num_columns <= 0:
+            empty = np.zeros((0, self.num_channels), dtype=np.float32)
+            return empty, empty, empty
+
+        frames_per_column = (end_frame - start_frame) / num_columns
+        level_idx = 0
+        for idx, bin_size in enumerate(self.BIN_SIZES):
+            if bin_size <= frames_per_column:
+                level_idx = idx
+        bin_size = self.BIN_SIZES[level_idx]
+        start_bin = start_frame // bin_size
+        end_bin = -(-end_frame // bin_size)
+        # Première case de chaque colonne; une colonne plus fine qu'une case reprend la case voisine
+        column_starts = np.linspace(start_bin, end_bin, num_columns, endpoint=False).astype(np.int64) - start_bin
+        mins = np.minimum.reduceat(self.mins[level_idx][start_bin:end_bin], column_starts)
+        maxs = np.maximum.reduceat(self.maxs[level_idx][start_bin:end_bin], column_starts)
+        sum_squares = np.add.reduceat(self.sum_squares[level_idx][start_bin:end_bin], column_starts)
+
+        # Nombre de frames de chaque colonne, pour le RMS (la dernière case du son peut être incomplète)
+        bin_frames = np.full(end_bin - start_bin, bin_size, dtype=np.float64)
+        bin_frames[-1] = min(bin_size, self.num_frames - (end_bin - 1) * bin_size)
+        column_frames = np.add.reduceat(bin_frames, column_starts)
+        rms = np.sqrt(sum_squares / column_frames[:, np.newaxis]).astype(np.float32)
+        return mins, maxs, rms
+
+    #----------------------------------------
+
+    def get_overview(self, width, start_frame=0, end_frame=None):
+        """ Retourne une ligne de 'width' caractères représentant l'amplitude maximale du son (tous canaux). """
+        if end_frame is None:
+            end_frame = self.num_frames
+        mins, maxs, _ = self.get_peaks(start_frame, end_frame, width)
+        if len(maxs) == 0:
+            return ""
+        amplitudes = np.maximum(np.abs(mins), np.abs(maxs)).max(axis=1)
+        char_indices = np.minimum(np.ceil(amplitudes * (len(self.OVERVIEW_CHARS) - 1)), len(self.OVERVIEW_CHARS) - 1).astype(np.int64)
+        return "".join(self.OVERVIEW_CHARS[idx] for idx in char_indices)
+
+    #----------------------------------------
+
+    @staticmethod
+    def get_sidecar_path(file_path):
+        return file_path + AdikPeaks.SIDECAR_SUFFIX
+
+    #----------------------------------------
+
+    def save(self, file_path):
+        """ Enregistre la pyramide à côté du fichier WAV 'file_path', avec sa taille et sa date pour la valider. """
+        stat = os.stat(file_path)
+        arrays = {}
+        for level_idx in range(len(self.BIN_SIZES)):
+            arrays[f"mins_{level_idx}"] = self.mins[level_idx]
+            arrays[f"maxs_{level_idx}"] = self.maxs[level_idx]
+            arrays[f"sum_squares_{level_idx}"] = self.sum_squares[level_idx]
+        try:
+            with open(self.get_sidecar_path(file_path), 'wb') as f:
+                np.savez(f, source_size=stat.st_size, source_mtime_ns=stat.st_mtime_ns,
+                         num_frames=self.num_frames, num_channels=self.num_channels,
+                         bin_sizes=np.array(self.BIN_SIZES), **arrays)
+            return True
+        except OSError as e:
+            print(f"Avertissement: Impossible d'enregistrer les crêtes de {file_path}: {e}")
+            return False
+
+    #----------------------------------------
+
+    @staticmethod
+    def load(file_path, sound):
+        """
+        Charge la pyramide enregistrée à côté du fichier WAV 'file_path' pour le son 'sound'.
+        Retourne None si elle n'existe pas ou si elle ne correspond plus au fichier.
+        """
+        sidecar_path = AdikPeaks.get_sidecar_path(file_path)
+        if not os.path.exists(sidecar_path):
+            return None
+        try:
+            stat = os.stat(file_path)
+            with np.load(sidecar_path) as data:
+                if (int(data['source_size']) != stat.st_size or int(data['source_mtime_ns']) != stat.st_mtime_ns
+                        or int(data['num_frames']) != sound.length_frames or int(data['num_channels']) != sound.num_channels
+                        or tuple(data['bin_sizes']) != AdikPeaks.BIN_SIZES):
+                    return None
+                peaks = AdikPeaks.__new__(AdikPeaks)
+                peaks.sound = sound
+                peaks.num_channels = sound.num_channels
+                peaks.num_frames = sound.length_frames
+                peaks.mins = [data[f"mins_{level_idx}"] for level_idx in range(len(AdikPeaks.BIN_SIZES))]
+                peaks.maxs = [data[f"maxs_{level_idx}"] for level_idx in range(len(AdikPeaks.BIN_SIZES))]
+                peaks.sum_squares = [data[f"sum_squares_{level_idx}"] for level_idx in range(len(AdikPeaks.BIN_SIZES))]
+            return peaks
+        except Exception as e:
+            print(f"Avertissement: Fichier de crêtes illisible {sidecar_path}: {e}")
+            return None
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    from adik_sound import AdikSound
+    sound = AdikSound.white_noise(dur=2, amp=0.5)
+    print(AdikPeaks(sound).compute().get_overview(40))
+    input("It's OK...")
+
+#----------------------------------------
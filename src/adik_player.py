@@ -13,6 +13,9 @@ from adik_metronome import AdikMetronome
 from adik_track_edit import AdikTrackEdit # Import de la nouvelle classe
 from adik_loop import AdikLoop # Import de la nouvelle classe
 from adik_transport import AdikTransport
+from adik_renderer import AdikRenderer
+from adik_prefetcher import AdikPrefetcher
+from adik_undo_manager import AdikUndoManager
 
 def beep():
     print("\a")
@@ -20,7 +23,7 @@ def beep():
 #----------------------------------------
 
 class AdikPlayer:
-    def __init__(self, sample_rate=44100, block_size=1024, num_output_channels=2, num_input_channels=1):
+    def __init__(self, sample_rate=44100, block_size=1024, num_output_channels=2, num_input_channels=1, audio_driver=None):
         self.sample_rate = sample_rate
         self.block_size = block_size
         self.num_output_channels = num_output_channels # Canaux de sortie du player/mixer
@@ -37,7 +40,16 @@ class AdikPlayer:
         self.metronome = AdikMetronome(sample_rate=sample_rate, num_channels=num_output_channels)
         # Instanciez l'Engine et utiliser ses fonctions de Callback internes
         # Doit être instancié après le Transport et le Metronome car son constructeur fait appel à ces instances.
-        self.audio_engine = AdikAudioEngine(self, sample_rate, block_size, num_output_channels, num_input_channels)
+        # audio_driver: nom du pilote ("sounddevice", "null", "freerun", "wavfile") ou instance de pilote
+        self.audio_engine = AdikAudioEngine(self, sample_rate, block_size, num_output_channels, num_input_channels, audio_driver)
+        # Les changements de paramètres du mixeur passent par la file de commandes du moteur
+        self.mixer.set_command_poster(self.audio_engine.post_command)
+        # Rendu hors temps réel (mixdowns, exports), indépendant du pilote audio
+        self.renderer = AdikRenderer(self)
+        # Préchargement des pistes lues en streaming depuis le disque, actif avec le moteur audio
+        self.prefetcher = AdikPrefetcher(self)
+        # Historique d'annulation des éditions de pistes
+        self.undo_manager = AdikUndoManager(self)
 
         self.current_playback_frame = 0 # Position globale du player en frames
         # total_duration_seconds et current_time_seconds seront gérés comme des propriétés (voir plus bas)
@@ -92,18 +104,81 @@ class AdikPlayer:
 
     #----------------------------------------
         
+    def undo(self):
+        return self.undo_manager.undo()
+
+    #----------------------------------------
+
+    def redo(self):
+        return self.undo_manager.redo()
+
+    #----------------------------------------
+        
     def has_solo_track(self) -> bool:
         return self.track_edit.has_solo_track()
 
     #----------------------------------------
         
-    def bounce_to_track(self, start_frame=0, end_frame=-1):
-        self.track_edit.bounce_to_track(start_frame, end_frame)
+    def bounce_to_track(self, start_frame=0, end_frame=-1, num_processes=1):
+        self.track_edit.bounce_to_track(start_frame, end_frame, num_processes)
 
     #----------------------------------------
         
-    def save_track(self, start_frame=0, end_frame=-1, filename=None):
-        return self.track_edit.save_track(start_frame, end_frame, filename)
+    def save_track(self, start_frame=0, end_frame=-1, filename=None, subtype='PCM_16', progress_callback=None):
+        return self.track_edit.save_track(start_frame, end_frame, filename, subtype, progress_callback)
+
+    #----------------------------------------
+
+    def export_mix(self, filename, start_frame=0, end_frame=-1, subtype='PCM_16', progress_callback=None):
+        """ Rend le mix des pistes sur la plage et l'écrit dans un fichier, bloc par bloc. """
+        return self.renderer.export_wav(filename, start_frame, end_frame, subtype, progress_callback)
+
+    #----------------------------------------
+
+    def set_mix_mode(self, mode: int):
+        """
+        Choisit le noyau de mixage des pistes (ancien mixage par boucle, mixage vectorisé
+        par piste, ou mixage matriciel de toutes les pistes par le mixeur).
+        """
+        mode_names = {
+            AdikTrack.MIX_MODE_LOOP: "Boucle",
+            AdikTrack.MIX_MODE_VECTORIZED: "Vectorisé",
+            AdikTrack.MIX_MODE_MATRIX: "Matriciel",
+        }
+        if mode in mode_names:
+            self.audio_engine.post_command(setattr, AdikTrack, 'mix_mode', mode)
+            mode_name = mode_names[mode]
+            print(f"Player: Mode de mixage changé en '{mode_name}'.")
+        else:
+            print(f"Erreur: Mode de mixage '{mode}' invalide.")
+
+    #----------------------------------------
+
+    def set_render_threads(self, num_threads: int, min_tracks=None):
+        """
+        Lit les pistes en parallèle sur 'num_threads' threads persistants (0 pour désactiver),
+        à partir de 'min_tracks' pistes. Utilisé par le mode de mixage matriciel.
+        """
+        self.audio_engine.set_render_threads(max(0, num_threads), min_tracks)
+
+    #----------------------------------------
+
+    def get_callback_stats(self):
+        """ Retourne les statistiques de temps des callbacks du moteur audio. """
+        return self.audio_engine.get_callback_stats()
+
+    #----------------------------------------
+
+    def reset_callback_stats(self):
+        """ Remet à zéro les statistiques de temps des callbacks, et les compteurs du préchargement. """
+        self.audio_engine.reset_callback_stats()
+        self.prefetcher.reset_stats()
+
+    #----------------------------------------
+
+    def get_prefetch_stats(self):
+        """ Retourne les compteurs du préchargement des pistes en streaming (voir AdikPrefetcher.get_summary). """
+        return self.prefetcher.get_summary()
 
     #----------------------------------------
 
@@ -114,10 +189,8 @@ class AdikPlayer:
         # with self._lock:
         max_duration_frames = 0
         for track in self.track_list:
-            if track.audio_sound:
-                track_end_frame = track.offset_frames + track.audio_sound.length_frames
-                if track_end_frame > max_duration_frames:
-                    max_duration_frames = track_end_frame
+            if track.clips and track.end_frame > max_duration_frames:
+                max_duration_frames = track.end_frame
         
         # Mise à jour des deux propriétés
         self.total_duration_frames_cached = max_duration_frames
@@ -132,6 +205,8 @@ class AdikPlayer:
         """
         self._update_total_duration_cache()
         self.loop_manager.update_params()
+        # Les buffers de travail du moteur suivent le nombre de pistes
+        self.audio_engine.update_buffers()
 
     #----------------------------------------
     
@@ -187,6 +262,11 @@ class AdikPlayer:
 
     #----------------------------------------
 
+    def set_record_to_disk(self, enabled, directory=None):
+        return self.transport.set_record_to_disk(enabled, directory)
+
+    #----------------------------------------
+
     # --- Fonctions de positionnement ---
     def _get_max_frames(self):
         """
@@ -200,6 +280,7 @@ class AdikPlayer:
         """
         Définit la position de lecture globale du player et de toutes les pistes.
         La position est clamper entre 0 et la durée maximale du projet.
+        Le changement est envoyé au thread audio par la file de commandes du moteur.
         """
         with self._lock:
             max_frames = self._get_max_frames()
@@ -209,13 +290,19 @@ class AdikPlayer:
             if new_position == self.current_playback_frame:
                 return
 
-            self.current_playback_frame = new_position
-            for track in self.track_list:
-                track.set_playback_position(self.current_playback_frame) # Utilise la méthode correcte
-            
-            # Mise à jour de current_time_seconds car set_position peut être appelée en dehors du callback
-            self.current_time_seconds_cached = self.current_playback_frame / self.sample_rate 
-            print(f"Position de lecture définie à: {self.current_playback_frame} frames ({self.current_time_seconds:.2f}s)")
+            self.prefetcher.request_seek(new_position)
+            self.audio_engine.post_command(self._apply_position, new_position)
+            print(f"Position de lecture définie à: {new_position} frames ({new_position / self.sample_rate:.2f}s)")
+
+    #----------------------------------------
+
+    def _apply_position(self, new_position):
+        """ Commande: déplace la position du player et de toutes les pistes du thread audio. """
+        self.current_playback_frame = new_position
+        for track in self.audio_engine._track_list:
+            track.set_playback_position(new_position)
+        # Mise à jour de current_time_seconds car set_position peut être appelée en dehors du callback
+        self.current_time_seconds_cached = new_position / self.sample_rate
 
     #----------------------------------------
 
@@ -341,6 +428,7 @@ class AdikPlayer:
     def _start_engine(self):
         """Démarre l'engine audio."""
         if not self._is_engine_running():
+            self.prefetcher.start()
             self.audio_engine.start_output_stream()
             # self.audio_engine.start_duplex_stream()
             print("Moteur Audio Démarré")
@@ -354,6 +442,7 @@ class AdikPlayer:
             # Arrêter tous les streams en cours
             self.audio_engine.stop_stream()
             # self.audio_engine.stop_duplex_stream()
+            self.prefetcher.stop()
 
     #----------------------------------------
 
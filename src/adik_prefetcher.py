@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+    File: adik_prefetcher.py
+    Read-ahead thread for the tracks streamed from disk
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import numpy as np
+
+class AdikStreamCache:
+    """
+    Fenêtre de lecture d'un son en streaming: un anneau de blocs (slots) de 'chunk_frames' frames,
+    déjà décodés en float32 avec les canaux de la piste.
+    Le thread de préchargement remplit les slots, le callback audio ne fait que les lire.
+    Un slot est marqué libre (-1) avant d'être réécrit, puis marqué avec l'index de son bloc
+    une fois rempli: le callback ne lit jamais un bloc à moitié écrit.
+    """
+    def __init__(self, sound, num_channels, chunk_frames, num_slots):
+        self.sound = sound # Son pour lequel la fenêtre a été remplie
+        self.num_channels = num_channels
+        self.chunk_frames = chunk_frames
+        self.num_slots = num_slots
+        self.slots = np.zeros((num_slots, chunk_frames, num_channels), dtype=np.float32)
+        self.slot_chunks = [-1] * num_slots # Index du bloc contenu dans chaque slot, -1 si libre
+        self.slot_lengths = [0] * num_slots # Frames valides dans chaque slot (le dernier bloc du son est plus court)
+        self.chunk_slots = {} # Index de bloc -> slot
+        self.underruns = 0 # Blocs audio qui n'ont pas trouvé leurs données dans la fenêtre
+        self.underrun_frames = 0
+        self.chunks_loaded = 0
+
+    #----------------------------------------
+
+    def read(self, start_frame, num_frames, out):
+        """
+        Côté callback: copie les frames [start_frame, start_frame + num_frames) du son dans 'out' (frames, canaux).
+        Les frames absentes de la fenêtre sont remplacées par du silence et comptées comme underrun.
+        Retourne True si toutes les frames étaient dans la fenêtre.
+        """
+        chunk_frames = self.chunk_frames
+        missing_frames = 0
+        frames_done = 0
+        while frames_done < num_frames:
+            frame_pos = start_frame + frames_done
+            chunk_idx = frame_pos // chunk_frames
+            chunk_offset = frame_pos - chunk_idx * chunk_frames
+            frames_to_copy = min(num_frames - frames_done, chunk_frames - chunk_offset)
+            slot = self.chunk_slots.get(chunk_idx)
+            if slot is not None and self.slot_chunks[slot] == chunk_idx and self.slot_lengths[slot] >= chunk_offset + frames_to_copy:
+                out[frames_done : frames_done + frames_to_copy] = self.slots[slot, chunk_offset : chunk_offset + frames_to_copy]
+            else:
+                out[frames_done : frames_done + frames_to_copy] = 0.0
+                missing_frames += frames_to_copy
+            frames_done += frames_to_copy
+
+        if missing_frames:
+            self.underruns += 1
+            self.underrun_frames += missing_frames
+            return False
+        return True
+
+    #----------------------------------------
+
+    def fill(self, needed_chunks):
+        """
+        Côté thread de préchargement: charge les blocs de 'needed_chunks' (dans l'ordre, les plus urgents d'abord)
+        qui ne sont pas encore dans la fenêtre, en réutilisant les slots des blocs qui ne sont plus demandés.
+        Retourne le nombre de blocs chargés.
+        """
+        needed_chunks = needed_chunks[:self.num_slots]
+        needed_set = set(needed_chunks)
+        free_slots = [slot for slot in range(self.num_slots) if self.slot_chunks[slot] not in needed_set]
+        num_loaded = 0
+        for chunk_idx in needed_chunks:
+            if chunk_idx in self.chunk_slots:
+                continue
+            slot = free_slots.pop()
+            # Libérer le slot avant de le réécrire
+            old_chunk_idx = self.slot_chunks[slot]
+            self.slot_chunks[slot] = -1
+            if old_chunk_idx >= 0:
+                del self.chunk_slots[old_chunk_idx]
+            frames_read = self.sound.read_frames(chunk_idx * self.chunk_frames, self.chunk_frames, self.slots[slot])
+            self.slot_lengths[slot] = frames_read
+            self.slot_chunks[slot] = chunk_idx
+            self.chunk_slots[chunk_idx] = slot
+            num_loaded += 1
+        self.chunks_loaded += num_loaded
+        return num_loaded
+
+    #----------------------------------------
+
+#========================================
+
+class AdikPrefetcher:
+    """
+    Thread de préchargement des pistes lues en streaming depuis le disque (AdikStreamSound).
+    Garde pour chaque son en streaming joué par une piste une fenêtre de 'window_seconds' secondes d'audio décodé,
+    à partir de la position du player, dans un AdikStreamCache attaché à la piste.
+    Suit les déplacements (set_position) et le bouclage (AdikLoop): après la fin de la boucle,
+    la fenêtre continue au début de la boucle.
+    Le callback audio lit alors uniquement en mémoire; une donnée absente est comptée comme underrun.
+    """
+    def __init__(self, player, window_seconds=2.0, chunk_frames=8192, poll_interval=0.01):
+        self.player = player
+        self.window_frames = int(window_seconds * player.sample_rate)
+        self.chunk_frames = chunk_frames
+        # Fenêtre principale, plus une fenêtre d'avance pour un déplacement pas encore appliqué par le thread audio
+        window_chunks = -(-self.window_frames // chunk_frames)
+        self.num_slots = 2 * (window_chunks + 2)
+        self.poll_interval = poll_interval
+        self._seek_frame = None # Position demandée par set_position, en attente d'application
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._detached_underruns = 0 # Underruns des fenêtres retirées des pistes
+        self._detached_underrun_frames = 0
+        self._detached_chunks_loaded = 0
+        self._cache_list = []
+
+    #----------------------------------------
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    #----------------------------------------
+
+    def start(self):
+        """ Démarre le thread de préchargement. """
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self.update()
+        self._thread = threading.Thread(target=self._run, name="AdikPrefetcher", daemon=True)
+        self._thread.start()
+        print("Prefetcher: Thread de préchargement démarré.")
+
+    #----------------------------------------
+
+    def stop(self):
+        """ Arrête le thread et retire les fenêtres des pistes: elles relisent alors directement le disque. """
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        self._wake_event.set()
+        self._thread.join()
+        self._thread = None
+        for cache in self._cache_list:
+            self._add_detached_stats(cache)
+        self._cache_list = []
+        for track in self.player.track_list:
+            track._stream_caches = {}
+        print("Prefetcher: Thread de préchargement arrêté.")
+
+    #----------------------------------------
+
+    def request_seek(self, frame_pos):
+        """ Signale un déplacement de la position de lecture, pour précharger la nouvelle position sans attendre. """
+        self._seek_frame = frame_pos
+        self._wake_event.set()
+
+    #----------------------------------------
+
+    def wake(self):
+        """ Réveille le thread, par exemple après un changement de son ou de boucle. """
+        self._wake_event.set()
+
+    #----------------------------------------
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.update()
+            except Exception as e:
+                print(f"Prefetcher: Erreur pendant le préchargement: {e}")
+
+    #----------------------------------------
+
+    def _get_timeline_ranges(self, start_frame):
+        """
+        Retourne les intervalles [début, fin) de la timeline qui seront joués dans la fenêtre,
+        à partir de start_frame, en suivant le bouclage.
+        Le bouclage a lieu à la fin d'un bloc: un bloc de plus est gardé après la fin de la boucle.
+        """
+        loop = self.player.loop_manager
+        frames_left = self.window_frames
+        if not loop.is_looping():
+            return [(start_frame, start_frame + frames_left)]
+
+        loop_start = loop._loop_start_frame
+        loop_end = loop._loop_end_frame + self.player.block_size
+        ranges = []
+        frame_pos = start_frame
+        while frames_left > 0 and len(ranges) < 8:
+            range_end = frame_pos + frames_left if frame_pos >= loop_end else min(loop_end, frame_pos + frames_left)
+            ranges.append((frame_pos, range_end))
+            frames_left -= range_end - frame_pos
+            if range_end - frame_pos <= 0:
+                break
+            frame_pos = loop_start
+        return ranges
+
+    #----------------------------------------
+
+    def _add_needed_chunks(self, clip, timeline_ranges, needed_chunks):
+        """ Ajoute à 'needed_chunks' les index des blocs du son du clip couverts par les intervalles de la timeline, dans l'ordre. """
+        for range_start, range_end in timeline_ranges:
+            # Intervalle de la timeline -> intervalle dans le son, selon la position du clip
+            start_frame = max(clip.source_start, clip.source_start + range_start - clip.timeline_start)
+            end_frame = min(clip.source_end, clip.source_start + range_end - clip.timeline_start)
+            if end_frame <= start_frame:
+                continue
+            for chunk_idx in range(start_frame // self.chunk_frames, (end_frame - 1) // self.chunk_frames + 1):
+                if chunk_idx not in needed_chunks:
+                    needed_chunks.append(chunk_idx)
+
+    #----------------------------------------
+
+    def update(self):
+        """
+        Une passe de préchargement: pour chaque son en streaming joué dans la fenêtre, charge les blocs manquants
+        (la position demandée par set_position d'abord, puis la position courante).
+        Les clips de la fenêtre sont trouvés par l'index de la piste: une piste découpée en milliers de clips
+        sur le même son n'a qu'une fenêtre, et seuls les clips proches de la position sont parcourus.
+        """
+        current_frame = self.player.current_playback_frame
+        seek_frame = self._seek_frame
+        if seek_frame is not None and seek_frame == current_frame:
+            # Le déplacement a été appliqué par le thread audio
+            self._seek_frame = seek_frame = None
+        timeline_ranges = []
+        if seek_frame is not None:
+            timeline_ranges.extend(self._get_timeline_ranges(seek_frame))
+        timeline_ranges.extend(self._get_timeline_ranges(current_frame))
+
+        cache_list = []
+        for track in list(self.player.audio_engine._track_list):
+            clip_index = track._clip_index
+            if not clip_index.has_streaming:
+                if track._stream_caches:
+                    track._stream_caches = {}
+                continue
+            # Blocs nécessaires par son, dans l'ordre des intervalles
+            needed_chunks_by_sound = {}
+            for range_start, range_end in timeline_ranges:
+                first, last = clip_index.find(range_start, range_end - range_start)
+                for clip in clip_index.clips[first:last]:
+                    if clip.sound.is_streaming:
+                        needed_chunks = needed_chunks_by_sound.setdefault(clip.sound, [])
+                        self._add_needed_chunks(clip, [(range_start, range_end)], needed_chunks)
+
+            old_caches = track._stream_caches
+            stream_caches = {}
+            for sound, needed_chunks in needed_chunks_by_sound.items():
+                cache = old_caches.get(sound)
+                if cache is None or cache.num_channels != track.num_channels:
+                    cache = AdikStreamCache(sound, track.num_channels, self.chunk_frames, self.num_slots)
+                cache.fill(needed_chunks)
+                stream_caches[sound] = cache
+                cache_list.append(cache)
+            # Les nouvelles fenêtres sont attachées une fois remplies
+            track._stream_caches = stream_caches
+
+        # Fenêtres retirées depuis la dernière passe: leurs compteurs sont gardés
+        for cache in self._cache_list:
+            if not any(cache is new_cache for new_cache in cache_list):
+                self._add_detached_stats(cache)
+        self._cache_list = cache_list
+
+    #----------------------------------------
+
+    def _add_detached_stats(self, cache):
+        self._detached_underruns += cache.underruns
+        self._detached_underrun_frames += cache.underrun_frames
+        self._detached_chunks_loaded += cache.chunks_loaded
+
+    #----------------------------------------
+
+    def get_summary(self):
+        """ Retourne les compteurs du préchargement sous forme de dictionnaire. """
+        cache_list = self._cache_list
+        return {
+            'running': self.is_running(),
+            'streamed_sounds': len(cache_list),
+            'window_seconds': self.window_frames / self.player.sample_rate,
+            'underruns': self._detached_underruns + sum(cache.underruns for cache in cache_list),
+            'underrun_frames': self._detached_underrun_frames + sum(cache.underrun_frames for cache in cache_list),
+            'chunks_loaded': self._detached_chunks_loaded + sum(cache.chunks_loaded for cache in cache_list),
+        }
+
+    #----------------------------------------
+
+    def reset_stats(self):
+        """ Remet à zéro les compteurs. """
+        self._detached_underruns = 0
+        self._detached_underrun_frames = 0
+        self._detached_chunks_loaded = 0
+        for cache in self._cache_list:
+            cache.underruns = 0
+            cache.underrun_frames = 0
+            cache.chunks_loaded = 0
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    cache = AdikStreamCache(None, 2, 1024, 4)
+    print(cache.read(0, 512, np.zeros((512, 2), dtype=np.float32)))
+    input("It's OK...")
+
+#----------------------------------------
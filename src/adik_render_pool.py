@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+    File: adik_render_pool.py
+    Persistent worker threads that render the track blocks of the audio callback in parallel
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+
+class AdikRenderPool:
+    """
+    Pool de threads persistants qui lisent les blocs des pistes en parallèle pour le callback audio.
+    Chaque thread a des pistes attribuées d'avance (slots worker_idx, worker_idx + num_workers, ...)
+    et écrit le bloc brut de chacune dans son buffer de travail (une ligne de track_buffers):
+    aucune piste n'est lue par deux threads, aucun buffer n'est partagé.
+    Le callback ne fait plus que le mixage final (produit matriciel du mixeur).
+    Les copies et conversions NumPy des pistes libèrent le GIL: le gain dépend du nombre de pistes
+    et de la taille de bloc (voir bench_parallel_render dans adik_bench).
+    La synchronisation n'utilise que des verrous simples (acquire/release), sans allocation par bloc:
+    le verrou de départ de chaque thread est tenu par le callback, qui le relâche pour lancer le bloc,
+    et le thread relâche son verrou de fin quand ses pistes sont lues.
+    """
+    def __init__(self, num_workers):
+        self.num_workers = max(1, num_workers)
+        # Paramètres du bloc en cours, écrits par le callback avant le lancement des threads
+        self._track_list = []
+        self._track_buffers = None
+        self._active = None
+        self._num_frames = 0
+        self._is_running = True
+        self._start_locks = []
+        self._done_locks = []
+        self._threads = []
+        for worker_idx in range(self.num_workers):
+            start_lock = threading.Lock()
+            start_lock.acquire()
+            done_lock = threading.Lock()
+            done_lock.acquire()
+            self._start_locks.append(start_lock)
+            self._done_locks.append(done_lock)
+            thread = threading.Thread(target=self._worker_runner, args=(worker_idx,),
+                                      name=f"AdikRender-{worker_idx}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        print(f"AdikRenderPool: {self.num_workers} threads de rendu démarrés.")
+
+    #----------------------------------------
+
+    def _worker_runner(self, worker_idx):
+        """ Boucle d'un thread: attend le lancement d'un bloc, lit ses pistes, signale la fin. """
+        start_lock = self._start_locks[worker_idx]
+        done_lock = self._done_locks[worker_idx]
+        num_workers = self.num_workers
+        while True:
+            start_lock.acquire()
+            if not self._is_running:
+                done_lock.release()
+                return
+            track_list = self._track_list
+            track_buffers = self._track_buffers
+            active = self._active
+            num_frames = self._num_frames
+            for track_idx in range(worker_idx, len(track_list), num_workers):
+                track = track_list[track_idx]
+                if active[track_idx]:
+                    try:
+                        track.get_audio_block(num_frames, track_buffers[track_idx], apply_gain=False)
+                    except Exception as e:
+                        track_buffers[track_idx].fill(0.0)
+                        print(f"AdikRenderPool: Erreur de lecture de la piste {track.name}: {e}")
+                else:
+                    # Piste inaudible: son gain est nul, on avance seulement sa position
+                    track.playback_position += num_frames
+            done_lock.release()
+
+    #----------------------------------------
+
+    def render(self, track_list, track_buffers, active, num_frames):
+        """
+        Côté callback: lit le bloc de chaque piste active dans sa ligne de track_buffers (sans gain),
+        et avance la position des pistes inactives, en répartissant les pistes entre les threads.
+        Retourne quand toutes les pistes sont lues.
+        """
+        self._track_list = track_list
+        self._track_buffers = track_buffers
+        self._active = active
+        self._num_frames = num_frames
+        for start_lock in self._start_locks:
+            start_lock.release()
+        for done_lock in self._done_locks:
+            done_lock.acquire()
+
+    #----------------------------------------
+
+    def close(self):
+        """ Arrête les threads du pool (hors callback). """
+        if not self._is_running:
+            return
+        self._is_running = False
+        for start_lock in self._start_locks:
+            start_lock.release()
+        for done_lock in self._done_locks:
+            done_lock.acquire()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        print("AdikRenderPool: Threads de rendu arrêtés.")
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    import numpy as np
+    from adik_track import AdikTrack
+    from adik_sound import AdikSound
+    track_list = []
+    for _ in range(4):
+        track = AdikTrack(num_channels=2)
+        track.set_audio_sound(AdikSound.sine_wave(dur=1, amp=0.5))
+        track_list.append(track)
+    track_buffers = np.zeros((4, 512 * 2), dtype=np.float32)
+    pool = AdikRenderPool(2)
+    pool.render(track_list, track_buffers, np.ones(4, dtype=bool), 512)
+    print([track.playback_position for track in track_list], float(np.abs(track_buffers).max()))
+    pool.close()
+    input("It's OK...")
+
+#----------------------------------------
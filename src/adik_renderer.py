@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+    File: adik_renderer.py
+    Offline render engine, faster than realtime
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+from adik_sound import AdikSound
+from adik_wave_handler import AdikWaveHandler
+
+class AdikRenderer:
+    """
+    Rendu hors temps réel du projet, indépendant du pilote audio.
+    Suit les mêmes règles que le callback temps réel (solo, mute, métronome, boucle),
+    mais travaille par grands blocs et ne modifie pas la position de lecture des pistes.
+    """
+    RENDER_BLOCK_FRAMES = 65536 # Taille des blocs internes du rendu
+
+    def __init__(self, player, block_frames=RENDER_BLOCK_FRAMES):
+        self.player = player
+        self.block_frames = block_frames
+        self.num_channels = player.num_output_channels if player is not None else 2
+
+    #----------------------------------------
+
+    def _get_range(self, start_frame, end_frame):
+        """
+        Borne la plage de rendu. end_frame = -1 signifie la fin du projet.
+        """
+        if end_frame == -1:
+            end_frame = self.player.total_duration_frames_cached
+        start_frame = max(0, start_frame)
+        return start_frame, end_frame
+
+    #----------------------------------------
+
+    def _snapshot_gains(self):
+        """
+        Copie la matrice des gains du mixeur (règles de solo et de mute) et la liste des pistes
+        qui lui correspond. La copie est faite dans le thread audio si un stream est actif,
+        pour ne pas croiser le callback temps réel.
+        """
+        engine = self.player.audio_engine
+        mixer = self.player.mixer
+        def snapshot():
+            gain_matrix, active = mixer.compute_gains(recording_replace=False)
+            return gain_matrix.copy(), active.copy(), list(engine._track_list)
+        return engine.send_command(snapshot)
+
+    #----------------------------------------
+
+    def iter_render(self, start_frame=0, end_frame=-1, include_click=False, follow_loop=False):
+        """
+        Générateur: rend le projet de start_frame à end_frame, par blocs de block_frames au plus.
+        Produit des tuples (timeline_frame, block), où block est un tableau (frames, canaux).
+        Le bloc est un buffer réutilisé: il doit être consommé (copié ou écrit) avant le bloc suivant.
+        Si follow_loop est vrai et que la boucle est active, la timeline reboucle comme en lecture,
+        et end_frame - start_frame donne alors le nombre de frames à produire.
+        """
+        start_frame, end_frame = self._get_range(start_frame, end_frame)
+        num_frames_total = end_frame - start_frame
+        if num_frames_total <= 0:
+            return
+
+        player = self.player
+        loop = player.loop_manager
+        snapshot = self._snapshot_gains()
+        if snapshot is None:
+            print("Renderer: Impossible de lire l'état du mixeur.")
+            return
+        gain_matrix, active, track_list = snapshot
+        if len(track_list) != gain_matrix.shape[0]:
+            print("Renderer: Le mixeur n'est pas à jour avec la liste des pistes.")
+            return
+
+        looping = follow_loop and loop.is_looping() and loop._loop_end_frame > loop._loop_start_frame
+        mix_buffer = np.zeros((self.block_frames, self.num_channels), dtype=np.float32)
+        track_buffer = np.zeros(self.block_frames * self.num_channels, dtype=np.float32)
+
+        timeline_pos = start_frame
+        frames_done = 0
+        while frames_done < num_frames_total:
+            num_frames = min(self.block_frames, num_frames_total - frames_done)
+            if looping:
+                if timeline_pos >= loop._loop_end_frame:
+                    timeline_pos = loop._loop_start_frame
+                num_frames = min(num_frames, loop._loop_end_frame - timeline_pos)
+
+            block = mix_buffer[:num_frames]
+            block.fill(0.0)
+            self._render_tracks(track_list, gain_matrix, active, timeline_pos, num_frames, track_buffer, block)
+            if include_click:
+                self._render_click(timeline_pos, num_frames, block)
+
+            yield timeline_pos, block
+            timeline_pos += num_frames
+            frames_done += num_frames
+
+    #----------------------------------------
+
+    def _render_tracks(self, track_list, gain_matrix, active, timeline_pos, num_frames, track_buffer, block):
+        """
+        Ajoute au bloc la contribution de chaque piste audible, avec ses gains par canal.
+        """
+        track_block = track_buffer[:num_frames * self.num_channels]
+        track_2d = track_block.reshape(num_frames, self.num_channels)
+        for track_idx, track in enumerate(track_list):
+            if not active[track_idx] or not track.clips:
+                continue
+            track.read_audio_block(timeline_pos, num_frames, track_block, apply_gain=False)
+            for channel_idx in range(self.num_channels):
+                track_2d[:, channel_idx] *= gain_matrix[track_idx, channel_idx]
+            np.add(block, track_2d, out=block)
+
+    #----------------------------------------
+
+    def _render_click(self, timeline_pos, num_frames, block):
+        """
+        Ajoute les clics du métronome qui tombent dans le bloc.
+        Comme en lecture, le premier temps de chaque mesure de 4 temps est un clic fort.
+        Les clics sont placés exactement sur les temps, et non au début du bloc temps réel qui les contient.
+        """
+        metronome = self.player.metronome
+        frames_per_beat = metronome.frames_per_beat
+        click_sounds = (metronome.strong_beat_click_data, metronome.weak_beat_click_data)
+        if frames_per_beat <= 0 or click_sounds[0] is None or click_sounds[1] is None:
+            return
+
+        click_length = max(click_sounds[0].length_frames, click_sounds[1].length_frames)
+        block_end = timeline_pos + num_frames
+        # Premier temps dont le clic peut encore sonner dans ce bloc
+        first_beat = max(0, (timeline_pos - click_length) // frames_per_beat + 1)
+        beat_idx = first_beat
+        while beat_idx * frames_per_beat < block_end:
+            click_sound = click_sounds[0] if beat_idx % 4 == 0 else click_sounds[1]
+            beat_frame = beat_idx * frames_per_beat
+            click_start = max(beat_frame, timeline_pos)
+            click_end = min(beat_frame + click_sound.length_frames, block_end)
+            if click_end > click_start:
+                click_data = click_sound.audio_data.reshape(-1, click_sound.num_channels)
+                block[click_start - timeline_pos : click_end - timeline_pos] += \
+                    click_data[click_start - beat_frame : click_end - beat_frame]
+            beat_idx += 1
+
+    #----------------------------------------
+
+    def render(self, start_frame=0, end_frame=-1, include_click=False, follow_loop=False):
+        """
+        Rend toute la plage demandée et retourne un buffer 1D de samples entrelacés.
+        """
+        start_frame, end_frame = self._get_range(start_frame, end_frame)
+        num_frames_total = max(0, end_frame - start_frame)
+        output = AdikSound.new_audio_data(num_frames_total * self.num_channels)
+        output_2d = output.reshape(num_frames_total, self.num_channels)
+
+        frames_done = 0
+        for _, block in self.iter_render(start_frame, end_frame, include_click, follow_loop):
+            output_2d[frames_done : frames_done + block.shape[0]] = block
+            frames_done += block.shape[0]
+        return output
+
+    #----------------------------------------
+
+    def render_to_sound(self, start_frame=0, end_frame=-1, include_click=False, follow_loop=False, name="Rendered Audio"):
+        """
+        Rend la plage demandée et retourne un nouvel AdikSound.
+        """
+        return AdikSound(
+            name=name,
+            audio_data=self.render(start_frame, end_frame, include_click, follow_loop),
+            sample_rate=self.player.sample_rate,
+            num_channels=self.num_channels
+        )
+
+    #----------------------------------------
+
+    def export_wav(self, file_path, start_frame=0, end_frame=-1, subtype='PCM_16', progress_callback=None,
+                   include_click=False, follow_loop=False):
+        """
+        Rend la plage demandée et l'écrit dans un fichier au fil du rendu, bloc par bloc
+        (voir AdikWaveHandler.write_blocks): le mix n'est jamais matérialisé en entier.
+        Retourne True si tout a été écrit.
+        """
+        start_frame, end_frame = self._get_range(start_frame, end_frame)
+        blocks = (block for _, block in self.iter_render(start_frame, end_frame, include_click, follow_loop))
+        return AdikWaveHandler.write_blocks(file_path, blocks, self.player.sample_rate, self.num_channels,
+                                            max(0, end_frame - start_frame), subtype, progress_callback=progress_callback)
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    app = AdikRenderer(None)
+    input("It's OK...")
+
+#----------------------------------------
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+    File: adik_ring_buffer.py
+    Single Producer / Single Consumer ring buffer for audio samples
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+class AdikRingBuffer:
+    """
+    Buffer circulaire de samples float32, sans verrou, pour un seul producteur
+    (le callback audio) et un seul consommateur (un thread d'écriture).
+    Le producteur ne modifie que _write_pos, le consommateur ne modifie que _read_pos.
+    Les positions sont des compteurs croissants; leur différence donne le remplissage.
+    """
+    def __init__(self, capacity_samples):
+        self.capacity = int(capacity_samples)
+        self._buffer = np.zeros(self.capacity, dtype=np.float32)
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overflow_samples = 0 # Samples perdus car le buffer était plein
+
+    #----------------------------------------
+
+    def available_read(self):
+        """ Retourne le nombre de samples prêts à être lus. """
+        return self._write_pos - self._read_pos
+
+    #----------------------------------------
+
+    def available_write(self):
+        """ Retourne le nombre de samples pouvant être écrits sans écraser de données. """
+        return self.capacity - (self._write_pos - self._read_pos)
+
+    #----------------------------------------
+
+    def reset(self):
+        """
+        Vide le buffer. Ne doit être appelée que quand ni le producteur
+        ni le consommateur ne sont actifs.
+        """
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overflow_samples = 0
+
+    #----------------------------------------
+
+    def write(self, data):
+        """
+        Côté producteur: copie 'data' (buffer 1D de samples) dans le buffer circulaire.
+        N'alloue aucun tableau. Si 'data' ne tient pas entièrement, il est perdu en entier
+        (ce qui garde les frames alignées) et compté dans overflow_samples.
+        Retourne le nombre de samples écrits.
+        """
+        num_samples = data.size
+        if num_samples > self.available_write():
+            self.overflow_samples += num_samples
+            return 0
+        if num_samples <= 0:
+            return 0
+
+        start_idx = self._write_pos % self.capacity
+        first_part = min(num_samples, self.capacity - start_idx)
+        self._buffer[start_idx : start_idx + first_part] = data[:first_part]
+        if first_part < num_samples:
+            self._buffer[:num_samples - first_part] = data[first_part:num_samples]
+
+        # La position n'est publiée qu'après la copie des données
+        self._write_pos += num_samples
+        return num_samples
+
+    #----------------------------------------
+
+    def read_into(self, out):
+        """
+        Côté consommateur: copie au plus out.size samples dans 'out'.
+        Retourne le nombre de samples lus.
+        """
+        num_samples = min(out.size, self.available_read())
+        if num_samples <= 0:
+            return 0
+
+        start_idx = self._read_pos % self.capacity
+        first_part = min(num_samples, self.capacity - start_idx)
+        out[:first_part] = self._buffer[start_idx : start_idx + first_part]
+        if first_part < num_samples:
+            out[first_part:num_samples] = self._buffer[:num_samples - first_part]
+
+        self._read_pos += num_samples
+        return num_samples
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    ring = AdikRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.float32))
+    out = np.zeros(4, dtype=np.float32)
+    print(ring.read_into(out), out)
+    ring.write(np.arange(6, dtype=np.float32))
+    print(ring.available_read(), ring.overflow_samples)
+
+#----------------------------------------
@@ -5,10 +5,16 @@
     Author: Coolbrother
 """
 import math
+import weakref
 import numpy as np
 
+from adik_peaks import AdikPeaks
+
 class AdikSound:
     _next_id =0
+    is_streaming = False # Vrai pour un son lu depuis le disque bloc par bloc (AdikStreamSound)
+    is_chunked = False # Vrai pour un son stocké par morceaux (AdikChunkSound)
+    is_compact = False # Vrai pour un son stocké en int16 ou float16 (AdikCompactSound)
     def __init__(self, name="Untitled Sound", audio_data=None, sample_rate=44100, num_channels=1):
         self.id = AdikSound._next_id
         AdikSound._next_id += 1
@@ -25,9 +31,12 @@ class AdikSound:
         self._length_frames = 0
         self._length_samples = 0
         self._length_seconds = 0.0 # Nouvelle propriété
+        self._peaks = None # Pyramide de crêtes (AdikPeaks), calculée à la demande
+        self._clips = weakref.WeakSet() # Clips qui jouent ce son, pour reconstruire leurs vues de lecture
 
         if audio_data is not None:
-            self.audio_data = np.array(audio_data, dtype=np.float32).flatten()
+            # Pas de copie si les données sont déjà un buffer float32 contigu (ex: np.memmap)
+            self.audio_data = np.ascontiguousarray(audio_data, dtype=np.float32).reshape(-1)
         
         self.update_params() # Appel initial pour définir les longueurs
 
@@ -49,6 +58,26 @@ class AdikSound:
         if audio_data is None: return
         self.audio_data = audio_data
         self.update_params()
+        # Nouveau buffer: les crêtes seront recalculées à la demande
+        self._peaks = None
+        self.refresh_clips()
+
+    #----------------------------------------
+
+    def register_clip(self, clip):
+        """ Enregistre un clip qui joue ce son (référence faible). """
+        self._clips.add(clip)
+
+    #----------------------------------------
+
+    def refresh_clips(self):
+        """
+        Reconstruit les vues de lecture des clips de ce son après un changement de son buffer.
+        À appeler dans le thread de l'interface, là où le buffer est remplacé: le callback audio ne reconstruit
+        jamais une vue, il lit le clip bloc par bloc tant que la vue n'est pas à jour.
+        """
+        for clip in list(self._clips):
+            clip.refresh()
 
     #----------------------------------------
 
@@ -139,6 +168,7 @@ class AdikSound:
         """
         self.audio_data = np.append(self.audio_data, data).astype(np.float32)
         self.update_params() # Mise à jour après redimensionnement
+        self.refresh_clips()
 
     #----------------------------------------
 
@@ -180,6 +210,130 @@ class AdikSound:
 
     #----------------------------------------
 
+    def get_memory_size(self):
+        """ Retourne la mémoire (en octets) occupée par les données du son, hors fichier projeté en mémoire. """
+        if AdikSound.is_file_mapped(self.audio_data):
+            return 0
+        return self.audio_data.nbytes
+
+    #----------------------------------------
+
+    @staticmethod
+    def is_file_mapped(data):
+        """
+        Retourne True si 'data' est un np.memmap, ou une vue d'un np.memmap:
+        np.ascontiguousarray ou reshape sur une projection mémoire retournent un ndarray simple
+        dont seule la base (.base) est le np.memmap.
+        """
+        while data is not None:
+            if isinstance(data, np.memmap):
+                return True
+            data = getattr(data, 'base', None)
+        return False
+
+    #----------------------------------------
+
+    def move_to_file(self, file_path):
+        """
+        Écrit les données du son dans un fichier .npy et les remplace par une projection mémoire de ce fichier:
+        la mémoire est libérée, le son reste lisible. Les crêtes restent valides.
+        """
+        np.save(file_path, self.audio_data)
+        self.audio_data = np.load(file_path, mmap_mode='r')
+        self.refresh_clips()
+
+    #----------------------------------------
+
+    def get_peaks(self):
+        """ Retourne la pyramide de crêtes du son (AdikPeaks), calculée à la première demande. """
+        if self._peaks is None or self._peaks.num_frames != self.length_frames:
+            self._peaks = AdikPeaks(self).compute()
+        return self._peaks
+
+    #----------------------------------------
+
+    def set_peaks(self, peaks):
+        """ Installe une pyramide de crêtes déjà calculée (fichier de crêtes chargé). """
+        self._peaks = peaks
+
+    #----------------------------------------
+
+    def derive_peaks(self, source_sound, start_frame, end_frame=None):
+        """
+        Reprend les crêtes du son 'source_sound' dont ce son est une édition, et ne recalcule
+        que les frames [start_frame, end_frame) modifiées (jusqu'à la fin du son si end_frame est None).
+        Sans crêtes sur le son source, elles seront calculées à la demande.
+        """
+        source_peaks = source_sound._peaks if source_sound is not None else None
+        if source_peaks is None or source_sound.num_channels != self.num_channels:
+            self._peaks = None
+            return
+        self._peaks = source_peaks.copy_for(self)
+        self._peaks.update_range(start_frame, end_frame)
+
+    #----------------------------------------
+
+    def _get_frames(self, start_frame, num_frames):
+        """
+        Retourne les frames demandées en float32, sous forme de tableau (frames, canaux), sans copie.
+        Les sons lus en streaming (AdikStreamSound) les décodent à la demande.
+        """
+        start_sample = start_frame * self.num_channels
+        end_sample = (start_frame + num_frames) * self.num_channels
+        return self.audio_data[start_sample:end_sample].reshape(num_frames, self.num_channels)
+
+    #----------------------------------------
+
+    def iter_blocks(self, start_frame=0, end_frame=-1, block_frames=65536):
+        """
+        Générateur: parcourt les frames [start_frame, end_frame) du son par blocs (frames, canaux)
+        d'au plus 'block_frames' frames (end_frame = -1: fin du son).
+        Les blocs sont des vues sans copie quand c'est possible (sinon décodés ou rassemblés à la demande):
+        le son n'est jamais matérialisé en entier.
+        """
+        if end_frame == -1 or end_frame > self.length_frames:
+            end_frame = self.length_frames
+        for frame_pos in range(max(0, start_frame), end_frame, block_frames):
+            yield self._get_frames(frame_pos, min(block_frames, end_frame - frame_pos))
+
+    #----------------------------------------
+
+    def read_frames(self, start_frame, num_frames, out):
+        """
+        Copie les frames à partir de start_frame dans 'out', un tableau 2D (frames, canaux)
+        dont le nombre de canaux peut différer de celui du son (mono <-> stéréo).
+        Ne lit pas au-delà de la fin du son, et ne touche pas aux frames de 'out' non lues.
+        Retourne le nombre de frames copiées.
+        """
+        num_frames = min(num_frames, self.length_frames - start_frame, out.shape[0])
+        if start_frame < 0 or num_frames <= 0:
+            return 0
+        AdikSound.copy_frames(self._get_frames(start_frame, num_frames), out[:num_frames])
+        return num_frames
+
+    #----------------------------------------
+
+    @staticmethod
+    def copy_frames(source_data, dest_data):
+        """
+        Copie un bloc 2D (frames, canaux) dans un autre de même longueur, en convertissant les canaux:
+        mono vers plusieurs canaux par duplication, plusieurs canaux vers mono par moyenne.
+        """
+        source_channels = source_data.shape[1]
+        target_channels = dest_data.shape[1]
+        if source_channels == target_channels:
+            dest_data[:] = source_data
+        elif source_channels == 1:
+            dest_data[:] = source_data
+        elif target_channels == 1:
+            np.add(source_data[:, 0], source_data[:, 1], out=dest_data[:, 0])
+            dest_data *= 0.5
+        else:
+            dest_data.fill(0)
+            print(f"Avertissement: Conversion de canaux non gérée: {source_channels} -> {target_channels}.")
+
+    #----------------------------------------
+
     def convert_channels(data: np.ndarray, source_channels: int, target_channels: int, num_frames: int):
         """
         Convertit un bloc audio d'un nombre de canaux à un autre.
@@ -219,12 +373,45 @@ class AdikSound:
 
     #----------------------------------------
 
-    # --- Fonctions de génération de formes d'onde (style C/C++) ---
+    # --- Fonctions de génération de formes d'onde (vectorisées) ---
+    @staticmethod
+    def _check_wave_params(dur, amp, sample_rate, num_channels):
+        """ Vérifie les paramètres communs des générateurs. """
+        if not (0.0 <= amp <= 1.0):
+            raise ValueError("L'amplitude doit être comprise entre 0.0 et 1.0.")
+        if not (dur > 0):
+            raise ValueError("La durée doit être supérieure à 0.")
+        if not (sample_rate > 0):
+            raise ValueError("La fréquence d'échantillonnage doit être supérieure à 0.")
+        if not (num_channels >= 1):
+            raise ValueError("Le nombre de canaux doit être au moins 1.")
+
+    #----------------------------------------
+
+    @staticmethod
+    def _get_wave_times(dur, sample_rate):
+        """ Retourne le temps (en secondes, float64) de chaque frame du son à générer. """
+        return np.arange(int(sample_rate * dur), dtype=np.float64) / sample_rate
+
+    #----------------------------------------
+
+    @classmethod
+    def _from_wave(cls, name, wave, sample_rate, num_channels):
+        """
+        Crée le son à partir d'une onde mono (une valeur par frame): le buffer entrelacé
+        est rempli par une seule affectation avec diffusion (broadcast) de l'onde sur tous les canaux.
+        """
+        num_frames = wave.shape[0]
+        audio_buffer = np.empty(num_frames * num_channels, dtype=np.float32)
+        audio_buffer.reshape(num_frames, num_channels)[:] = wave[:, np.newaxis]
+        return cls(name=name, audio_data=audio_buffer, sample_rate=sample_rate, num_channels=num_channels)
+
+    #----------------------------------------
+
     @classmethod
     def sine_wave(cls, freq=440, dur=1, amp=1.0, sample_rate=44100, num_channels=1):
         """
-        Génère une onde sinusoïdale en utilisant des boucles explicites,
-        produisant directement des données entrelacées.
+        Génère une onde sinusoïdale, produisant directement des données entrelacées.
         
         Args:
             freq (float): Fréquence de l'onde en Hz.
@@ -236,40 +423,18 @@ class AdikSound:
         Returns:
             AdikSound: Une instance de AdikSound contenant l'onde sinusoïdale.
         """
-        if not (0.0 <= amp <= 1.0):
-            raise ValueError("L'amplitude doit être comprise entre 0.0 et 1.0.")
-        if not (dur > 0):
-            raise ValueError("La durée doit être supérieure à 0.")
-        if not (sample_rate > 0):
-            raise ValueError("La fréquence d'échantillonnage doit être supérieure à 0.")
-        if not (num_channels >= 1):
-            raise ValueError("Le nombre de canaux doit être au moins 1.")
-
-        num_frames = int(sample_rate * dur)
-        total_samples = num_frames * num_channels
-        audio_buffer = np.zeros(total_samples, dtype=np.float32)
-        
-        # Calcul de l'incrément de phase par échantillon
-        phase_increment = (2 * math.pi * freq) / sample_rate
-        
-        for frame_idx in range(num_frames):
-            current_time = float(frame_idx) / sample_rate
-            sample_value = amp * math.sin(current_time * 2 * math.pi * freq)
-            
-            for channel_idx in range(num_channels):
-                # Stockage entrelacé: sample_de_ch1, sample_de_ch2, ..., sample_de_chN, sample_suivant_de_ch1, ...
-                audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
-                
-        return cls(name=f"Onde Sinus ({freq}Hz)", audio_data=audio_buffer, 
-                   sample_rate=sample_rate, num_channels=num_channels)
+        cls._check_wave_params(dur, amp, sample_rate, num_channels)
+        times = cls._get_wave_times(dur, sample_rate)
+        # Même ordre des opérations que l'ancienne boucle (math.sin): mêmes valeurs
+        wave = amp * np.sin(times * 2 * math.pi * freq)
+        return cls._from_wave(f"Onde Sinus ({freq}Hz)", wave, sample_rate, num_channels)
 
     #----------------------------------------
 
     @classmethod
     def square_wave(cls, freq=440, dur=1, amp=1.0, sample_rate=44100, num_channels=1, duty_cycle=0.5):
         """
-        Génère une onde carrée en utilisant des boucles explicites,
-        produisant directement des données entrelacées.
+        Génère une onde carrée, produisant directement des données entrelacées.
         
         Args:
             freq (float): Fréquence de l'onde en Hz.
@@ -283,76 +448,91 @@ class AdikSound:
         Returns:
             AdikSound: Une instance de AdikSound contenant l'onde carrée.
         """
-        if not (0.0 <= amp <= 1.0):
-            raise ValueError("L'amplitude doit être comprise entre 0.0 et 1.0.")
+        cls._check_wave_params(dur, amp, sample_rate, num_channels)
         if not (0.0 <= duty_cycle <= 1.0):
             raise ValueError("Le rapport cyclique (duty_cycle) doit être compris entre 0.0 et 1.0.")
-        if not (dur > 0):
-            raise ValueError("La durée doit être supérieure à 0.")
-        if not (sample_rate > 0):
-            raise ValueError("La fréquence d'échantillonnage doit être supérieure à 0.")
-        if not (num_channels >= 1):
-            raise ValueError("Le nombre de canaux doit être au moins 1.")
+        times = cls._get_wave_times(dur, sample_rate)
+        # Phase dans le cycle [0, 1) (np.fmod, comme math.fmod)
+        phase_in_cycle = np.fmod(times * freq, 1.0)
+        wave = np.where(phase_in_cycle < duty_cycle, amp, -amp)
+        return cls._from_wave(f"Onde Carrée ({freq}Hz)", wave, sample_rate, num_channels)
 
-        num_frames = int(sample_rate * dur)
-        total_samples = num_frames * num_channels
-        audio_buffer = np.zeros(total_samples, dtype=np.float32)
+    #----------------------------------------
+
+    @classmethod
+    def saw_wave(cls, freq=440, dur=1, amp=1.0, sample_rate=44100, num_channels=1):
+        """
+        Génère une onde en dent de scie (montante, de -amp à +amp sur chaque cycle),
+        produisant directement des données entrelacées.
         
-        for frame_idx in range(num_frames):
-            current_time = float(frame_idx) / sample_rate
-            
-            # Calcul de la phase dans le cycle [0, 1)
-            # Utilisation de math.fmod pour simuler l'opérateur modulo en C++ pour les floats
-            phase_in_cycle = math.fmod(current_time * freq, 1.0)
-            
-            sample_value = 0.0
-            if phase_in_cycle < duty_cycle:
-                sample_value = amp
-            else:
-                sample_value = -amp
+        Args:
+            freq (float): Fréquence de l'onde en Hz.
+            dur (float): Durée du son en secondes.
+            amp (float): Amplitude de l'onde (0.0 à 1.0).
+            sample_rate (int): Fréquence d'échantillonnage en Hz.
+            num_channels (int): Nombre de canaux (1 pour mono, 2 pour stéréo).
             
-            for channel_idx in range(num_channels):
-                audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
-                
-        return cls(name=f"Onde Carrée ({freq}Hz)", audio_data=audio_buffer, 
+        Returns:
+            AdikSound: Une instance de AdikSound contenant l'onde en dent de scie.
+        """
+        cls._check_wave_params(dur, amp, sample_rate, num_channels)
+        times = cls._get_wave_times(dur, sample_rate)
+        phase_in_cycle = np.fmod(times * freq, 1.0)
+        wave = amp * (2.0 * phase_in_cycle - 1.0)
+        return cls._from_wave(f"Onde Dent de Scie ({freq}Hz)", wave, sample_rate, num_channels)
 
     #----------------------------------------
-                   sample_rate=sample_rate, num_channels=num_channels)
 
     @classmethod
-    def white_noise(cls, dur=1, amp=1.0, sample_rate=44100, num_channels=1):
+    def triangle_wave(cls, freq=440, dur=1, amp=1.0, sample_rate=44100, num_channels=1):
         """
-        Génère un bruit blanc en utilisant des boucles explicites,
+        Génère une onde triangulaire (qui part de 0 en montant, comme le sinus),
         produisant directement des données entrelacées.
         
         Args:
+            freq (float): Fréquence de l'onde en Hz.
             dur (float): Durée du son en secondes.
-            amp (float): Amplitude du bruit (0.0 à 1.0).
+            amp (float): Amplitude de l'onde (0.0 à 1.0).
             sample_rate (int): Fréquence d'échantillonnage en Hz.
             num_channels (int): Nombre de canaux (1 pour mono, 2 pour stéréo).
             
         Returns:
-            AdikSound: Une instance de AdikSound contenant le bruit blanc.
+            AdikSound: Une instance de AdikSound contenant l'onde triangulaire.
         """
-        if not (0.0 <= amp <= 1.0):
-            raise ValueError("L'amplitude doit être comprise entre 0.0 et 1.0.")
-        if not (dur > 0):
-            raise ValueError("La durée doit être supérieure à 0.")
-        if not (sample_rate > 0):
-            raise ValueError("La fréquence d'échantillonnage doit être supérieure à 0.")
-        if not (num_channels >= 1):
-            raise ValueError("Le nombre de canaux doit être au moins 1.")
+        cls._check_wave_params(dur, amp, sample_rate, num_channels)
+        times = cls._get_wave_times(dur, sample_rate)
+        # Décalage d'un quart de cycle: 0 au début, +amp au quart, -amp aux trois quarts
+        phase_in_cycle = np.fmod(times * freq + 0.25, 1.0)
+        wave = amp * (1.0 - 4.0 * np.abs(phase_in_cycle - 0.5))
+        return cls._from_wave(f"Onde Triangle ({freq}Hz)", wave, sample_rate, num_channels)
 
-        num_frames = int(sample_rate * dur)
-        total_samples = num_frames * num_channels
-        audio_buffer = np.zeros(total_samples, dtype=np.float32)
+    #----------------------------------------
+
+    @classmethod
+    def white_noise(cls, dur=1, amp=1.0, sample_rate=44100, num_channels=1, seed=None):
+        """
+        Génère un bruit blanc (indépendant sur chaque canal), produisant directement des données entrelacées.
         
-        for sample_idx in range(total_samples):
-            # Générer une valeur aléatoire entre -amp et +amp
-            # np.random.uniform(low, high) est l'équivalent simple de C++ rand() normalisé
-            audio_buffer[sample_idx] = np.random.uniform(-amp, amp)
+        Args:
+            dur (float): Durée du son en secondes.
+            amp (float): Amplitude du bruit (0.0 à 1.0).
+            sample_rate (int): Fréquence d'échantillonnage en Hz.
+            num_channels (int): Nombre de canaux (1 pour mono, 2 pour stéréo).
+            seed (int | np.random.Generator | None): Graine du générateur (np.random.default_rng),
+                                 pour un bruit reproductible, ou générateur déjà créé.
             
+        Returns:
+            AdikSound: Une instance de AdikSound contenant le bruit blanc.
+        """
+        cls._check_wave_params(dur, amp, sample_rate, num_channels)
+        rng = np.random.default_rng(seed)
+        num_frames = int(sample_rate * dur)
+        audio_buffer = np.empty(num_frames * num_channels, dtype=np.float32)
+        # Tirage uniforme dans [0, 1) directement en float32 dans le buffer, ramené à [-amp, +amp)
+        rng.random(out=audio_buffer, dtype=np.float32)
+        audio_buffer *= np.float32(2 * amp)
+        audio_buffer -= np.float32(amp)
         return cls(name="Bruit Blanc", audio_data=audio_buffer, 
                    sample_rate=sample_rate, num_channels=num_channels)
-    #----------------------------------------
 
+    #----------------------------------------
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+    File: adik_stream_sound.py
+    Sound streamed from an uncompressed WAV file through a memory map
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import threading
+import numpy as np
+
+from adik_sound import AdikSound
+
+# Codes de format WAV (voir adik_wave_handler)
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+class AdikStreamSound(AdikSound):
+    """
+    Son lu directement dans un fichier WAV non compressé, sans le charger en mémoire.
+    Le chunk 'data' du fichier est projeté en mémoire (np.memmap), et seuls les blocs lus
+    sont convertis en float32, bloc par bloc (PCM 16, 24 et 32 bits, float 32 bits).
+    La mémoire résidente suit donc ce qui est joué, et non la taille du projet:
+    les pages du fichier sont chargées à la demande et peuvent être libérées par le système.
+
+    Les fonctions d'édition qui ont besoin de tout le buffer (audio_data) le décodent
+    en entier une seule fois: le son n'est alors plus lu en streaming.
+    """
+    is_streaming = True
+
+    def __init__(self, file_path, layout, name=None):
+        self.file_path = file_path
+        self.sample_format = self._get_sample_format(layout)
+        if self.sample_format is None:
+            raise ValueError(f"Format WAV non géré en streaming: format {layout['format_tag']}, {layout['bits_per_sample']} bits.")
+
+        num_channels = layout['num_channels']
+        num_frames = layout['data_size'] // layout['block_align']
+        self._raw_data = self._map_data(file_path, layout, num_frames, num_channels)
+        self._stream_frames = num_frames
+        self._local = threading.local() # Buffers de décodage, un par thread lecteur
+        self._audio_data = None # Buffer complet, seulement s'il est demandé
+
+        super().__init__(name=name if name is not None else os.path.basename(file_path),
+                         audio_data=None, sample_rate=layout['sample_rate'], num_channels=num_channels)
+        # Le constructeur de base a installé un buffer vide: on revient au mode streaming
+        self._audio_data = None
+        self.update_params()
+
+    #----------------------------------------
+
+    @staticmethod
+    def _get_sample_format(layout):
+        """ Retourne le format des samples ('int16', 'int24', 'int32', 'float32'), ou None s'il n'est pas géré. """
+        bits_per_sample = layout['bits_per_sample']
+        if layout['format_tag'] == WAVE_FORMAT_PCM and bits_per_sample in (16, 24, 32):
+            return f"int{bits_per_sample}"
+        if layout['format_tag'] == WAVE_FORMAT_IEEE_FLOAT and bits_per_sample == 32:
+            return "float32"
+        return None
+
+    #----------------------------------------
+
+    def _map_data(self, file_path, layout, num_frames, num_channels):
+        """ Projette le chunk 'data' en mémoire, en lecture seule, avec un tableau (frames, canaux). """
+        if num_frames == 0:
+            return None
+        offset = layout['data_offset']
+        if self.sample_format == "int24":
+            # Pas de type 24 bits: les 3 octets de chaque sample sont décodés par bloc
+            return np.memmap(file_path, dtype=np.uint8, mode='r', offset=offset, shape=(num_frames, num_channels, 3))
+        dtype = {"int16": '<i2', "int32": '<i4', "float32": '<f4'}[self.sample_format]
+        return np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=(num_frames, num_channels))
+
+    #----------------------------------------
+
+    @property
+    def audio_data(self):
+        """
+        Buffer complet du son (1D entrelacé). En streaming, il est décodé en entier
+        à la première demande, et le son n'est plus lu en streaming ensuite.
+        """
+        if self._audio_data is None and self.is_streaming:
+            print(f"AdikStreamSound '{self.name}': Décodage complet du fichier en mémoire.")
+            decoded_data = np.empty((self._stream_frames, self.num_channels), dtype=np.float32)
+            for start_frame in range(0, self._stream_frames, 65536):
+                num_frames = min(65536, self._stream_frames - start_frame)
+                decoded_data[start_frame : start_frame + num_frames] = self._decode_frames(start_frame, num_frames)
+            self._audio_data = decoded_data.reshape(-1)
+            self.is_streaming = False
+            self.refresh_clips()
+        return self._audio_data
+
+    @audio_data.setter
+    def audio_data(self, audio_data):
+        # Un nouveau buffer (édition) remplace le streaming
+        self._audio_data = audio_data
+        if audio_data is not None and audio_data.size > 0:
+            self.is_streaming = False
+
+    #----------------------------------------
+
+    def update_params(self):
+        """ Les longueurs d'un son en streaming viennent de l'en-tête du fichier. """
+        if not self.is_streaming:
+            super().update_params()
+            return
+        self._length_frames = self._stream_frames
+        self._length_samples = self._stream_frames * self.num_channels
+        self._length_seconds = self._stream_frames / self.sample_rate if self.sample_rate > 0 else 0.0
+
+    #----------------------------------------
+
+    def get_memory_size(self):
+        """ En streaming, le son n'occupe que les pages du fichier lues par le système. """
+        if self.is_streaming:
+            return 0
+        return super().get_memory_size()
+
+    #----------------------------------------
+
+    def get_length_samples(self):
+        return self._length_samples
+
+    #----------------------------------------
+
+    def get_length_frames(self):
+        return self._length_frames
+
+    #----------------------------------------
+
+    def get_duration_seconds(self):
+        return self._length_seconds
+
+    #----------------------------------------
+
+    def _get_buffer(self, name, shape, dtype):
+        """
+        Retourne un buffer de décodage du thread appelant, agrandi si nécessaire.
+        Il n'est alloué qu'au premier bloc d'un thread, ou quand les blocs grandissent.
+        """
+        buffer = getattr(self._local, name, None)
+        if buffer is None or buffer.shape[0] < shape[0]:
+            buffer = np.empty(shape, dtype=dtype)
+            setattr(self._local, name, buffer)
+        return buffer[:shape[0]]
+
+    #----------------------------------------
+
+    def _decode_frames(self, start_frame, num_frames):
+        """
+        Retourne les frames demandées, converties en float32, sous forme de tableau (frames, canaux).
+        Le float 32 bits est lu directement dans la projection; les formats entiers
+        sont convertis dans un buffer de décodage réutilisé.
+        """
+        raw_block = self._raw_data[start_frame : start_frame + num_frames]
+        if self.sample_format == "float32":
+            return raw_block
+
+        decoded = self._get_buffer('decoded', (num_frames, self.num_channels), np.float32)
+        if self.sample_format == "int16":
+            np.multiply(raw_block, np.float32(1.0 / 32768.0), out=decoded, dtype=np.float32)
+        elif self.sample_format == "int32":
+            np.multiply(raw_block, np.float32(1.0 / 2147483648.0), out=decoded, dtype=np.float32)
+        else:
+            # 24 bits: les 3 octets sont placés en poids fort d'un entier 32 bits signé
+            packed = self._get_buffer('packed', (num_frames, self.num_channels, 4), np.uint8)
+            packed[:, :, 0] = 0
+            packed[:, :, 1:] = raw_block
+            int_view = packed.view('<i4').reshape(num_frames, self.num_channels)
+            np.multiply(int_view, np.float32(1.0 / 2147483648.0), out=decoded, dtype=np.float32)
+        return decoded
+
+    #----------------------------------------
+
+    def _get_frames(self, start_frame, num_frames):
+        if not self.is_streaming:
+            return super()._get_frames(start_frame, num_frames)
+        return self._decode_frames(start_frame, num_frames)
+
+    #----------------------------------------
+
+    def __str__(self):
+        # Sans passer par audio_data, qui décoderait tout le fichier
+        return (f"AdikStreamSound(Name='{self.name}', SR={self.sample_rate}, "
+                f"Channels={self.num_channels}, Duration={self.get_duration_seconds():.2f}s, "
+                f"Samples={self.get_length_samples()}, Format={self.sample_format}, Streaming={self.is_streaming})")
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    print(AdikStreamSound._get_sample_format({'format_tag': WAVE_FORMAT_PCM, 'bits_per_sample': 24}))
+    input("It's OK...")
+
+#----------------------------------------
@@ -1,6 +1,9 @@
 # adik_track.py
 import numpy as np
 from adik_sound import AdikSound # Pour associer un son à la piste
+from adik_clip import AdikClip
+from adik_clip_index import AdikClipIndex
+from adik_peaks import AdikPeaks
 
 class AdikTrack:
     _next_id = 0 # Pour générer des IDs uniques de piste
@@ -9,6 +12,13 @@ class AdikTrack:
     RECORDING_MODE_REPLACE = 0
     RECORDING_MODE_MIX = 1
 
+    # Définition des noyaux de mixage
+    MIX_MODE_LOOP = 0 # Ancien mixage, échantillon par échantillon
+    MIX_MODE_VECTORIZED = 1 # Mixage par blocs avec NumPy
+    MIX_MODE_MATRIX = 2 # Mixage de toutes les pistes par le mixeur (produit matriciel), dans le moteur
+    mix_mode = MIX_MODE_MATRIX
+    RANGE_FRAMES = 65536 # Taille des blocs du mixage hors ligne (mix_range)
+
     def __init__(self, name=None, sample_rate=44100, num_channels=2):
         self.id = AdikTrack._next_id
         AdikTrack._next_id += 1
@@ -17,15 +27,29 @@ class AdikTrack:
         self.sample_rate = sample_rate
         self.num_channels = num_channels # Les canaux de sortie de la piste (typiquement 2 pour stéréo)
 
-        self.audio_sound = None # Un objet AdikSound chargé dans cette piste
+        # Clips de la piste (AdikClip), triés par position sur la timeline.
+        # offset_frames et audio_sound sont déduits des clips
+        self.clips = []
+        # Index des clips pour la recherche des clips d'un bloc, remplacé avec la liste,
+        # et curseur du dernier bloc lu par get_audio_block (lecture séquentielle en O(1) amorti)
+        self._clip_index = AdikClipIndex(self.clips)
+        self._playback_cursor = [None, 0, 0, 0, 0]
+        # Fenêtres préchargées des sons en streaming (son -> AdikStreamCache), remplacées par AdikPrefetcher
+        self._stream_caches = {}
+        self._consolidated_sound = None # Son consolidé des clips, pour audio_sound
+        self._clip_buffer = None # Buffer de travail pour additionner les clips en streaming
+        self._update_duration()
         self.playback_position = 0 # Position de lecture actuelle en FRAMES (non en samples)
-        self.offset_frames = 0 # Offset en frames pour le début du son sur la piste
 
-        self.volume = 1.0 # Volume linéaire (0.0 à 1.0)
-        self.volume_mix = 0.8 # volume global
-        self.left_gain =1.0
-        self.right_gain =1.0
-        self.pan = 0.0     # Panoramique (-1.0 pour gauche, 0.0 pour centre, 1.0 pour droite)
+        # Mixeur auquel la piste est attachée, et son slot dans les tableaux du mixeur
+        self._mixer = None
+        self._mixer_slot = -1
+
+        self._volume = 1.0 # Volume linéaire (0.0 à 1.0)
+        self._volume_mix = 0.8 # volume global
+        self._left_gain =1.0
+        self._right_gain =1.0
+        self._pan = 0.0     # Panoramique (-1.0 pour gauche, 0.0 pour centre, 1.0 pour droite)
 
         self._muted = False
         self._solo = False
@@ -50,23 +74,162 @@ class AdikTrack:
 
     #----------------------------------------
 
+    def set_muted(self, muted):
+        self._muted = muted
+        self._set_mixer_param('muted', muted)
+
+    #----------------------------------------
+
+    def set_solo(self, solo):
+        self._solo = solo
+        self._set_mixer_param('solo', solo)
+
+    #----------------------------------------
+
+    def set_armed(self, armed):
+        self._armed = armed
+        self._set_mixer_param('armed', armed)
+
+    #----------------------------------------
+
+    # --- Paramètres de mixage ---
+    # Chaque modification est aussi écrite dans les tableaux du mixeur, si la piste y est attachée.
+    def _attach_mixer(self, mixer, slot):
+        """ Attache la piste à un slot des tableaux du mixeur. """
+        self._mixer = mixer
+        self._mixer_slot = slot
+
+    #----------------------------------------
+
+    def _set_mixer_param(self, name, value):
+        if self._mixer is not None:
+            self._mixer.set_track_param(self, name, value)
+
+    #----------------------------------------
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+        self._set_mixer_param('volume', value)
+
+    #----------------------------------------
+
+    @property
+    def volume_mix(self):
+        return self._volume_mix
+
+    @volume_mix.setter
+    def volume_mix(self, value):
+        self._volume_mix = value
+        self._set_mixer_param('volume_mix', value)
+
+    #----------------------------------------
+
+    @property
+    def pan(self):
+        return self._pan
+
+    @pan.setter
+    def pan(self, value):
+        self._pan = value
+        self._set_mixer_param('pan', value)
+
+    #----------------------------------------
+
+    @property
+    def left_gain(self):
+        return self._left_gain
+
+    @left_gain.setter
+    def left_gain(self, value):
+        self._left_gain = value
+        self._set_mixer_param('left_gain', value)
+
+    #----------------------------------------
+
+    @property
+    def right_gain(self):
+        return self._right_gain
+
+    @right_gain.setter
+    def right_gain(self, value):
+        self._right_gain = value
+        self._set_mixer_param('right_gain', value)
+
+    #----------------------------------------
+
     def _update_duration(self):
         """
         Met à jour la longueur en frames et en secondes de la piste
-        en fonction de la taille de ses données audio.
+        en fonction de ses clips: du début du premier clip à la fin du dernier.
         Cette fonction est essentielle pour les opérations d'édition.
         """
-        if self.audio_sound is not None:
-            self.length_frames = self.audio_sound.length_frames
-            self.length_seconds = self.audio_sound.length_seconds
+        clips = self.clips
+        if clips:
+            self.start_frame = min(clip.timeline_start for clip in clips)
+            self.end_frame = max(clip.timeline_end for clip in clips)
         else:
-            self.length_frames = 0
-            self.length_seconds = 0.0
+            self.start_frame = 0
+            self.end_frame = 0
+        self.length_frames = self.end_frame - self.start_frame
+        self.length_seconds = self.length_frames / self.sample_rate if self.sample_rate > 0 else 0.0
+        self._consolidated_sound = None
+
+    #----------------------------------------
+
+    @property
+    def audio_sound(self):
+        """
+        Son de la piste, placé à offset_frames sur la timeline.
+        Avec un seul clip qui joue tout son son, c'est ce son; sinon les clips sont consolidés
+        en un nouveau son, calculé une fois par édition.
+        La lecture et l'édition passent par les clips, sans consolidation.
+        """
+        if not self.clips:
+            return None
+        whole_sound = self.get_whole_sound()
+        if whole_sound is not None:
+            return whole_sound
+        if self._consolidated_sound is None:
+            self._consolidated_sound = self._consolidate_clips()
+        return self._consolidated_sound
+
+    #----------------------------------------
+
+    @property
+    def offset_frames(self):
+        """ Position sur la timeline du début de la piste (début de son premier clip). """
+        return self.start_frame
+
+    @offset_frames.setter
+    def offset_frames(self, value):
+        # Déplace tous les clips de la piste
+        self.move_clips(value - self.start_frame)
+
+    #----------------------------------------
+
+    def get_whole_sound(self):
+        """ Retourne le son de la piste si elle n'a qu'un clip qui le joue en entier, sinon None. """
+        clips = self.clips
+        if len(clips) == 1 and clips[0].source_start == 0 and clips[0].length == clips[0].sound.length_frames:
+            return clips[0].sound
+        return None
 
     #----------------------------------------
 
+    def _consolidate_clips(self):
+        """ Retourne un son contenant le rendu des clips de la piste, sans volume ni panoramique. """
+        audio_data = AdikSound.new_audio_data(self.length_frames * self.num_channels)
+        self.read_audio_block(self.start_frame, self.length_frames, audio_data, apply_gain=False)
+        return AdikSound(name=f"{self.name}_clips", audio_data=audio_data,
+                         sample_rate=self.sample_rate, num_channels=self.num_channels)
+
+    #----------------------------------------
 
-    
     def get_audio_sound(self):
         """ Retourne l'objet AdikSound """
         return self.audio_sound
@@ -75,35 +238,12 @@ class AdikTrack:
 
     def set_audio_sound(self, sound: AdikSound, offset_frames: int = 0):
         """
-        Assigne un objet AdikSound à la piste.
-        Si le nombre de canaux du son ne correspond pas à la piste, il est converti.
+        Assigne un objet AdikSound à la piste: elle ne contient plus qu'un clip qui joue tout le son.
+        Si le nombre de canaux du son ne correspond pas à la piste, le clip le convertit une seule fois
+        (un son en streaming ou par morceaux est converti bloc par bloc à la lecture).
         """
-        # Conversion des canaux si nécessaire
-        if sound.num_channels != self.num_channels:
-            print(f"Conversion des canaux du son '{sound.name}' de {sound.num_channels} vers {self.num_channels} pour la piste '{self.name}'.")
-            
-            # Utilisation de la fonction de conversion statique de AdikSound
-            converted_data = AdikSound.convert_channels(
-                sound.audio_data,
-                sound.num_channels,
-                self.num_channels,
-                sound.length_frames
-            )
-            
-            # Créer un nouvel objet AdikSound avec les données converties
-            converted_sound = AdikSound(
-                name=f"{sound.name}_converted",
-                audio_data=converted_data,
-                sample_rate=sound.sample_rate,
-                num_channels=self.num_channels
-            )
-            self.audio_sound = converted_sound
-        else:
-            self.audio_sound = sound
-            
-        self.offset_frames = offset_frames
-        self._update_duration()
-        print(f"Son '{self.audio_sound.name}' assigné à la piste '{self.name}' avec un offset de {self.offset_frames} frames.")
+        self._set_clips([AdikClip(sound, offset_frames)])
+        print(f"Son '{sound.name}' assigné à la piste '{self.name}' avec un offset de {offset_frames} frames.")
 
     #----------------------------------------
 
@@ -116,220 +256,440 @@ class AdikTrack:
     #----------------------------------------
 
     def set_audio_data(self, audio_data):
-        if self.audio_sound is not None:
-            self.audio_sound.set_audio_data(audio_data)
-            self._update_duration()
+        """ Remplace les données du son de la piste, qui ne contient plus qu'un clip jouant tout ce son. """
+        sound = self.audio_sound
+        if sound is not None:
+            sound.set_audio_data(audio_data)
+            self._set_clips([AdikClip(sound, self.start_frame)])
+
+    #----------------------------------------
+
+    # --- Gestion des clips ---
+    def get_clips(self):
+        """ Retourne une copie de la liste des clips, triée par position sur la timeline. """
+        return list(self.clips)
 
     #----------------------------------------
 
-    def get_audio_block(self, num_frames_to_generate):
+    def set_clips(self, clips):
+        """ Remplace les clips de la piste par une copie de la liste 'clips' (retour à un état de l'historique). """
+        self._set_clips(list(clips))
+
+    #----------------------------------------
+
+    def _set_clips(self, clips):
+        """
+        Installe une nouvelle liste de clips, triée par position.
+        La liste et son index sont remplacés d'un bloc, jamais modifiés en place:
+        le callback audio lit toujours un index complet, sans verrou.
+        """
+        for clip in clips:
+            clip.prepare(self.num_channels)
+        clips.sort(key=lambda clip: clip.timeline_start)
+        self._clip_index = AdikClipIndex(clips)
+        self.clips = clips
+        self._update_duration()
+
+    #----------------------------------------
+
+    def _cut_clips(self, start_frame, end_frame):
+        """
+        Retourne une nouvelle liste des clips de la piste sans la zone [start_frame, end_frame)
+        de la timeline: les clips à cheval sur la zone sont raccourcis ou coupés en deux.
+        """
+        clips = []
+        for clip in self.clips:
+            if clip.timeline_end <= start_frame or clip.timeline_start >= end_frame:
+                clips.append(clip)
+                continue
+            clip_before = clip.trimmed(clip.timeline_start, start_frame)
+            clip_after = clip.trimmed(end_frame, clip.timeline_end)
+            if clip_before is not None:
+                clips.append(clip_before)
+            if clip_after is not None:
+                clips.append(clip_after)
+        return clips
+
+    #----------------------------------------
+
+    def add_clip(self, clip, recording_mode=RECORDING_MODE_REPLACE, replace_end_frame=None):
+        """
+        Place un clip sur la piste.
+        En mode remplacement, la zone qu'il couvre (jusqu'à replace_end_frame si donné) est retirée des autres clips;
+        en mode mixage, il se superpose aux clips existants et ils sont additionnés à la lecture.
+        """
+        if recording_mode == AdikTrack.RECORDING_MODE_REPLACE:
+            replace_end_frame = clip.timeline_end if replace_end_frame is None else max(replace_end_frame, clip.timeline_end)
+            clips = self._cut_clips(clip.timeline_start, replace_end_frame)
+        else:
+            clips = list(self.clips)
+        clips.append(clip)
+        self._set_clips(clips)
+        return clip
+
+    #----------------------------------------
+
+    def erase_range(self, start_frame, end_frame):
+        """ Remplace par du silence la zone [start_frame, end_frame) de la timeline. La longueur de la piste ne change pas. """
+        self._set_clips(self._cut_clips(start_frame, end_frame))
+
+    #----------------------------------------
+
+    def delete_range(self, start_frame, end_frame):
+        """ Supprime la zone [start_frame, end_frame) de la timeline: les clips qui suivent sont avancés d'autant. """
+        num_frames_deleted = end_frame - start_frame
+        clips = []
+        for clip in self._cut_clips(start_frame, end_frame):
+            if clip.timeline_start >= end_frame:
+                clip = clip.copy(timeline_start=clip.timeline_start - num_frames_deleted)
+            clips.append(clip)
+        self._set_clips(clips)
+
+    #----------------------------------------
+
+    def move_clips(self, delta_frames):
+        """ Déplace tous les clips de la piste de 'delta_frames' frames sur la timeline. """
+        if delta_frames:
+            self._set_clips([clip.copy(timeline_start=clip.timeline_start + delta_frames) for clip in self.clips])
+
+    #----------------------------------------
+
+    def clear_clips(self):
+        """ Retire tous les clips: la piste devient vide. """
+        self._set_clips([])
+
+    #----------------------------------------
+
+    def get_overview(self, width, start_frame, end_frame):
+        """
+        Retourne une ligne de 'width' caractères représentant la forme d'onde de la piste
+        entre les frames [start_frame, end_frame) de la timeline, à partir des crêtes des sons des clips.
+        """
+        overview = [" "] * width
+        total_frames = max(1, end_frame - start_frame)
+        clip_index = self._clip_index
+        first, last = clip_index.find(start_frame, total_frames)
+        for clip in clip_index.clips[first:last]:
+            clip_start = max(clip.timeline_start, start_frame)
+            clip_end = min(clip.timeline_end, end_frame)
+            if clip_end <= clip_start:
+                continue
+            first_column = min(width - 1, (clip_start - start_frame) * width // total_frames)
+            num_columns = max(1, min(width - first_column, -(-(clip_end - clip_start) * width // total_frames)))
+            source_start = clip.source_start + (clip_start - clip.timeline_start)
+            clip_overview = clip.sound.get_peaks().get_overview(num_columns, source_start, source_start + (clip_end - clip_start))
+            for column_idx, char in enumerate(clip_overview):
+                # Clips superposés: le caractère le plus haut l'emporte
+                current_char = overview[first_column + column_idx]
+                if AdikPeaks.OVERVIEW_CHARS.index(char) > AdikPeaks.OVERVIEW_CHARS.index(current_char):
+                    overview[first_column + column_idx] = char
+        return "".join(overview)
+
+    #----------------------------------------
+
+    def get_audio_block(self, num_frames_to_generate, out=None, apply_gain=True):
         """
         Génère un bloc audio pour la lecture de cette piste, en tenant compte de l'offset.
         Retourne un tableau NumPy de float32 (frames * num_channels).
+        Si 'out' est fourni (buffer de travail préalloué), le bloc y est écrit directement
+        et aucun tableau n'est alloué.
+        Si 'apply_gain' est False, le bloc est retourné sans volume ni panoramique
+        (le mixeur les applique alors lui-même).
         Met à jour la position de lecture de la piste.
         """
-        output_block = AdikSound.new_audio_data(num_frames_to_generate * self.num_channels)
+        num_samples = num_frames_to_generate * self.num_channels
+        if out is None:
+            output_block = AdikSound.new_audio_data(num_samples)
+        else:
+            output_block = out[:num_samples]
 
-        if self._muted or self.audio_sound is None or self.audio_sound.length_frames == 0:
-            # Avancer la position globale même si la piste est muette ou vide
-            self.playback_position += num_frames_to_generate
-            return output_block 
+        if self._muted:
+            # Avancer la position globale même si la piste est muette
+            output_block.fill(0.0)
+        else:
+            # Lecture temps réel: les sons en streaming préchargés ne sont lus qu'en mémoire
+            self.read_audio_block(self.playback_position, num_frames_to_generate, output_block, apply_gain,
+                                  use_stream_cache=True, cursor=self._playback_cursor)
 
-        # Calculer la position de lecture RELATIVE au début du son sur la timeline
-        current_frame_sound = self.playback_position 
-        
-        # Position réelle dans les données brutes du son, en tenant compte de son offset
-        start_frame_sound = current_frame_sound - self.offset_frames
+        self.playback_position += num_frames_to_generate
 
-        # Si le début de ce bloc est avant l'offset du son sur la piste (silence avant le son)
-        if start_frame_sound < 0:
-            frames_silence = abs(start_frame_sound)
-            
-            # Si tout le bloc est avant le son (pur silence)
-            if frames_silence >= num_frames_to_generate:
-                self.playback_position += num_frames_to_generate
-                return output_block
+        return output_block
 
-            # Une partie est silence, une partie est son
-            silence_samples = AdikSound.new_audio_data(frames_silence * self.num_channels)
-            
-            # Le reste du bloc doit être lu à partir du début du son (frame 0 du son)
-            frames_to_read = num_frames_to_generate - frames_silence
-            
-            sound_part_raw = self.audio_sound.audio_data[0 : int(frames_to_read * self.audio_sound.num_channels)].copy()
-            
-            # processed_sound_part = self._convert_channels(sound_part_raw, self.audio_sound.num_channels, self.num_channels, frames_to_read)
-            # Appel à AdikSound.convert_channels
-            processed_sound_part = AdikSound.convert_channels(sound_part_raw, self.audio_sound.num_channels, self.num_channels, frames_to_read)
+    #----------------------------------------
 
+    def read_audio_block(self, frame_pos, num_frames, out, apply_gain=True, use_stream_cache=False, cursor=None):
+        """
+        Écrit dans 'out' le bloc de 'num_frames' frames de la piste qui commence à la
+        position 'frame_pos' de la timeline: seuls les clips qui recouvrent le bloc sont lus,
+        le reste du bloc est du silence. Les clips superposés sont additionnés.
+        Les clips du bloc sont trouvés par l'index de la piste: par bisection, ou en avançant
+        le curseur 'cursor' du bloc précédent (propre à l'appelant) en lecture séquentielle.
+        Ne modifie pas la position de lecture: utilisable par le rendu hors temps réel.
+        Avec 'use_stream_cache', les clips en streaming sont lus dans leur fenêtre préchargée.
+        Retourne 'out'.
+        """
+        out_2d = out[:num_frames * self.num_channels].reshape(num_frames, self.num_channels)
+        block_end = frame_pos + num_frames
+        clip_index = self._clip_index
+        if cursor is None:
+            first, last = clip_index.find(frame_pos, num_frames)
+        else:
+            first, last = clip_index.find_from_cursor(frame_pos, num_frames, cursor)
+        clips = clip_index.clips
+        is_block_empty = True
+        for clip_idx in range(first, last):
+            clip = clips[clip_idx]
+            if clip.timeline_end <= frame_pos:
+                continue
+            block_start, source_start, frames_to_read = clip.get_overlap(frame_pos, num_frames)
+            block_slice = out_2d[block_start : block_start + frames_to_read]
+            if is_block_empty:
+                # Premier clip du bloc: copié, et le reste du bloc mis à zéro
+                out_2d[:block_start] = 0.0
+                self._read_clip(clip, source_start, frames_to_read, block_slice, use_stream_cache)
+                out_2d[block_start + frames_to_read:] = 0.0
+                is_block_empty = False
+            else:
+                self._add_clip(clip, source_start, frames_to_read, block_slice, use_stream_cache)
 
-            # Compléter la partie son si elle est trop courte (fin du son atteinte)
-            if processed_sound_part.size < frames_to_read * self.num_channels:
-                padding_size = frames_to_read * self.num_channels - processed_sound_part.size
-                processed_sound_part = np.pad(processed_sound_part, (0, padding_size), 'constant')
+        if is_block_empty:
+            out_2d.fill(0.0)
+        if apply_gain:
+            self._apply_gain(out)
+        return out
 
-            # Concaténer le silence et le son
-            block_content = AdikSound.concat_audio_data(silence_samples, processed_sound_part)
-            
-            output_block[:] = block_content[:output_block.size]
+    #----------------------------------------
 
-        else: # Nous sommes dans la section du son ou au-delà de sa fin
-            # Calculer les index de samples dans le buffer 1D de AdikSound
-            start_sample_idx = int(start_frame_sound * self.audio_sound.num_channels)
-            end_sample_idx = int((start_frame_sound + num_frames_to_generate) * self.audio_sound.num_channels)
-            
-            data_raw = self.audio_sound.audio_data[start_sample_idx : end_sample_idx].copy()
+    def iter_blocks(self, start_frame, end_frame, block_frames=RANGE_FRAMES, apply_gain=False):
+        """
+        Générateur: rend la plage [start_frame, end_frame) de la timeline par blocs (frames, canaux)
+        d'au plus 'block_frames' frames, lus par read_audio_block dans un buffer réutilisé:
+        chaque bloc doit être consommé (écrit, copié) avant le suivant.
+        Ne modifie pas la position de lecture.
+        """
+        block = AdikSound.new_audio_data(min(block_frames, max(0, end_frame - start_frame)) * self.num_channels)
+        for frame_pos in range(start_frame, end_frame, block_frames):
+            num_frames = min(block_frames, end_frame - frame_pos)
+            self.read_audio_block(frame_pos, num_frames, block, apply_gain)
+            yield block[:num_frames * self.num_channels].reshape(num_frames, self.num_channels)
 
-            # processed_data = self._convert_channels(data_raw, self.audio_sound.num_channels, self.num_channels, num_frames_to_generate)
-            # Appel à AdikSound.convert_channels
-            processed_data = AdikSound.convert_channels(data_raw, self.audio_sound.num_channels, self.num_channels, num_frames_to_generate)
+    #----------------------------------------
 
-            # Compléter avec des zéros si la fin du son est atteinte
-            if processed_data.size < num_frames_to_generate * self.num_channels:
-                padding_size = num_frames_to_generate * self.num_channels - processed_data.size
-                processed_data = np.pad(processed_data, (0, padding_size), 'constant')
-            
-            output_block[:] = processed_data
+    def _read_clip(self, clip, source_start, num_frames, dest, use_stream_cache=False):
+        """ Copie 'num_frames' frames du son du clip, à partir de source_start, dans 'dest' (frames, canaux). """
+        playback_data = clip.get_playback_data(self.num_channels)
+        if playback_data is not None:
+            dest[:] = playback_data[source_start : source_start + num_frames]
+            return
+        stream_cache = self._stream_caches.get(clip.sound) if use_stream_cache else None
+        if stream_cache is not None and clip.sound.is_streaming:
+            # Son en streaming préchargé: lecture de la fenêtre en mémoire, sans accès disque
+            stream_cache.read(source_start, num_frames, dest)
+        else:
+            # Son en streaming ou par morceaux: seules les frames du bloc sont lues, et les canaux convertis au passage
+            frames_read = clip.sound.read_frames(source_start, num_frames, dest)
+            dest[frames_read:] = 0.0
+
+    #----------------------------------------
 
-        # Appliquer volume et panoramique
+    def _add_clip(self, clip, source_start, num_frames, dest, use_stream_cache=False):
+        """ Ajoute 'num_frames' frames du son du clip à 'dest' (clips superposés, ou clip suivant dans le bloc). """
+        playback_data = clip.get_playback_data(self.num_channels)
+        if playback_data is not None:
+            np.add(dest, playback_data[source_start : source_start + num_frames], out=dest)
+            return
+        # Buffer de travail de la piste, agrandi si nécessaire
+        if self._clip_buffer is None or self._clip_buffer.shape[0] < num_frames:
+            self._clip_buffer = np.zeros((num_frames, self.num_channels), dtype=np.float32)
+        clip_block = self._clip_buffer[:num_frames]
+        self._read_clip(clip, source_start, num_frames, clip_block, use_stream_cache)
+        np.add(dest, clip_block, out=dest)
+
+    #----------------------------------------
+
+    def _apply_gain(self, out):
+        """ Applique volume et panoramique au bloc, en place. """
         if self.volume != 1.0 or self.pan != 0.0:
             if self.num_channels == 2:
-                reshaped_data = output_block.reshape(-1, 2)
-                gain_left = (1.0 - self.pan)
-                gain_right = (1.0 + self.pan)
-                reshaped_data[:, 0] *= (self.volume * gain_left)
-                reshaped_data[:, 1] *= (self.volume * gain_right)
-                output_block[:] = reshaped_data.flatten()
+                reshaped_data = out.reshape(-1, 2)
+                reshaped_data[:, 0] *= (self.volume * (1.0 - self.pan))
+                reshaped_data[:, 1] *= (self.volume * (1.0 + self.pan))
             else:
-                output_block *= self.volume
-
-        self.playback_position += num_frames_to_generate
-        
-        return output_block
+                out *= self.volume
 
     #----------------------------------------
-   
+
     def arrange_take(self, new_take_audio_data: np.ndarray, take_start_frame: int, take_end_frame: int, recording_mode: int, new_take_channels: int):
         """
-        Arrange une nouvelle prise sur le son existant de la piste.
-        Ajout du paramètre `new_take_channels` pour la conversion correcte.
-        """
-        if self.audio_sound is None:
-            # Convertir la prise au nombre de canaux de la piste
-            if new_take_channels != self.num_channels:
-                take_length = len(new_take_audio_data) // new_take_channels
-                new_take_audio_data = AdikSound.convert_channels(new_take_audio_data, new_take_channels, self.num_channels, take_length)
-
-            self.set_audio_sound(AdikSound(
-                name=f"{self.name}_take",
-                audio_data=new_take_audio_data,
-                sample_rate=self.sample_rate,
-                num_channels=self.num_channels
-            ), offset_frames=take_start_frame)
-            print(f"Piste '{self.name}': Nouvelle prise ajoutée à une piste vide à l'offset {take_start_frame}.")
-            return
+        Arrange une nouvelle prise sur la piste: la prise devient un clip placé à take_start_frame.
+        En mode remplacement, elle remplace la zone [take_start_frame, take_end_frame);
+        en mode mixage, elle s'ajoute au son existant.
+        Seuls les clips changent: le son existant de la piste n'est pas recopié.
+        """
+        take_sound = AdikSound(
+            name=f"{self.name}_take",
+            audio_data=new_take_audio_data,
+            sample_rate=self.sample_rate,
+            num_channels=new_take_channels
+        )
+        self.arrange_take_sound(take_sound, take_start_frame, take_end_frame, recording_mode)
 
-        old_sound_data = self.audio_sound.audio_data
-        old_sound_length = self.audio_sound.length_frames
-        old_sound_end = self.offset_frames + old_sound_length
-        
-        take_length = len(new_take_audio_data) // new_take_channels
-        
-        new_total_length = max(old_sound_end, take_end_frame) - min(self.offset_frames, take_start_frame)
-        new_buffer = AdikSound.new_audio_data(new_total_length * self.num_channels)
-
-        old_sound_start = self.offset_frames - min(self.offset_frames, take_start_frame)
-        take_start = take_start_frame - min(self.offset_frames, take_start_frame)
-
-        # 1. Copier le début de l'ancien son
-        frames_before_take = min(old_sound_length, take_start_frame - self.offset_frames)
-        if frames_before_take > 0:
-            segment_start_old = 0
-            segment_end_old = int(frames_before_take * self.audio_sound.num_channels)
-            old_data_before = AdikSound.convert_channels(old_sound_data[segment_start_old:segment_end_old], self.audio_sound.num_channels, self.num_channels, frames_before_take)
-            dest_start_idx = int(old_sound_start * self.num_channels)
-            dest_end_idx = dest_start_idx + old_data_before.size
-            new_buffer[dest_start_idx:dest_end_idx] = old_data_before
-            print(f"Copie ancien son (début): {frames_before_take} frames.")
-        
-        # 2. Gérer la zone de chevauchement et insérer la nouvelle prise
-        overlap_start = max(take_start_frame, self.offset_frames)
-        overlap_end = min(take_end_frame, old_sound_end)
-        
-        # Convertir la prise aux bons canaux pour l'opération
-        processed_new_take = AdikSound.convert_channels(new_take_audio_data, new_take_channels, self.num_channels, take_length)
+    #----------------------------------------
 
-        if recording_mode == AdikTrack.RECORDING_MODE_REPLACE:
-            print("Mode de remplacement activé.")
-            dest_start_idx = int(take_start * self.num_channels)
-            dest_end_idx = dest_start_idx + processed_new_take.size
-            new_buffer[dest_start_idx : min(dest_end_idx, new_buffer.size)] = processed_new_take[:min(processed_new_take.size, new_buffer.size - dest_start_idx)]
-        
-        elif recording_mode == AdikTrack.RECORDING_MODE_MIX:
-            print("Mode de mixage activé.")
-            
-            # Copier le reste de la prise (après le chevauchement)
-            if take_end_frame > overlap_end:
-                take_after_overlap_start = overlap_end - take_start_frame
-                take_after_overlap_data = processed_new_take[int(take_after_overlap_start * self.num_channels):].copy()
-                dest_start_idx = int((overlap_end - min(self.offset_frames, take_start_frame)) * self.num_channels)
-                new_buffer[dest_start_idx : dest_start_idx + take_after_overlap_data.size] = take_after_overlap_data
-
-            # Gérer le chevauchement s'il existe
-            if overlap_end > overlap_start:
-                overlap_length = overlap_end - overlap_start
-                
-                old_overlap_start_in_sound = overlap_start - self.offset_frames
-                old_overlap_data = old_sound_data[int(old_overlap_start_in_sound * self.audio_sound.num_channels) : int((old_overlap_start_in_sound + overlap_length) * self.audio_sound.num_channels)].copy()
-                old_overlap_data = AdikSound.convert_channels(old_overlap_data, self.audio_sound.num_channels, self.num_channels, overlap_length)
-                
-                new_overlap_start_in_take = overlap_start - take_start_frame
-                new_overlap_data = processed_new_take[int(new_overlap_start_in_take * self.num_channels) : int((new_overlap_start_in_take + overlap_length) * self.num_channels)].copy()
-                
-                mixed_overlap = AdikSound.merge_audio_data(old_overlap_data, new_overlap_data)
-                
-                dest_start_idx = int((overlap_start - min(self.offset_frames, take_start_frame)) * self.num_channels)
-                new_buffer[dest_start_idx : dest_start_idx + mixed_overlap.size] = mixed_overlap
-            
-            # Copier le début de la prise (avant le chevauchement)
-            if overlap_start > take_start_frame:
-                take_before_overlap_length = overlap_start - take_start_frame
-                take_before_overlap_data = processed_new_take[0 : int(take_before_overlap_length * self.num_channels)].copy()
-                dest_start_idx = int(take_start * self.num_channels)
-                new_buffer[dest_start_idx : dest_start_idx + take_before_overlap_data.size] = take_before_overlap_data
-
-        # 3. Copier la fin de l'ancien son
-        if take_end_frame < old_sound_end:
-            frames_after_take = old_sound_end - take_end_frame
-            if frames_after_take > 0:
-                segment_start_old = take_end_frame - self.offset_frames
-                segment_end_old = old_sound_length
-                old_data_after = AdikSound.convert_channels(old_sound_data[int(segment_start_old * self.audio_sound.num_channels):int(segment_end_old * self.audio_sound.num_channels)], self.audio_sound.num_channels, self.num_channels, frames_after_take)
-                dest_start_idx = int((take_end_frame - min(self.offset_frames, take_start_frame)) * self.num_channels)
-                dest_end_idx = dest_start_idx + old_data_after.size
-                new_buffer[dest_start_idx : min(dest_end_idx, new_buffer.size)] = old_data_after[:min(old_data_after.size, new_buffer.size - dest_start_idx)]
-                print(f"Copie ancien son (fin): {frames_after_take} frames.")
-
-        self.set_audio_sound(AdikSound(
-            name=f"{self.name}_arranged_take",
-            audio_data=new_buffer,
-            sample_rate=self.sample_rate,
-            num_channels=self.num_channels
-        ), offset_frames=min(self.offset_frames, take_start_frame))
-        print(f"Piste '{self.name}': Take arrangée. Nouvelle longueur: {self.audio_sound.length_frames} frames, nouvel offset: {self.offset_frames}.")
+    def arrange_take_sound(self, take_sound, take_start_frame: int, take_end_frame: int, recording_mode: int):
+        """
+        Comme arrange_take, pour une prise déjà sous forme de son (ex: prise enregistrée par morceaux),
+        dans ses canaux d'origine: le clip les convertit à la lecture.
+        """
+        take_length = take_sound.length_frames
+        if take_end_frame <= take_start_frame:
+            # Transport arrêté pendant l'enregistrement (entrée seule): la prise est gardée en entier
+            take_end_frame = take_start_frame + take_length
+        take_clip = AdikClip(take_sound, take_start_frame, 0, min(take_length, take_end_frame - take_start_frame))
+        self.add_clip(take_clip, recording_mode, replace_end_frame=take_end_frame)
+        print(f"Piste '{self.name}': Take arrangée. Nouvelle longueur: {self.length_frames} frames, "
+              f"offset: {self.offset_frames}, {len(self.clips)} clips.")
+
+    #----------------------------------------
+
+    def get_mix_gains(self, output_channels=2):
+        """
+        Retourne les gains (tableau float32 de 'output_channels' valeurs) appliqués à chaque canal de la piste
+        à la sortie: volume et panoramique de get_audio_block suivis des gains de mix_sound_data.
+        Une piste mono est répartie sur les canaux de sortie avec ces gains.
+        """
+        vol = self.volume * self.volume_mix
+        if self.num_channels == 2:
+            left_gain = self.volume * (1.0 - self.pan) * vol * self.left_gain
+            right_gain = self.volume * (1.0 + self.pan) * vol * self.right_gain
+        else:
+            left_gain = self.volume * vol * self.left_gain
+            right_gain = self.volume * vol * self.right_gain
+        if output_channels == 1:
+            return np.array([left_gain], dtype=np.float32)
+        return np.array([left_gain, right_gain], dtype=np.float32)
 
     #----------------------------------------
 
-    def mix_sound_data(self, output_data, num_frames):
+    def mix_range(self, frame_pos, num_frames, mix_data, output_channels=2):
+        """
+        Mixe la piste sur la plage [frame_pos, frame_pos + num_frames) de la timeline dans 'mix_data'
+        (1D entrelacé, 'output_channels' canaux), en place, avec ses gains de mixage (get_mix_gains).
+        Rendu hors ligne: chaque clip de la plage est mixé par grandes tranches de RANGE_FRAMES frames,
+        lues directement dans sa vue de lecture. Les gains sont appliqués sur les samples entrelacés
+        (gains répétés pour chaque frame), ou par canal de sortie pour une piste mono:
+        que des opérations NumPy contiguës, limitées par la bande passante mémoire.
+        Les zones sans clip ne coûtent rien. Ne modifie pas la position de lecture.
+        """
+        num_channels = self.num_channels
+        if num_channels not in (1, output_channels):
+            print(f"Erreur: Le nombre de canaux ({num_channels}) n'est pas supporté pour le mixage.")
+            return
+        gains = self.get_mix_gains(output_channels)
+        if num_frames <= 0 or not gains.any():
+            return
+        mix_2d = mix_data[:num_frames * output_channels].reshape(num_frames, output_channels)
+        range_frames = min(self.RANGE_FRAMES, num_frames)
+        read_block = None # Buffer des clips sans vue de lecture (streaming, morceaux)
+        gain_block = np.empty(range_frames * num_channels, dtype=np.float32)
+        if num_channels == output_channels:
+            interleaved_gains = np.tile(gains, range_frames)
+
+        first, last = self._clip_index.find(frame_pos, num_frames)
+        for clip in self._clip_index.clips[first:last]:
+            if clip.timeline_end <= frame_pos:
+                continue
+            mix_start, source_start, clip_frames = clip.get_overlap(frame_pos, num_frames)
+            playback_data = clip.get_playback_data(num_channels)
+            for block_pos in range(0, clip_frames, range_frames):
+                frames_to_mix = min(range_frames, clip_frames - block_pos)
+                if playback_data is not None:
+                    source_frames = playback_data[source_start + block_pos : source_start + block_pos + frames_to_mix]
+                else:
+                    if read_block is None:
+                        read_block = np.empty((range_frames, num_channels), dtype=np.float32)
+                    source_frames = read_block[:frames_to_mix]
+                    self._read_clip(clip, source_start + block_pos, frames_to_mix, source_frames)
+                mix_slice = mix_2d[mix_start + block_pos : mix_start + block_pos + frames_to_mix]
+                if num_channels == output_channels:
+                    num_samples = frames_to_mix * num_channels
+                    np.multiply(source_frames.reshape(-1), interleaved_gains[:num_samples], out=gain_block[:num_samples])
+                    mix_samples = mix_slice.reshape(-1)
+                    np.add(mix_samples, gain_block[:num_samples], out=mix_samples)
+                else:
+                    # Piste mono: le même bloc est ajouté à chaque canal de sortie avec son gain
+                    for channel_idx in range(output_channels):
+                        np.multiply(source_frames[:, 0], gains[channel_idx], out=gain_block[:frames_to_mix])
+                        np.add(mix_slice[:, channel_idx], gain_block[:frames_to_mix], out=mix_slice[:, channel_idx])
+
+    #----------------------------------------
+
+    def mix_sound_data(self, output_data, num_frames, block_buffer=None):
         """
         Copie le bloc audio de la piste dans le tampon de sortie tout en appliquant
         le volume et le panoramique. Cette fonction est conçue pour être extensible
         aux effets plus complexes.
+        Le noyau de mixage utilisé dépend de AdikTrack.mix_mode
+        (le mode MATRIX, propre au moteur, utilise ici le noyau vectorisé).
+        'block_buffer' est un buffer de travail optionnel dans lequel le bloc de la piste est lu.
+        """
+        if AdikTrack.mix_mode == AdikTrack.MIX_MODE_LOOP:
+            self._mix_sound_data_loop(output_data, num_frames, block_buffer)
+        else:
+            self._mix_sound_data_vectorized(output_data, num_frames, block_buffer)
+
+    #----------------------------------------
+
+    def _mix_sound_data_vectorized(self, output_data, num_frames, block_buffer=None):
+        """
+        Noyau de mixage vectorisé: le bloc de la piste est vu comme un tableau
+        (frames, canaux), les gains sont appliqués par canal sur des colonnes entières,
+        puis le bloc est additionné en place dans le tampon de sortie.
+        """
+        try:
+            # Récupérer le bloc audio de la piste
+            input_data = self.get_audio_block(num_frames, block_buffer)
+            if num_frames <= 0:
+                return
+
+            output_channels = output_data.size // num_frames
+            if input_data.size != num_frames * self.num_channels or output_data.size != num_frames * output_channels:
+                print(f"Avertissement: Les buffers de mixage ne sont pas de la même taille ({input_data.size} vs {output_data.size}).")
+                return
+
+            # Gain global: volume * volume_mix, puis gain gauche/droit par canal
+            vol = self.volume * self.volume_mix
+            input_2d = input_data.reshape(num_frames, self.num_channels)
+            output_2d = output_data.reshape(num_frames, output_channels)
+
+            if self.num_channels == output_channels and self.num_channels <= 2:
+                # Le bloc d'entrée est un buffer de travail, on y applique les gains en place.
+                # Un scalaire par canal évite le buffer temporaire d'un broadcast NumPy.
+                input_2d[:, 0] *= vol * self.left_gain
+                if self.num_channels == 2:
+                    input_2d[:, 1] *= vol * self.right_gain
+                np.add(output_2d, input_2d, out=output_2d)
+            elif self.num_channels == 1 and output_channels == 2:
+                # Piste MONO vers sortie STEREO: le même échantillon est réparti sur les deux canaux
+                output_2d[:, 0] += input_data * (vol * self.left_gain)
+                output_2d[:, 1] += input_data * (vol * self.right_gain)
+            else:
+                print(f"Erreur: Le nombre de canaux ({self.num_channels}) n'est pas supporté pour le mixage.")
+
+        except Exception as e:
+            print(f"Erreur dans mix_sound_data pour la piste {self.name}: {e}")
+
+    #----------------------------------------
+
+    def _mix_sound_data_loop(self, output_data, num_frames, block_buffer=None):
+        """
+        Ancien noyau de mixage, échantillon par échantillon.
+        Gardé pour comparer les performances et vérifier les résultats du noyau vectorisé.
         """
 
         try:
             # Récupérer le bloc audio de la piste
-            input_data = self.get_audio_block(num_frames)
+            input_data = self.get_audio_block(num_frames, block_buffer)
             
             # Paramètres de gain
             vol = self.volume * self.volume_mix
@@ -389,8 +749,8 @@ class AdikTrack:
         if self._armed: status.append("R")
         status_str = f"[{' '.join(status)}]" if status else ""
 
-        sound_info = f"'{self.audio_sound.name}'" if self.audio_sound else "None"
-        return (f"AdikTrack(ID={self.id}, Name='{self.name}', Sound={sound_info}, "
+        sound_info = f"'{self.clips[0].sound.name}'" if self.clips else "None"
+        return (f"AdikTrack(ID={self.id}, Name='{self.name}', Sound={sound_info}, Clips={len(self.clips)}, "
                 f"Offset={self.offset_frames}, Pos={self.playback_position}, "
                 f"Vol={self.volume:.2f}, Pan={self.pan:.2f}, "
                 f"Status={status_str})")
@@ -12,6 +12,7 @@ import time
 from adik_sound import AdikSound
 from adik_track import AdikTrack
 from adik_wave_handler import AdikWaveHandler
+from adik_bounce import AdikParallelBounce
 
 class AdikTrackEdit:
     """
@@ -84,10 +85,11 @@ class AdikTrackEdit:
         self.player.stop()  # Arrêter la lecture avant de supprimer les pistes
         for track in self.player.track_list:
             # Nettoyer les ressources de chaque piste si nécessaire
-            if hasattr(track, 'audio_sound'):
-                del track.audio_sound
+            track.clear_clips()
         self.player.track_list = []
         self.player.selected_track_idx = -1
+        # Les entrées de l'historique portent sur les pistes supprimées
+        self.player.undo_manager.clear()
         # Mettre à jour la durée totale et d'autres paramètres
         self.player._update_params()
 
@@ -96,46 +98,28 @@ class AdikTrackEdit:
     def delete_audio_from_track(self, track_index: int, start_frame: int, end_frame: int):
         """
         Supprime complètement les données audio d'une piste entre les positions
-        start_frame et end_frame. La longueur de la piste est réduite.
+        start_frame et end_frame de la timeline. La longueur de la piste est réduite.
+        Seuls les clips de la piste sont coupés et déplacés: aucune donnée audio n'est recopiée.
         """
         if 0 <= track_index < len(self.player.track_list):
             track = self.player.track_list[track_index]
-            audio_data = track.get_audio_data()
-            
-            if audio_data is None:
+            if not track.clips:
                 print(f"Avertissement: La piste '{track.name}' est vide, aucune suppression n'a été effectuée.")
                 return
 
-            # Les indices de trames sont convertis en indices de samples
-            start_sample = int(start_frame * track.num_channels)
-            end_sample = int(end_frame * track.num_channels)
-            
             # S'assurer que les trames sont dans les limites valides
-            length_samples = track.audio_sound.length_samples
-            start_sample = max(0, start_sample)
-            end_sample = min(length_samples, end_sample)
-
-            if start_sample < end_sample:
-                # Créer une nouvelle liste de données audio
-                # en ignorant la partie à supprimer
-                part_before = audio_data[:start_sample]
-                part_after = audio_data[end_sample:]
-
-                # Utiliser AdikSound.concat_audio_data pour joindre les deux segments
-                new_audio_data = AdikSound.concat_audio_data(part_before, part_after)
-
-                # Mettre à jour les données audio de la piste
-                track.set_audio_sound(AdikSound(
-                    name=f"{track.audio_sound.name}_deleted",
-                    audio_data=new_audio_data,
-                    sample_rate=track.sample_rate,
-                    num_channels=track.num_channels
-                ))
+            start_frame = max(track.start_frame, start_frame)
+            end_frame = min(track.end_frame, end_frame)
+
+            if start_frame < end_frame:
+                before_clips = track.get_clips()
+                track.delete_range(start_frame, end_frame)
+                self.player.undo_manager.record_clips(track, before_clips, "Suppression")
                 
                 # Mettre à jour les paramètres du player (durée, etc.)
                 self.player._update_params()
                 
-                print(f"Données audio de la piste '{track.name}' supprimées de la trame {start_frame} à {end_frame}. Nouvelle longueur: {len(new_audio_data)} samples.")
+                print(f"Données audio de la piste '{track.name}' supprimées de la trame {start_frame} à {end_frame}. Nouvelle longueur: {track.length_frames} frames.")
             else:
                 print("Avertissement: Les trames de début et de fin sont invalides.")
         else:
@@ -145,40 +129,25 @@ class AdikTrackEdit:
 
     def erase_audio_from_track(self, track_index, start_frame, end_frame):
         """
-        Remplace les données audio d'une piste par du silence (valeurs zéro)
-        entre les positions start_frame et end_frame.
+        Remplace les données audio d'une piste par du silence
+        entre les positions start_frame et end_frame de la timeline.
         La longueur de la piste reste inchangée.
+        Seuls les clips de la piste sont coupés: aucune donnée audio n'est recopiée.
         """
         if 0 <= track_index < len(self.player.track_list):
             track = self.player.track_list[track_index]
-            audio_data = track.get_audio_data()
-            
-            if audio_data is None:
+            if not track.clips:
                 print(f"Avertissement: La piste '{track.name}' est vide, aucune suppression n'a été effectuée.")
                 return
             
-            # Les indices de trames sont convertis en indices de samples
-            start_sample = int(start_frame * track.num_channels)
-            end_sample = int(end_frame * track.num_channels)
-            
             # S'assurer que les trames sont dans les limites valides
-            length_samples = track.audio_sound.length_samples
-            start_sample = max(0, start_sample)
-            end_sample = min(length_samples, end_sample)
+            start_frame = max(track.start_frame, start_frame)
+            end_frame = min(track.end_frame, end_frame)
 
-            if start_sample < end_sample:
-                # Créer une copie modifiable du tableau pour éviter les problèmes de vue
-                audio_data_copy = audio_data.copy()
-                
-                # Remplir la section avec des zéros pour créer du silence
-                audio_data_copy[start_sample:end_sample] = 0.0
-                
-                track.set_audio_sound(AdikSound(
-                    name=f"{track.audio_sound.name}_erased",
-                    audio_data=audio_data_copy,
-                    sample_rate=track.sample_rate,
-                    num_channels=track.num_channels
-                ))
+            if start_frame < end_frame:
+                before_clips = track.get_clips()
+                track.erase_range(start_frame, end_frame)
+                self.player.undo_manager.record_clips(track, before_clips, "Effacement")
                 
                 print(f"Données audio de la piste '{track.name}' effacées (silence) de la trame {start_frame} à {end_frame}.")
             else:
@@ -196,9 +165,11 @@ class AdikTrackEdit:
 
     #----------------------------------------
 
-    def bounce_to_track(self, start_frame=0, end_frame=-1):
+    def bounce_to_track(self, start_frame=0, end_frame=-1, num_processes=1):
         """
         Mixe les pistes sélectionnées ou toutes les pistes vers une nouvelle piste.
+        Avec num_processes > 1, la zone de mixage est répartie en tranches de temps
+        sur un pool de processus (voir AdikParallelBounce).
         """
         # Déterminer la durée totale du mixage
         if end_frame == -1:
@@ -212,22 +183,71 @@ class AdikTrackEdit:
             print(f"Avertissement: Les trames de mixage sont invalides.: start_frame: {start_frame}, end_frame: {end_frame}")
             return
 
+        # Sauvegarder la position de lecture pour la restaurer plus tard
+        saved_playback_position = self.player.current_playback_frame
+
+        solo_mode = self.has_solo_track()
+        # Ne mixer que les pistes non muettes ou solo
+        tracks_to_mix = [track for track in self.player.track_list
+                         if not track.is_muted() and not (solo_mode and not track.is_solo())]
+
+        mix_buffer = None
+        if num_processes > 1:
+            try:
+                mix_buffer = AdikParallelBounce(num_processes).render(tracks_to_mix, start_frame, end_frame,
+                                                                      self.player.num_output_channels)
+            except Exception as e:
+                print(f"Erreur lors du mixage sur plusieurs processus: {e}. Mixage dans le processus courant.")
+        if mix_buffer is None:
+            mix_buffer = self._mix_tracks(tracks_to_mix, start_frame, end_frame)
+
+        # Créer un nouvel objet AdikSound avec le son mixé
+        bounced_sound = AdikSound(
+            name="Bounced Audio",
+            audio_data=mix_buffer,
+            sample_rate=self.player.sample_rate,
+            num_channels=self.player.num_output_channels
+        )
+
+        # Ajouter une nouvelle piste et lui assigner le son mixé
+        new_track = self.player.add_track(name="Piste Mixée")
+        new_track.set_audio_sound(bounced_sound, offset_frames=start_frame)
+        self.player.undo_manager.record_add_track(new_track, "Mixage")
+
+        # Restaurer la position de lecture du player
+        self.player.set_position(saved_playback_position)
+        
+        print(f"Mixage (bounce) terminé. Le son a été ajouté à la piste '{new_track.name}'.")
+
+    #----------------------------------------
+
+    def _mix_tracks(self, tracks_to_mix, start_frame, end_frame):
+        """
+        Mixe les pistes dans le processus courant: chaque piste est mixée sur toute la plage
+        par AdikTrack.mix_range (grands blocs et gains vectorisés), directement dans le buffer de mixage.
+        Retourne le buffer de mixage.
+        """
+        num_channels = self.player.num_output_channels
+        mix_buffer = AdikSound.new_audio_data((end_frame - start_frame) * num_channels)
+        for track in tracks_to_mix:
+            track.mix_range(start_frame, end_frame - start_frame, mix_buffer, num_channels)
+        return mix_buffer
+
+    #----------------------------------------
+
+    def _mix_tracks_by_blocks(self, tracks_to_mix, start_frame, end_frame):
+        """
+        Ancien mixage, bloc par bloc (player.block_size) avec mix_sound_data, comme le callback audio.
+        Gardé pour comparer les performances et vérifier les résultats de _mix_tracks.
+        Change la position de lecture des pistes. Retourne le buffer de mixage.
+        """
         mix_length_frames = end_frame - start_frame
     
         # Créer le tampon de mixage vide
         mix_buffer = AdikSound.new_audio_data(mix_length_frames * self.player.num_output_channels)
     
-        # Sauvegarder la position de lecture pour la restaurer plus tard
-        saved_playback_position = self.player.current_playback_frame
-    
-        solo_mode = self.has_solo_track()
-    
         # Pour chaque piste, la lire et mixer le son dans le tampon
-        for track in self.player.track_list:
-            # Ne mixer que les pistes non muettes ou solo
-            if track.is_muted() or (solo_mode and not track.is_solo()):
-                continue
-            
+        for track in tracks_to_mix:
             # Définir la position de lecture de la piste au début de la zone de mixage
             track.set_playback_position(start_frame)
             
@@ -244,71 +264,60 @@ class AdikTrackEdit:
 
                 num_frames_read += frames_to_read
 
-        # Créer un nouvel objet AdikSound avec le son mixé
-        bounced_sound = AdikSound(
-            name="Bounced Audio",
-            audio_data=mix_buffer,
-            sample_rate=self.player.sample_rate,
-            num_channels=self.player.num_output_channels
-        )
-
-        # Ajouter une nouvelle piste et lui assigner le son mixé
-        new_track = self.player.add_track(name="Piste Mixée")
-        new_track.set_audio_sound(bounced_sound, offset_frames=start_frame)
-
-        # Restaurer la position de lecture du player
-        self.player.set_position(saved_playback_position)
-        
-        print(f"Mixage (bounce) terminé. Le son a été ajouté à la piste '{new_track.name}'.")
+        return mix_buffer
 
     #----------------------------------------
     
-    def save_track(self, start_frame=0, end_frame=-1, filename=None):
+    def save_track(self, start_frame=0, end_frame=-1, filename=None, subtype='PCM_16', progress_callback=None):
         """
         Sauvegarde le contenu de la piste sélectionnée dans un fichier WAV.
         Si aucun paramètre n'est spécifié, le son entier de la piste est sauvegardé.
+        Les frames sont écrites bloc par bloc, lues directement dans le son de la piste,
+        ou rendues depuis ses clips: la plage n'est jamais copiée en entier.
+        subtype et progress_callback: voir AdikWaveHandler.write_blocks.
         """
         selected_track = self.player.get_selected_track()
         if selected_track is None:
             print("Aucune piste n'est sélectionnée pour la sauvegarde.")
             return False
 
-        audio_sound = selected_track.get_audio_sound()
-        if audio_sound is None:
+        if not selected_track.clips:
             print(f"La piste '{selected_track.name}' est vide. Rien à sauvegarder.")
             return False
 
+        # Un seul clip qui joue tout son son: le son lui-même, dans ses canaux; sinon le rendu des clips
+        whole_sound = selected_track.get_whole_sound()
+        length_frames = whole_sound.length_frames if whole_sound is not None else selected_track.length_frames
+
         # Déterminer les trames de début et de fin pour la sauvegarde
         if end_frame == -1:
-            end_frame = audio_sound.length_frames
+            end_frame = length_frames
     
         start_frame = max(0, start_frame)
-        end_frame = min(end_frame, audio_sound.length_frames)
+        end_frame = min(end_frame, length_frames)
 
         if start_frame >= end_frame:
             print("Les trames de début et de fin sont invalides pour la sauvegarde.")
             return False
-            
-        # Extraire les données audio de la portion sélectionnée
-        start_sample = int(start_frame * audio_sound.num_channels)
-        end_sample = int(end_frame * audio_sound.num_channels)
-    
-        data_to_save = audio_sound.audio_data[start_sample:end_sample].copy()
-
-        # Créer un objet AdikSound temporaire pour la sauvegarde
-        sound_to_save = AdikSound(
-            name=audio_sound.name,
-            audio_data=data_to_save,
-            sample_rate=audio_sound.sample_rate,
-            num_channels=audio_sound.num_channels
-        )
+
+        if whole_sound is not None:
+            blocks = whole_sound.iter_blocks(start_frame, end_frame, AdikWaveHandler.WRITE_BLOCK_FRAMES)
+            num_channels = whole_sound.num_channels
+            sample_rate = whole_sound.sample_rate
+        else:
+            track_start = selected_track.start_frame
+            blocks = selected_track.iter_blocks(track_start + start_frame, track_start + end_frame,
+                                                AdikWaveHandler.WRITE_BLOCK_FRAMES)
+            num_channels = selected_track.num_channels
+            sample_rate = selected_track.sample_rate
 
         if filename is None:
             # Utilise un nom de fichier par défaut basé sur le nom de la piste
             time_val = f"{time.strftime('%Y_%m_%d_%H%M%S')}"
             filename = f"/tmp/adik_track_{selected_track.name.replace(' ', '_').replace(':', '')}_{time_val}.wav"
 
-        if AdikWaveHandler.save_wav(filename, sound_to_save):
+        if AdikWaveHandler.write_blocks(filename, blocks, sample_rate, num_channels,
+                                        end_frame - start_frame, subtype, progress_callback=progress_callback):
             print(f"Piste '{selected_track.name}' sauvegardée dans '{filename}'.")
             return True
         else:
@@ -6,29 +6,51 @@
     Date: Fri, 22/08/2025
     Author: Coolbrother
 """
+import os
 import threading
 import numpy as np
 import time
-from adik_sound import AdikSound
+from adik_chunk_sound import AdikChunkSound
 from adik_wave_handler import AdikWaveHandler
 from adik_track import AdikTrack
+from adik_ring_buffer import AdikRingBuffer
 
 
 class AdikTransport:
     """
     Gère les fonctions de transport (lecture, enregistrement, arrêt) pour le lecteur.
     """
+    RING_BUFFER_SECONDS = 4 # Capacité du buffer circulaire entre le callback et le thread d'écriture
+    RECORD_CHUNK_FRAMES = 65536 # Taille fixe des morceaux de la prise
+    WRITER_INTERVAL = 0.05 # Période de vidage du buffer circulaire, en secondes
+    DISK_FLUSH_INTERVAL = 1.0 # Période de mise à jour de l'en-tête WAV en enregistrement sur disque
+
     def __init__(self, player):
         self.player = player
         self._lock = threading.Lock()
         self._playing = False
         self._recording = False
-        self.recording_buffer = np.array([], dtype=np.float32)
         self.recording_sound = None
         self.recording_mode = AdikTrack.RECORDING_MODE_REPLACE
         self.recording_start_frame = 0
         self.recording_end_frame = 0
 
+        # Stockage de la prise: le callback remplit le buffer circulaire,
+        # le thread d'écriture le vide dans des morceaux de taille fixe, adoptés sans copie par un AdikChunkSound.
+        self._ring_buffer = None
+        self._record_sound = None
+        self._current_chunk = None
+        self._chunk_pos = 0
+        self._writer_thread = None
+        self._writer_stop_event = threading.Event()
+
+        # Enregistrement sur disque (optionnel): la prise est écrite dans un fichier WAV au fil de l'eau
+        self.record_to_disk = False
+        self.record_directory = "/tmp"
+        self.recording_file_path = None
+        self._recording_file = None
+        self._last_flush_time = 0.0
+
     #----------------------------------------
 
     def is_playing(self):
@@ -61,7 +83,7 @@ class AdikTransport:
 
         print("Démarrage de la lecture...")
         with self._lock:
-            self._playing = True
+            self.player.audio_engine.post_command(setattr, self, '_playing', True)
             self.player._start_engine()
 
     #----------------------------------------
@@ -76,7 +98,7 @@ class AdikTransport:
 
         print("Mise en pause.")
         with self._lock:
-            self._playing = False
+            self.player.audio_engine.send_command(setattr, self, '_playing', False)
             if self._recording:
                 self._finish_recording()
 
@@ -93,19 +115,24 @@ class AdikTransport:
         print("Arrêt du player.")
 
         with self._lock:
-            self._playing = False
+            self.player.audio_engine.send_command(setattr, self, '_playing', False)
             if self._recording:
                 self._finish_recording()
-            
-            self.player.current_playback_frame = 0
-            for track in self.player.track_list:
-                track.reset_playback_position()
+            self.player.audio_engine.send_command(self._apply_stop_position)
             
         if not self._playing and not self._recording and self.player._is_engine_running():
             self.player._stop_engine()
 
     #----------------------------------------
 
+    def _apply_stop_position(self):
+        """ Commande: remet le player et les pistes du thread audio au début. """
+        self.player.current_playback_frame = 0
+        for track in self.player.audio_engine._track_list:
+            track.reset_playback_position()
+
+    #----------------------------------------
+
     def start_recording(self):
         """
         Démarre l'enregistrement audio.
@@ -123,18 +150,30 @@ class AdikTransport:
             self.player.audio_engine.start_input_stream()
             
         with self._lock:
-            self._recording = True
-            self.recording_buffer = np.array([], dtype=np.float32)
             self.recording_sound = None
-            
-            self.recording_start_frame = self.player.current_playback_frame
-            self.recording_end_frame = self.player.current_playback_frame
-
-            self._playing = True
+            self._start_recording_writer()
+            # La prise commence au bloc où le thread audio reçoit la commande
+            self.player.audio_engine.send_command(self._apply_start_recording)
             print(f"Player: Enregistrement démarré à la frame {self.recording_start_frame}.")
 
     #----------------------------------------
 
+    def _apply_start_recording(self):
+        """ Commande: démarre la capture et la lecture dans le thread audio. """
+        self.recording_start_frame = self.player.current_playback_frame
+        self.recording_end_frame = self.player.current_playback_frame
+        self._recording = True
+        self._playing = True
+
+    #----------------------------------------
+
+    def _apply_stop_recording(self):
+        """ Commande: arrête la capture dans le thread audio et note la frame de fin. """
+        self._recording = False
+        self.recording_end_frame = self.player.current_playback_frame
+
+    #----------------------------------------
+
     def stop_recording(self):
         """
         Arrête l'enregistrement audio.
@@ -161,43 +200,35 @@ class AdikTransport:
             return
 
         print("Player: Finalisation de l'enregistrement...")
-        self._recording = False
+        # Après cette commande, le callback n'écrit plus: on vide le reste du buffer circulaire,
+        # la prise reste en morceaux (jamais jointe)
+        self.player.audio_engine.send_command(self._apply_stop_recording)
+        self.recording_sound = self._stop_recording_writer()
 
-        if self.recording_buffer.size > 0:
-            self.recording_end_frame = self.player.current_playback_frame
-            recorded_sound_data = self.recording_buffer
-            
+        if self.recording_sound is not None and self.recording_sound.length_frames > 0:
             selected_track = self.player.get_selected_track()
 
             if selected_track:
-                selected_track.arrange_take(
-                    new_take_audio_data=recorded_sound_data,
+                before_clips = selected_track.get_clips()
+                selected_track.arrange_take_sound(
+                    take_sound=self.recording_sound,
                     take_start_frame=self.recording_start_frame,
                     take_end_frame=self.recording_end_frame,
-                    recording_mode=self.recording_mode,
-                    new_take_channels=self.player.num_input_channels
+                    recording_mode=self.recording_mode
                 )
+                self.player.undo_manager.record_clips(selected_track, before_clips, "Prise")
                 print(f"Player: Enregistrement arrangé sur la piste '{selected_track.name}'.")
                 selected_track.set_playback_position(self.player.current_playback_frame)
             else:
                 new_track_name = f"Piste Enregistrée {len(self.player.track_list) + 1}"
                 new_track = self.player.add_track(new_track_name)
-                
-                take_length_frames = recorded_sound_data.size // self.player.num_input_channels
-                converted_data = AdikSound.convert_channels(recorded_sound_data, self.player.num_input_channels, self.player.num_output_channels, take_length_frames)
-
-                new_sound = AdikSound(
-                    name=f"adik_rec_{time.strftime('%H%M%S')}",
-                    audio_data=converted_data,
-                    sample_rate=self.player.sample_rate,
-                    num_channels=self.player.num_output_channels
-                )
-                new_track.set_audio_sound(new_sound, offset_frames=self.recording_start_frame)
+                # La prise garde les canaux d'entrée: le clip les convertit à la lecture
+                new_track.set_audio_sound(self.recording_sound, offset_frames=self.recording_start_frame)
+                self.player.undo_manager.record_add_track(new_track, "Enregistrement")
                 print(f"Player: Enregistrement ajouté à une nouvelle piste '{new_track.name}' à la frame {self.recording_start_frame}.")
                 new_track.set_playback_position(self.player.current_playback_frame)
             
             self.player._update_params()
-            self.recording_buffer = np.array([], dtype=np.float32)
         else:
             print("Player: Le buffer d'enregistrement est vide. Rien à finaliser.")
         
@@ -205,6 +236,158 @@ class AdikTransport:
 
     #----------------------------------------
 
+    # --- Stockage de la prise ---
+    def write_recording_block(self, indata):
+        """
+        Appelée par le callback audio: copie le bloc d'entrée dans le buffer circulaire.
+        Coût constant par bloc, sans allocation ni verrou.
+        """
+        ring_buffer = self._ring_buffer
+        if ring_buffer is not None:
+            ring_buffer.write(indata.reshape(-1))
+
+    #----------------------------------------
+
+    def set_record_to_disk(self, enabled, directory=None):
+        """
+        Active ou désactive l'enregistrement direct sur disque.
+        Ne prend effet qu'au prochain démarrage d'enregistrement.
+        """
+        if self._recording:
+            print("Player: Impossible de changer le mode pendant l'enregistrement.")
+            return False
+        if directory is not None:
+            if not os.path.isdir(directory):
+                print(f"Erreur: Le dossier '{directory}' n'existe pas.")
+                return False
+            self.record_directory = directory
+        self.record_to_disk = enabled
+        print(f"Player: Enregistrement sur disque {'activé' if enabled else 'désactivé'} (dossier: {self.record_directory}).")
+        return True
+
+    #----------------------------------------
+
+    def _start_recording_writer(self):
+        """
+        Prépare le buffer circulaire et démarre le thread qui le vide, soit dans les morceaux
+        de la prise en mémoire, soit dans un fichier WAV en mode enregistrement sur disque.
+        """
+        num_channels = self.player.num_input_channels
+        capacity = self.player.sample_rate * num_channels * self.RING_BUFFER_SECONDS
+        if self._ring_buffer is None or self._ring_buffer.capacity != capacity:
+            self._ring_buffer = AdikRingBuffer(capacity)
+        else:
+            self._ring_buffer.reset()
+
+        self._record_sound = AdikChunkSound(name=f"adik_rec_{time.strftime('%H%M%S')}",
+                                            sample_rate=self.player.sample_rate, num_channels=num_channels,
+                                            chunk_frames=self.RECORD_CHUNK_FRAMES)
+        self._current_chunk = np.zeros(self.RECORD_CHUNK_FRAMES * num_channels, dtype=np.float32)
+        self._chunk_pos = 0
+
+        self._recording_file = None
+        self.recording_file_path = None
+        if self.record_to_disk:
+            file_path = os.path.join(self.record_directory, f"adik_rec_{time.strftime('%Y_%m_%d_%H%M%S')}.wav")
+            self._recording_file = AdikWaveHandler.open_wav_writer(file_path, self.player.sample_rate, num_channels)
+            if self._recording_file is not None:
+                self.recording_file_path = file_path
+                self._last_flush_time = time.monotonic()
+                print(f"Player: Enregistrement sur disque dans '{file_path}'.")
+            else:
+                print("Player: Enregistrement sur disque impossible, la prise restera en mémoire.")
+
+        self._writer_stop_event.clear()
+        self._writer_thread = threading.Thread(target=self._recording_writer_runner, daemon=True)
+        self._writer_thread.start()
+
+    #----------------------------------------
+
+    def _recording_writer_runner(self):
+        """
+        Le thread d'écriture: vide régulièrement le buffer circulaire.
+        """
+        while not self._writer_stop_event.is_set():
+            self._drain_ring_buffer()
+            self._writer_stop_event.wait(self.WRITER_INTERVAL)
+
+    #----------------------------------------
+
+    def _drain_ring_buffer(self):
+        """
+        Copie les samples disponibles du buffer circulaire dans les morceaux de la prise.
+        Un morceau plein est adopté sans copie par le son de la prise,
+        puis un nouveau morceau est alloué (hors callback).
+        En mode disque, le morceau courant sert de tampon d'écriture vers le fichier WAV.
+        """
+        ring_buffer = self._ring_buffer
+        while ring_buffer.available_read() > 0:
+            if self._chunk_pos >= self._current_chunk.size:
+                if self._recording_file is not None:
+                    self._write_chunk_to_disk()
+                else:
+                    self._record_sound.append_chunk(self._current_chunk)
+                    self._current_chunk = np.zeros_like(self._current_chunk)
+                    self._chunk_pos = 0
+            self._chunk_pos += ring_buffer.read_into(self._current_chunk[self._chunk_pos:])
+
+        if self._recording_file is not None:
+            self._write_chunk_to_disk()
+            if time.monotonic() - self._last_flush_time >= self.DISK_FLUSH_INTERVAL:
+                AdikWaveHandler.sync_wav_writer(self._recording_file)
+                self._last_flush_time = time.monotonic()
+
+    #----------------------------------------
+
+    def _write_chunk_to_disk(self):
+        """
+        Écrit le contenu du morceau courant dans le fichier WAV de la prise, puis le réutilise.
+        """
+        num_channels = self.player.num_input_channels
+        num_samples = self._chunk_pos - (self._chunk_pos % num_channels)
+        if num_samples > 0:
+            self._recording_file.write(self._current_chunk[:num_samples].reshape(-1, num_channels))
+            remaining = self._chunk_pos - num_samples
+            self._current_chunk[:remaining] = self._current_chunk[num_samples:self._chunk_pos]
+            self._chunk_pos = remaining
+
+    #----------------------------------------
+
+    def _stop_recording_writer(self):
+        """
+        Arrête le thread d'écriture, vide le buffer circulaire et retourne le son de la prise (None si aucune).
+        En mode disque, le fichier est fermé puis rechargé comme un son projeté en mémoire.
+        """
+        if self._writer_thread is None:
+            return None
+
+        self._writer_stop_event.set()
+        self._writer_thread.join()
+        self._writer_thread = None
+        self._drain_ring_buffer()
+
+        if self._ring_buffer.overflow_samples > 0:
+            print(f"Player: Avertissement: {self._ring_buffer.overflow_samples} samples perdus pendant l'enregistrement.")
+
+        if self._recording_file is not None:
+            self._recording_file.close()
+            self._recording_file = None
+            self._current_chunk = None
+            self._chunk_pos = 0
+            self._record_sound = None
+            return AdikWaveHandler.map_wav(self.recording_file_path)
+
+        # Seul le dernier morceau, incomplet, est copié
+        recorded_sound = self._record_sound
+        num_channels = self.player.num_input_channels
+        recorded_sound.append_data(self._current_chunk[:self._chunk_pos - (self._chunk_pos % num_channels)])
+        self._record_sound = None
+        self._current_chunk = None
+        self._chunk_pos = 0
+        return recorded_sound
+
+    #----------------------------------------
+
     def set_recording_mode(self, mode: int):
         """
         Définit le mode d'enregistrement.
@@ -15,6 +15,8 @@ from adik_wave_handler import AdikWaveHandler
 from adik_player import AdikPlayer
 from adik_app import AdikApp
 
+# Délai d'attente d'une touche (ms) entre deux traitements des événements de l'application
+EVENT_POLL_MS = 100
 
 class AdikTUI(object):
     """ Text User Interface manager object, using curses library """
@@ -147,6 +149,10 @@ class AdikTUI(object):
         
         selected_track = self._app.player.get_selected_track()
         self.info_window.addstr(3, 0, f"Piste sélectionnée: {selected_track.name if selected_track else 'Aucune'}")
+        # Charge du moteur audio: temps du dernier bloc par rapport à son budget temps réel
+        stats = self._app.get_callback_stats()
+        xruns = stats['output_underflows'] + stats['output_overflows'] + stats['input_underflows'] + stats['input_overflows']
+        self.info_window.addstr(4, 0, f"DSP: {stats['last_ratio'] * 100:.0f}% (max {stats['max_ratio'] * 100:.0f}%) | Échéances manquées: {stats['deadline_misses']} | Xruns: {xruns}")
         self.info_window.refresh()
 
     def display_track_list(self):
@@ -193,9 +199,9 @@ class AdikTUI(object):
         
         self.track_window.addstr(start_row, 0, "Commandes:")
         self.track_window.addstr(start_row + 1, 0, "  Espace: Lecture/Pause | V: Arrêt | R: Enregistrement | M: Muet | S: Solo")
-        self.track_window.addstr(start_row + 2, 0, "  B: Avance rapide | W: Retour rapide | <: Début | >: Fin")
+        self.track_window.addstr(start_row + 2, 0, "  B: Avance rapide | W: Retour rapide | <: Début | >: Fin | u/U: Annuler/Rétablir")
         self.track_window.addstr(start_row + 3, 0, "  Haut/Bas: Sélectionner Piste | A: Ajouter Piste | D: Supprimer Piste | Q: Quitter")
-        self.track_window.addstr(start_row + 4, 0, "  +/-: Volume | [/]: Panoramique | C: Effacer Statut")
+        self.track_window.addstr(start_row + 4, 0, "  +/-: Volume | [/]: Panoramique | C: Effacer Statut | p/P: Stats DSP / RAZ | E: Forme d'onde")
         self.track_window.refresh()
 
     #----------------------------------------
@@ -250,8 +256,18 @@ class AdikTUI(object):
 
         elif key == ord('r'):
             self._app.toggle_record()
+        elif key == ord('e'):
+            self._app.show_track_overview()
+        elif key == ord('p'):
+            self._app.show_callback_stats()
+        elif key == ord('P'):
+            self._app.reset_callback_stats()
         elif key == ord('s'):
             self._app.toggle_solo_track()
+        elif key == ord('u'):
+            self._app.undo()
+        elif key == ord('U'):
+            self._app.redo()
         elif key == ord('v'):
             self._app.stop_playback()
         elif key == ord('w'):
@@ -287,6 +303,8 @@ class AdikTUI(object):
         elif key == 23:  # Ctrl+W
             # self._app.save_recording()
             self._app.save_track()
+        elif key == 24:  # Ctrl+X: Annuler l'import en cours
+            self._app.cancel_import()
         elif key == ord('+') or key == ord('='):
             self._app.increase_volume()
         elif key == ord('-') or key == ord('_'):
@@ -342,20 +360,23 @@ def main_curses(stdscr):
     # Boucle principale de l'application
     running = True
     # Ici, on ne met pas de block try/catch... car c'est fait autre part, à l'appel de cette fonction, ce qui permet d'afficher les tracebacks.
+    # getch() attend une touche au plus EVENT_POLL_MS ms: entre deux touches, la boucle traite
+    # les événements des threads de travail (progression et fin d'un import), dans ce thread,
+    # le seul qui dessine avec curses et modifie la liste des pistes.
+    stdscr.timeout(EVENT_POLL_MS)
     while running:
         # Mettre à jour tous les éléments de l'interface utilisateur
         # ui.update_all()
         
-        # Obtenir une entrée bloquante (attend l'appui sur une touche)
+        # Obtenir une entrée (attend l'appui sur une touche, ou la fin du délai)
         key = stdscr.getch() 
+        adik_app.process_events()
+        if key == -1:
+            continue
         
         # Gérer la touche pressée via le key_handler de l'interface utilisateur
         running = ui.key_handler(key)
 
-        # Pas besoin de time.sleep ici car getch() est bloquant
-        # L'interface utilisateur ne se met à jour que lorsqu'une touche est pressée.
-        # Pour des mises à jour continues pendant la lecture, il faudrait un getch() non bloquant
-        # et un thread de mise à jour de l'interface utilisateur séparé ou un petit timeout dans getch().
     # End of while loop
     curses.beep()
     adik_app.close_app()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+    File: adik_undo_manager.py
+    Undo/redo history of the track edits, with a memory budget and disk spill
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import shutil
+import tempfile
+
+class AdikUndoManager:
+    """
+    Historique d'annulation (undo/redo) des éditions de pistes.
+    Une édition ne change que les clips d'une piste (ou ajoute une piste): chaque entrée garde
+    les listes de clips avant et après l'édition, et non une copie du son.
+    Annuler remet la liste de clips précédente, en O(nombre de clips), quelle que soit la longueur de la piste.
+    Les sons qui ne sont plus joués que par l'historique (prise annulée, son dont tous les clips ont été supprimés)
+    comptent dans le budget mémoire 'memory_budget'. Au-delà, les sons des entrées les plus anciennes
+    sont écrits sur le disque et relus par une projection mémoire (np.memmap): l'entrée reste annulable.
+    """
+    def __init__(self, player, memory_budget=256 * 1024 * 1024, spill_dir=None):
+        self.player = player
+        self.memory_budget = memory_budget # En octets
+        self.spill_dir = spill_dir # Répertoire des sons écrits sur le disque, temporaire si None
+        self._undo_stack = []
+        self._redo_stack = []
+        self._spill_files = {} # id(son) -> (son, chemin du fichier)
+        self._owns_spill_dir = False
+
+    #----------------------------------------
+
+    def can_undo(self):
+        return len(self._undo_stack) > 0
+
+    #----------------------------------------
+
+    def can_redo(self):
+        return len(self._redo_stack) > 0
+
+    #----------------------------------------
+
+    def set_memory_budget(self, memory_budget):
+        """ Change le budget mémoire de l'historique, en octets. """
+        self.memory_budget = max(0, int(memory_budget))
+        self._enforce_budget()
+
+    #----------------------------------------
+
+    def record_clips(self, track, before_clips, label):
+        """
+        Enregistre une édition des clips d'une piste: 'before_clips' est la liste des clips
+        avant l'édition (track.get_clips()), la liste après l'édition est lue sur la piste.
+        """
+        self._push({'label': label, 'kind': 'clips', 'track': track,
+                    'before': before_clips, 'after': track.get_clips()})
+
+    #----------------------------------------
+
+    def record_add_track(self, track, label):
+        """ Enregistre l'ajout d'une piste (bounce, enregistrement sur une nouvelle piste). """
+        self._push({'label': label, 'kind': 'add_track', 'track': track,
+                    'track_idx': self.player.track_list.index(track)})
+
+    #----------------------------------------
+
+    def _push(self, entry):
+        self._undo_stack.append(entry)
+        # Une nouvelle édition rend l'historique de rétablissement caduc
+        self._redo_stack = []
+        self._collect_spill_files()
+        self._enforce_budget()
+
+    #----------------------------------------
+
+    def undo(self):
+        """ Annule la dernière édition. Retourne son libellé, ou None si l'historique est vide. """
+        if not self._undo_stack:
+            print("Undo: Rien à annuler.")
+            return None
+        entry = self._undo_stack.pop()
+        self._apply(entry, is_undo=True)
+        self._redo_stack.append(entry)
+        self._enforce_budget()
+        print(f"Undo: '{entry['label']}' annulé sur la piste '{entry['track'].name}'.")
+        return entry['label']
+
+    #----------------------------------------
+
+    def redo(self):
+        """ Rétablit la dernière édition annulée. Retourne son libellé, ou None s'il n'y a rien à rétablir. """
+        if not self._redo_stack:
+            print("Undo: Rien à rétablir.")
+            return None
+        entry = self._redo_stack.pop()
+        self._apply(entry, is_undo=False)
+        self._undo_stack.append(entry)
+        self._enforce_budget()
+        print(f"Undo: '{entry['label']}' rétabli sur la piste '{entry['track'].name}'.")
+        return entry['label']
+
+    #----------------------------------------
+
+    def _apply(self, entry, is_undo):
+        """ Remet la piste de l'entrée dans son état d'avant (undo) ou d'après (redo) l'édition. """
+        player = self.player
+        track = entry['track']
+        if entry['kind'] == 'clips':
+            if track not in player.track_list:
+                print(f"Undo: Avertissement: La piste '{track.name}' a été supprimée entre-temps.")
+            track.set_clips(entry['before'] if is_undo else entry['after'])
+        elif is_undo:
+            if track in player.track_list:
+                player.track_edit.delete_track(player.track_list.index(track))
+        else:
+            track_idx = min(entry['track_idx'], len(player.track_list))
+            player.track_list.insert(track_idx, track)
+            player.select_track(track_idx)
+        track.set_playback_position(player.current_playback_frame)
+        player._update_params()
+
+    #----------------------------------------
+
+    def _get_entry_clips(self, entry):
+        """ Retourne les clips gardés par une entrée. """
+        if entry['kind'] == 'clips':
+            return entry['before'] + entry['after']
+        return entry['track'].clips
+
+    #----------------------------------------
+
+    def _get_history_sounds(self):
+        """
+        Retourne les sons gardés uniquement par l'historique (ni joués par une piste, ni lus en streaming,
+        ni déjà écrits sur le disque), des entrées les plus anciennes aux plus récentes.
+        """
+        live_sounds = {id(clip.sound) for track in self.player.track_list for clip in track.clips}
+        history_sounds = {}
+        # Les entrées annulées (redo) sont les plus récentes: parcourues en dernier
+        for entry in self._undo_stack + self._redo_stack[::-1]:
+            for clip in self._get_entry_clips(entry):
+                sound = clip.sound
+                if id(sound) in live_sounds or id(sound) in history_sounds:
+                    continue
+                if sound.get_memory_size() > 0:
+                    history_sounds[id(sound)] = sound
+        return list(history_sounds.values())
+
+    #----------------------------------------
+
+    def get_memory_usage(self):
+        """ Retourne la mémoire (en octets) des sons gardés uniquement par l'historique. """
+        return sum(sound.get_memory_size() for sound in self._get_history_sounds())
+
+    #----------------------------------------
+
+    def _enforce_budget(self):
+        """ Écrit sur le disque les sons des entrées les plus anciennes tant que le budget mémoire est dépassé. """
+        history_sounds = self._get_history_sounds()
+        memory_usage = sum(sound.get_memory_size() for sound in history_sounds)
+        for sound in history_sounds:
+            if memory_usage <= self.memory_budget:
+                break
+            memory_usage -= sound.get_memory_size()
+            self._spill_sound(sound)
+
+    #----------------------------------------
+
+    def _get_spill_dir(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="adik_undo_")
+            self._owns_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        return self.spill_dir
+
+    #----------------------------------------
+
+    def _spill_sound(self, sound):
+        """
+        Écrit les données du son sur le disque et les remplace par une projection mémoire du fichier:
+        la mémoire est libérée, et le son reste jouable sans relecture complète s'il est rétabli.
+        """
+        file_path = os.path.join(self._get_spill_dir(), f"sound_{sound.id}_{id(sound)}.npy")
+        memory_size = sound.get_memory_size()
+        try:
+            sound.move_to_file(file_path)
+        except OSError as e:
+            print(f"Undo: Erreur lors de l'écriture du son '{sound.name}' sur le disque: {e}")
+            return
+        # Les vues de lecture des clips de l'historique gardaient l'ancien buffer: elles seront reconstruites au rétablissement
+        for entry in self._undo_stack + self._redo_stack:
+            for clip in self._get_entry_clips(entry):
+                if clip.sound is sound:
+                    clip.release_playback_data()
+        self._spill_files[id(sound)] = (sound, file_path)
+        print(f"Undo: Son '{sound.name}' ({memory_size / 1e6:.1f} Mo) déplacé sur le disque.")
+
+    #----------------------------------------
+
+    def _collect_spill_files(self):
+        """ Supprime les fichiers des sons qui ne sont plus dans l'historique. """
+        history_ids = {id(clip.sound) for entry in self._undo_stack + self._redo_stack for clip in self._get_entry_clips(entry)}
+        for sound_id, (sound, file_path) in list(self._spill_files.items()):
+            if sound_id in history_ids:
+                continue
+            try:
+                # Sous Linux, une projection mémoire encore jouée par une piste reste valide après la suppression
+                os.remove(file_path)
+            except OSError:
+                continue
+            del self._spill_files[sound_id]
+
+    #----------------------------------------
+
+    def clear(self):
+        """ Vide l'historique et supprime les fichiers écrits sur le disque. """
+        self._undo_stack = []
+        self._redo_stack = []
+        self._collect_spill_files()
+        if self._owns_spill_dir and not self._spill_files:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self._owns_spill_dir = False
+
+    #----------------------------------------
+
+    def get_summary(self):
+        """ Retourne l'état de l'historique sous forme de dictionnaire. """
+        return {
+            'undo': len(self._undo_stack),
+            'redo': len(self._redo_stack),
+            'next_undo': self._undo_stack[-1]['label'] if self._undo_stack else None,
+            'next_redo': self._redo_stack[-1]['label'] if self._redo_stack else None,
+            'memory_usage': self.get_memory_usage(),
+            'memory_budget': self.memory_budget,
+            'spilled_sounds': len(self._spill_files),
+        }
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    from adik_player import AdikPlayer
+    from adik_sound import AdikSound
+    player = AdikPlayer(audio_driver="null")
+    track = player.add_track()
+    track.set_audio_sound(AdikSound.sine_wave(dur=2, amp=0.5))
+    before_clips = track.get_clips()
+    track.delete_range(1000, 20000)
+    player.undo_manager.record_clips(track, before_clips, "Suppression")
+    player.undo_manager.undo()
+    print(track.length_frames, player.undo_manager.get_summary())
+    input("It's OK...")
+
+#----------------------------------------
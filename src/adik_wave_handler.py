@@ -7,34 +7,108 @@
 import soundfile as sf
 import numpy as np
 from adik_sound import AdikSound
+from adik_stream_sound import AdikStreamSound
+from adik_compact_sound import AdikCompactSound
+from adik_peaks import AdikPeaks
 import os
+import struct
+
+# Commande libsndfile pour réécrire l'en-tête du fichier (non exposée par soundfile)
+SFC_UPDATE_HEADER_NOW = 0x1060
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Durée à partir de laquelle open_wav lit un fichier en streaming plutôt que de le charger
+STREAM_MIN_SECONDS = 60.0
 
 class AdikWaveHandler:
+    # Enregistrer les crêtes des fichiers ouverts à côté de ceux-ci (fichier .peaks.npz)
+    save_peak_files = False
+    WRITE_BLOCK_FRAMES = 65536 # Taille des blocs écrits par save_wav et write_blocks
+    READ_BLOCK_FRAMES = 65536 # Taille des blocs lus par import_wav
+    # Format de stockage en mémoire des fichiers chargés ('float32', 'int16', 'float16'),
+    # None: selon la résolution du fichier (voir get_sample_format)
+    default_sample_format = None
+
+    @staticmethod
+    def load_wav(file_path, progress_callback=None, sample_format=None):
+        """ Charge entièrement un fichier WAV en mémoire (voir import_wav). """
+        return AdikWaveHandler.import_wav(file_path, progress_callback, sample_format=sample_format)
+
+    #----------------------------------------
+
+    @staticmethod
+    def get_sample_format(subtype):
+        """
+        Retourne le format de stockage en mémoire d'un fichier selon son sous-type soundfile:
+        'int16' pour les fichiers 8 ou 16 bits (sans perte, deux fois moins de mémoire que float32),
+        'float32' pour les autres.
+        """
+        if subtype in ('PCM_16', 'PCM_S8', 'PCM_U8'):
+            return "int16"
+        return "float32"
+
+    #----------------------------------------
+
     @staticmethod
-    def load_wav(file_path):
+    def import_wav(file_path, progress_callback=None, block_frames=READ_BLOCK_FRAMES, sample_format=None):
+        """
+        Charge un fichier audio bloc par bloc dans un buffer entrelacé alloué d'avance
+        à la taille du fichier: chaque bloc est décodé directement dans le buffer (sf.SoundFile.read(out=...)),
+        et le son adopte ce buffer sans copie: la mémoire maximale reste celle du son décodé.
+        sample_format: format de stockage en mémoire, 'float32', 'int16' ou 'float16' (AdikCompactSound);
+        par défaut default_sample_format, ou s'il est None celui qui correspond au fichier (get_sample_format).
+        progress_callback(frames_read, num_frames) est appelée après chaque bloc; si elle retourne False,
+        le chargement est annulé et la fonction retourne None.
+        """
         if not os.path.exists(file_path):
             print(f"Erreur: Fichier WAV introuvable: {file_path}")
             return None
 
         try:
-            # sf.read retourne les données audio et le sample rate
-            # dtype='float32' pour obtenir des données normalisées entre -1.0 et 1.0
-            # always_2d=True assure que les données sont toujours un tableau 2D (samples, channels)
-            audio_data, samplerate = sf.read(file_path, dtype='float32', always_2d=True)
-            
-            num_channels = audio_data.shape[1] # Nombre de colonnes est le nombre de canaux
-
-            sound = AdikSound(name=os.path.basename(file_path),
-                              audio_data = audio_data,
-                              sample_rate=samplerate, 
-                              num_channels=num_channels)
-            
-            # sounddevice attend des données 'flattened' (1D) si on les passe à la callback directement,
-            # ou si on les manipule comme un seul buffer linéaire.
-            # Convertissons les données 2D (samples, channels) en 1D (interleaved)
-            # data.flatten() par défaut est row-major (C-style), ce qui correspond à interleaved si (samples, channels).
-            # sound.audio_data = data.flatten()
+            with sf.SoundFile(file_path, mode='r') as sound_file:
+                num_frames = sound_file.frames
+                num_channels = sound_file.channels
+                sample_rate = sound_file.samplerate
+                if sample_format is None:
+                    sample_format = AdikWaveHandler.default_sample_format or AdikWaveHandler.get_sample_format(sound_file.subtype)
+                audio_data = np.empty(num_frames * num_channels, dtype=sample_format)
+                # Vue 2D (frames, canaux) du buffer entrelacé, remplie par soundfile
+                frames_2d = audio_data.reshape(num_frames, num_channels)
+                # Pas de lecture float16 dans soundfile: les blocs passent par un buffer float32 réutilisé
+                read_buffer = np.empty((min(block_frames, num_frames), num_channels), dtype=np.float32) if sample_format == "float16" else None
+                frames_read = 0
+                while frames_read < num_frames:
+                    frames_to_read = min(block_frames, num_frames - frames_read)
+                    dest = frames_2d[frames_read : frames_read + frames_to_read]
+                    if read_buffer is None:
+                        block = sound_file.read(frames_to_read, dtype=sample_format, always_2d=True, out=dest)
+                    else:
+                        block = sound_file.read(frames_to_read, dtype='float32', always_2d=True, out=read_buffer[:frames_to_read])
+                        dest[:block.shape[0]] = block
+                    if block.shape[0] == 0:
+                        break
+                    frames_read += block.shape[0]
+                    if progress_callback is not None and progress_callback(frames_read, num_frames) is False:
+                        print(f"Chargement de {file_path} annulé.")
+                        return None
 
+            if frames_read < num_frames:
+                # Fichier plus court que son en-tête: on garde les frames lues (vue, sans copie)
+                audio_data = audio_data[:frames_read * num_channels]
+            if sample_format == "float32":
+                sound = AdikSound(name=os.path.basename(file_path),
+                                  audio_data=audio_data,
+                                  sample_rate=sample_rate,
+                                  num_channels=num_channels)
+            else:
+                # soundfile lit les entiers 16 bits sans normalisation: échelle 1/32768
+                sound = AdikCompactSound(name=os.path.basename(file_path),
+                                         compact_data=audio_data,
+                                         scale=1.0 / 32768.0 if sample_format == "int16" else 1.0,
+                                         sample_rate=sample_rate,
+                                         num_channels=num_channels)
+            AdikWaveHandler.init_peaks(sound, file_path)
             print(f"Fichier WAV chargé: {sound}")
             return sound
         except Exception as e:
@@ -44,23 +118,245 @@ class AdikWaveHandler:
     #----------------------------------------
 
     @staticmethod
-    def save_wav(file_path, adik_sound):
+    def save_wav(file_path, adik_sound, start_frame=0, end_frame=-1, subtype='PCM_16', progress_callback=None):
+        """
+        Sauvegarde les frames [start_frame, end_frame) du son (tout le son par défaut) dans un fichier,
+        bloc par bloc (voir write_blocks): le son n'est ni copié ni matérialisé en entier.
+        subtype: 'PCM_16' (par défaut), 'PCM_24' ou 'FLOAT'.
+        """
         if not isinstance(adik_sound, AdikSound) or adik_sound.get_length_frames() == 0:
             print("Erreur: L'objet AdikSound est invalide ou vide pour la sauvegarde.")
             return False
 
-        try:
-            # soundfile s'attend à un tableau 2D pour l'écriture (samples, channels)
-            # Nous devons remodeler les données 1D (interleaved) en 2D
-            num_frames = len(adik_sound.audio_data) // adik_sound.num_channels
-            data_2d = adik_sound.audio_data.reshape((num_frames, adik_sound.num_channels))
-
-            sf.write(file_path, data_2d, adik_sound.sample_rate)
+        if end_frame == -1 or end_frame > adik_sound.length_frames:
+            end_frame = adik_sound.length_frames
+        blocks = adik_sound.iter_blocks(start_frame, end_frame, AdikWaveHandler.WRITE_BLOCK_FRAMES)
+        if AdikWaveHandler.write_blocks(file_path, blocks, adik_sound.sample_rate, adik_sound.num_channels,
+                                        max(0, end_frame - max(0, start_frame)), subtype, progress_callback):
             print(f"Fichier WAV sauvegardé: {file_path}")
             return True
+        return False
+
+    #----------------------------------------
+
+    @staticmethod
+    def write_blocks(file_path, blocks, sample_rate, num_channels, num_frames=None, subtype='PCM_16',
+                     file_format=None, progress_callback=None):
+        """
+        Écrit au fil de l'eau dans un fichier audio les blocs (frames, canaux) float32 produits par 'blocks'
+        (itérable: AdikSound.iter_blocks, AdikTrack.iter_blocks, rendu du moteur...), sans jamais
+        matérialiser toute la plage. Chaque bloc est écrit dès qu'il est produit.
+        subtype: 'PCM_16', 'PCM_24' ou 'FLOAT' (sous-types soundfile); file_format: déduit de l'extension si None.
+        progress_callback(frames_written, num_frames) est appelée après chaque bloc; si elle retourne False,
+        l'écriture est annulée et le fichier incomplet supprimé.
+        Retourne True si tout a été écrit.
+        """
+        is_cancelled = False
+        try:
+            with sf.SoundFile(file_path, mode='w', samplerate=sample_rate, channels=num_channels,
+                              format=file_format, subtype=subtype) as sound_file:
+                frames_written = 0
+                for block in blocks:
+                    sound_file.write(block)
+                    frames_written += block.shape[0]
+                    if progress_callback is not None and progress_callback(frames_written, num_frames) is False:
+                        is_cancelled = True
+                        break
         except Exception as e:
             print(f"Erreur lors de la sauvegarde de {file_path}: {e}")
+            AdikWaveHandler._remove_file(file_path)
+            return False
+
+        if is_cancelled:
+            print(f"Sauvegarde de {file_path} annulée.")
+            AdikWaveHandler._remove_file(file_path)
             return False
+        return True
+
+    #----------------------------------------
+
+    @staticmethod
+    def _remove_file(file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    #----------------------------------------
+
+    @staticmethod
+    def open_wav_writer(file_path, sample_rate, num_channels, subtype='FLOAT'):
+        """
+        Ouvre un fichier WAV en écriture, pour y écrire des blocs au fil de l'eau.
+        Retourne l'objet soundfile.SoundFile, ou None en cas d'erreur.
+        """
+        try:
+            return sf.SoundFile(file_path, mode='w', samplerate=sample_rate,
+                                channels=num_channels, format='WAV', subtype=subtype)
+        except Exception as e:
+            print(f"Erreur lors de l'ouverture de {file_path} en écriture: {e}")
+            return None
+
+    #----------------------------------------
+
+    @staticmethod
+    def sync_wav_writer(sound_file):
+        """
+        Met à jour l'en-tête WAV avec le nombre de frames déjà écrites, puis force
+        l'écriture sur disque. Le fichier reste lisible si l'application plante ensuite.
+        La mise à jour de l'en-tête passe par des attributs internes de soundfile (non exposée par son API):
+        s'ils n'existent plus, seul flush() est fait, et l'en-tête est écrit à la fermeture du fichier.
+        """
+        snd_lib = getattr(sf, '_snd', None)
+        ffi = getattr(sf, '_ffi', None)
+        file_ptr = getattr(sound_file, '_file', None)
+        if hasattr(snd_lib, 'sf_command') and hasattr(ffi, 'NULL') and file_ptr is not None:
+            try:
+                snd_lib.sf_command(file_ptr, SFC_UPDATE_HEADER_NOW, ffi.NULL, 0)
+            except Exception as e:
+                print(f"Avertissement: Impossible de mettre à jour l'en-tête WAV: {e}")
+        sound_file.flush()
+
+    #----------------------------------------
+
+    @staticmethod
+    def read_wav_layout(file_path):
+        """
+        Lit les chunks RIFF d'un fichier WAV et retourne un dictionnaire décrivant
+        le format des samples et la position du chunk 'data' dans le fichier.
+        Retourne None si le fichier n'est pas un WAV valide.
+        Si la taille du chunk 'data' est incohérente (en-tête non mis à jour après un plantage),
+        elle est déduite de la taille du fichier.
+        """
+        try:
+            file_size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                riff_header = f.read(12)
+                if len(riff_header) < 12 or riff_header[0:4] != b'RIFF' or riff_header[8:12] != b'WAVE':
+                    return None
+
+                layout = {}
+                while True:
+                    chunk_header = f.read(8)
+                    if len(chunk_header) < 8:
+                        break
+                    chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+                    if chunk_id == b'fmt ':
+                        fmt_data = f.read(chunk_size)
+                        format_tag, num_channels, sample_rate, _, block_align, bits_per_sample = struct.unpack('<HHIIHH', fmt_data[:16])
+                        if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt_data) >= 26:
+                            # Le vrai format est dans les 2 premiers octets du SubFormat GUID
+                            format_tag = struct.unpack('<H', fmt_data[24:26])[0]
+                        layout.update(format_tag=format_tag, num_channels=num_channels,
+                                      sample_rate=sample_rate, block_align=block_align,
+                                      bits_per_sample=bits_per_sample)
+                        if chunk_size % 2:
+                            f.seek(1, os.SEEK_CUR)
+                    elif chunk_id == b'data':
+                        data_offset = f.tell()
+                        if chunk_size == 0 or data_offset + chunk_size > file_size:
+                            chunk_size = file_size - data_offset
+                        layout.update(data_offset=data_offset, data_size=chunk_size)
+                        break
+                    else:
+                        f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+            if 'format_tag' not in layout or 'data_offset' not in layout:
+                return None
+            return layout
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'en-tête de {file_path}: {e}")
+            return None
+
+    #----------------------------------------
+
+    @staticmethod
+    def map_wav(file_path):
+        """
+        Charge un fichier WAV float32 sans le lire en mémoire: les données audio sont
+        un np.memmap en lecture seule sur le chunk 'data' du fichier.
+        Pour les autres formats, le fichier est chargé normalement avec load_wav.
+        """
+        layout = AdikWaveHandler.read_wav_layout(file_path)
+        if layout is None:
+            print(f"Erreur: Fichier WAV invalide: {file_path}")
+            return None
+        if layout['format_tag'] != WAVE_FORMAT_IEEE_FLOAT or layout['bits_per_sample'] != 32:
+            return AdikWaveHandler.load_wav(file_path)
+
+        num_channels = layout['num_channels']
+        num_samples = (layout['data_size'] // layout['block_align']) * num_channels
+        if num_samples == 0:
+            audio_data = np.array([], dtype=np.float32)
+        else:
+            audio_data = np.memmap(file_path, dtype='<f4', mode='r',
+                                   offset=layout['data_offset'], shape=(num_samples,))
+
+        sound = AdikSound(name=os.path.basename(file_path),
+                          audio_data=audio_data,
+                          sample_rate=layout['sample_rate'],
+                          num_channels=num_channels)
+        AdikWaveHandler.init_peaks(sound, file_path)
+        print(f"Fichier WAV projeté en mémoire: {sound}")
+        return sound
+
+    #----------------------------------------
+
+    @staticmethod
+    def stream_wav(file_path):
+        """
+        Ouvre un fichier WAV pour la lecture en streaming depuis le disque (AdikStreamSound):
+        le chunk 'data' est projeté en mémoire, et converti en float32 bloc par bloc à la lecture.
+        Gère le PCM 16, 24 et 32 bits, et le float 32 bits.
+        Pour les autres formats, le fichier est chargé normalement avec load_wav.
+        """
+        layout = AdikWaveHandler.read_wav_layout(file_path)
+        if layout is None:
+            print(f"Erreur: Fichier WAV invalide: {file_path}")
+            return None
+        if AdikStreamSound._get_sample_format(layout) is None:
+            return AdikWaveHandler.load_wav(file_path)
+
+        try:
+            sound = AdikStreamSound(file_path, layout)
+        except Exception as e:
+            print(f"Erreur lors de l'ouverture de {file_path} en streaming: {e}")
+            return None
+        AdikWaveHandler.init_peaks(sound, file_path)
+        print(f"Fichier WAV ouvert en streaming: {sound}")
+        return sound
+
+    #----------------------------------------
+
+    @staticmethod
+    def init_peaks(sound, file_path):
+        """
+        Prépare les crêtes d'un son chargé depuis 'file_path': reprises du fichier de crêtes
+        s'il correspond encore au fichier WAV, sinon calculées (et enregistrées si save_peak_files).
+        """
+        peaks = AdikPeaks.load(file_path, sound)
+        if peaks is not None:
+            sound.set_peaks(peaks)
+            return
+        peaks = sound.get_peaks()
+        if AdikWaveHandler.save_peak_files:
+            peaks.save(file_path)
+
+    #----------------------------------------
+
+    @staticmethod
+    def open_wav(file_path, stream_min_seconds=STREAM_MIN_SECONDS, progress_callback=None, sample_format=None):
+        """
+        Ouvre un fichier WAV pour la lecture: en streaming s'il dure au moins
+        'stream_min_seconds' secondes, sinon chargé entièrement en mémoire (import_wav,
+        avec 'progress_callback' et 'sample_format').
+        """
+        layout = AdikWaveHandler.read_wav_layout(file_path)
+        if layout is not None and layout['block_align'] > 0 and layout['sample_rate'] > 0:
+            duration_seconds = layout['data_size'] / layout['block_align'] / layout['sample_rate']
+            if duration_seconds >= stream_min_seconds:
+                return AdikWaveHandler.stream_wav(file_path)
+        return AdikWaveHandler.import_wav(file_path, progress_callback, sample_format=sample_format)
 
     #----------------------------------------
 
@@ -0,0 +1,54 @@
+# base_audio_driver.py
+"""
+    File: base_audio_driver.py
+    Common interface of the audio drivers used by AdikAudioEngine
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+
+class BaseAudioDriver:
+    """
+    Interface commune des pilotes audio.
+    Un pilote démarre et arrête les streams, et appelle les callbacks du moteur
+    avec les mêmes signatures que sounddevice:
+        sortie: callback(outdata, frames, time_info, status)
+        entrée: callback(indata, frames, time_info, status)
+        duplex: callback(indata, outdata, frames, time_info, status)
+    """
+    def __init__(self, sample_rate, block_size, num_output_channels, num_input_channels):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.num_output_channels = num_output_channels
+        self.num_input_channels = num_input_channels
+
+    #----------------------------------------
+
+    def start_output_stream(self, callback_func):
+        raise NotImplementedError
+
+    #----------------------------------------
+
+    def stop_output_stream(self):
+        raise NotImplementedError
+
+    #----------------------------------------
+
+    def start_input_stream(self, callback_func):
+        raise NotImplementedError
+
+    #----------------------------------------
+
+    def stop_input_stream(self):
+        raise NotImplementedError
+
+    #----------------------------------------
+
+    def start_duplex_stream(self, callback_func):
+        raise NotImplementedError
+
+    #----------------------------------------
+
+    def stop_duplex_stream(self):
+        raise NotImplementedError
+
+    #----------------------------------------
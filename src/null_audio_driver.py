@@ -0,0 +1,156 @@
+# null_audio_driver.py
+"""
+    File: null_audio_driver.py
+    Audio drivers without sound card, for headless hosts and benchmarks
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import time
+import numpy as np
+
+from base_audio_driver import BaseAudioDriver
+
+class NullAudioDriver(BaseAudioDriver):
+    """
+    Pilote sans carte son: un thread appelle les callbacks au rythme des blocs
+    (block_size / sample_rate secondes), comme le ferait une carte son.
+    L'entrée est du silence et la sortie est ignorée.
+    """
+    STREAM_OUTPUT = "output"
+    STREAM_INPUT = "input"
+    STREAM_DUPLEX = "duplex"
+
+    def __init__(self, sample_rate, block_size, num_output_channels, num_input_channels, realtime=True):
+        super().__init__(sample_rate, block_size, num_output_channels, num_input_channels)
+        self.realtime = realtime # False: les blocs sont enchaînés aussi vite que possible
+        self.blocks_processed = 0
+        self._threads = {}
+        self._stop_events = {}
+        print(f"Pilote {self.__class__.__name__}: Aucun périphérique audio utilisé.")
+
+    #----------------------------------------
+
+    def _start_stream(self, stream_kind, callback_func):
+        """ Démarre le thread d'un stream. """
+        thread = self._threads.get(stream_kind)
+        if thread is not None and thread.is_alive():
+            print(f"Pilote {self.__class__.__name__}: Stream '{stream_kind}' déjà actif.")
+            return
+        if stream_kind == self.STREAM_DUPLEX and any(t.is_alive() for t in self._threads.values()):
+            print(f"Pilote {self.__class__.__name__}: Un stream est déjà actif. Impossible de démarrer un stream duplex.")
+            return
+
+        stop_event = threading.Event()
+        thread = threading.Thread(target=self._stream_runner, args=(stream_kind, callback_func, stop_event), daemon=True)
+        self._stop_events[stream_kind] = stop_event
+        self._threads[stream_kind] = thread
+        thread.start()
+
+    #----------------------------------------
+
+    def _stop_stream(self, stream_kind):
+        """ Arrête le thread d'un stream et attend sa fin. """
+        stop_event = self._stop_events.pop(stream_kind, None)
+        thread = self._threads.pop(stream_kind, None)
+        if stop_event is not None:
+            stop_event.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    #----------------------------------------
+
+    def _stream_runner(self, stream_kind, callback_func, stop_event):
+        """
+        Le thread d'un stream: prépare les buffers une fois, puis appelle le callback
+        pour chaque bloc, en respectant la cadence des blocs si realtime est vrai.
+        """
+        block_size = self.block_size
+        indata = np.zeros((block_size, self.num_input_channels), dtype=np.float32)
+        outdata = np.zeros((block_size, self.num_output_channels), dtype=np.float32)
+        block_period = block_size / self.sample_rate
+        next_block_time = time.perf_counter()
+
+        while not stop_event.is_set():
+            try:
+                if stream_kind == self.STREAM_OUTPUT:
+                    callback_func(outdata, block_size, None, None)
+                    self._write_output(outdata)
+                elif stream_kind == self.STREAM_INPUT:
+                    self._read_input(indata)
+                    callback_func(indata, block_size, None, None)
+                else:
+                    self._read_input(indata)
+                    callback_func(indata, outdata, block_size, None, None)
+                    self._write_output(outdata)
+            except Exception as e:
+                print(f"Pilote {self.__class__.__name__}: Erreur dans le callback du stream '{stream_kind}': {e}")
+                break
+            self.blocks_processed += 1
+
+            if self.realtime:
+                next_block_time += block_period
+                delay = next_block_time - time.perf_counter()
+                if delay > 0:
+                    stop_event.wait(delay)
+                else:
+                    # En retard: on repart de maintenant plutôt que d'enchaîner les blocs en rafale
+                    next_block_time = time.perf_counter()
+
+    #----------------------------------------
+
+    def _read_input(self, indata):
+        """ Remplit le bloc d'entrée. Ici: du silence. """
+        indata.fill(0.0)
+
+    #----------------------------------------
+
+    def _write_output(self, outdata):
+        """ Reçoit le bloc de sortie. Ici: il est ignoré. """
+        pass
+
+    #----------------------------------------
+
+    def start_output_stream(self, callback_func):
+        self._start_stream(self.STREAM_OUTPUT, callback_func)
+
+    #----------------------------------------
+
+    def stop_output_stream(self):
+        self._stop_stream(self.STREAM_OUTPUT)
+
+    #----------------------------------------
+
+    def start_input_stream(self, callback_func):
+        self._start_stream(self.STREAM_INPUT, callback_func)
+
+    #----------------------------------------
+
+    def stop_input_stream(self):
+        self._stop_stream(self.STREAM_INPUT)
+
+    #----------------------------------------
+
+    def start_duplex_stream(self, callback_func):
+        self._start_stream(self.STREAM_DUPLEX, callback_func)
+
+    #----------------------------------------
+
+    def stop_duplex_stream(self):
+        self._stop_stream(self.STREAM_DUPLEX)
+
+    #----------------------------------------
+
+#========================================
+
+class FreeRunAudioDriver(NullAudioDriver):
+    """
+    Pilote sans carte son qui enchaîne les blocs aussi vite que possible.
+    Sert à mesurer le débit maximal des callbacks.
+    """
+    def __init__(self, sample_rate, block_size, num_output_channels, num_input_channels):
+        super().__init__(sample_rate, block_size, num_output_channels, num_input_channels, realtime=False)
+
+    #----------------------------------------
+
+#----------------------------------------
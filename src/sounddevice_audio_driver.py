@@ -2,16 +2,15 @@
 import sounddevice as sd
 import numpy as np
 
-class SoundDeviceAudioDriver:
+from base_audio_driver import BaseAudioDriver
+
+class SoundDeviceAudioDriver(BaseAudioDriver):
     """
     Implémentation spécifique du pilote audio pour la bibliothèque SoundDevice.
     Cette classe gère les streams audio de bas niveau.
     """
     def __init__(self, sample_rate, block_size, num_output_channels, num_input_channels):
-        self.sample_rate = sample_rate
-        self.block_size = block_size
-        self.num_output_channels = num_output_channels
-        self.num_input_channels = num_input_channels
+        super().__init__(sample_rate, block_size, num_output_channels, num_input_channels)
         self._stream_out = None
         self._stream_in = None
         self._stream_duplex = None
@@ -0,0 +1,125 @@
+# wav_file_audio_driver.py
+"""
+    File: wav_file_audio_driver.py
+    Audio driver reading its input from a WAV file and writing its output to a WAV file
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+
+from null_audio_driver import NullAudioDriver
+
+class WavFileDriver(NullAudioDriver):
+    """
+    Pilote sans carte son qui écrit la sortie dans un fichier WAV
+    et lit l'entrée depuis un fichier WAV (silence après la fin du fichier, ou sans fichier).
+    Par défaut, les blocs sont enchaînés aussi vite que possible (realtime=False).
+    Sans 'output_file_path', la sortie est écrite dans un nouveau fichier du répertoire temporaire du système.
+    """
+    def __init__(self, sample_rate, block_size, num_output_channels, num_input_channels,
+                 output_file_path=None, input_file_path=None, realtime=False):
+        super().__init__(sample_rate, block_size, num_output_channels, num_input_channels, realtime=realtime)
+        if output_file_path is None:
+            file_handle, output_file_path = tempfile.mkstemp(prefix="adik_output_", suffix=".wav")
+            os.close(file_handle)
+        self.output_file_path = output_file_path
+        self.input_file_path = input_file_path
+        self._output_file = None
+        self._input_file = None
+        self._input_buffer = None # Bloc lu dans le fichier d'entrée, avec ses propres canaux
+
+    #----------------------------------------
+
+    def _open_files(self, stream_kind):
+        """ Ouvre les fichiers utilisés par le stream. """
+        if stream_kind in (self.STREAM_OUTPUT, self.STREAM_DUPLEX) and self.output_file_path:
+            try:
+                self._output_file = sf.SoundFile(self.output_file_path, mode='w',
+                                                 samplerate=self.sample_rate,
+                                                 channels=self.num_output_channels,
+                                                 subtype='FLOAT')
+                print(f"Pilote WavFile: Sortie écrite dans '{self.output_file_path}'.")
+            except Exception as e:
+                print(f"Pilote WavFile: Erreur lors de l'ouverture du fichier de sortie '{self.output_file_path}': {e}")
+                self._output_file = None
+
+        if stream_kind in (self.STREAM_INPUT, self.STREAM_DUPLEX) and self.input_file_path:
+            try:
+                self._input_file = sf.SoundFile(self.input_file_path, mode='r')
+                if self._input_file.samplerate != self.sample_rate:
+                    print(f"Pilote WavFile: Avertissement: Le fichier d'entrée est à {self._input_file.samplerate} Hz, le moteur à {self.sample_rate} Hz.")
+                self._input_buffer = np.zeros((self.block_size, self._input_file.channels), dtype=np.float32)
+                print(f"Pilote WavFile: Entrée lue depuis '{self.input_file_path}'.")
+            except Exception as e:
+                print(f"Pilote WavFile: Erreur lors de l'ouverture du fichier d'entrée '{self.input_file_path}': {e}")
+                self._input_file = None
+
+    #----------------------------------------
+
+    def _close_files(self, stream_kind):
+        """ Ferme les fichiers utilisés par le stream. """
+        if stream_kind in (self.STREAM_OUTPUT, self.STREAM_DUPLEX) and self._output_file is not None:
+            self._output_file.close()
+            self._output_file = None
+        if stream_kind in (self.STREAM_INPUT, self.STREAM_DUPLEX) and self._input_file is not None:
+            self._input_file.close()
+            self._input_file = None
+
+    #----------------------------------------
+
+    def _start_stream(self, stream_kind, callback_func):
+        thread = self._threads.get(stream_kind)
+        if thread is not None and thread.is_alive():
+            print(f"Pilote WavFile: Stream '{stream_kind}' déjà actif.")
+            return
+        self._open_files(stream_kind)
+        super()._start_stream(stream_kind, callback_func)
+
+    #----------------------------------------
+
+    def _stop_stream(self, stream_kind):
+        super()._stop_stream(stream_kind)
+        # Le thread est terminé: les fichiers peuvent être fermés sans risque
+        self._close_files(stream_kind)
+
+    #----------------------------------------
+
+    def _read_input(self, indata):
+        """ Lit le bloc suivant du fichier d'entrée, complété par du silence. """
+        if self._input_file is None:
+            indata.fill(0.0)
+            return
+
+        frames_read = self._input_file.read(out=self._input_buffer).shape[0]
+        file_data = self._input_buffer[:frames_read]
+        file_channels = self._input_buffer.shape[1]
+        if file_channels == indata.shape[1]:
+            indata[:frames_read] = file_data
+        elif indata.shape[1] == 1:
+            # Plusieurs canaux vers mono: moyenne des canaux
+            np.mean(file_data, axis=1, out=indata[:frames_read, 0])
+        else:
+            # Mono (ou autre) vers plusieurs canaux: le premier canal est dupliqué
+            indata[:frames_read] = file_data[:, :1]
+        indata[frames_read:] = 0.0
+
+    #----------------------------------------
+
+    def _write_output(self, outdata):
+        """ Écrit le bloc de sortie dans le fichier. """
+        if self._output_file is not None:
+            self._output_file.write(outdata)
+
+    #----------------------------------------
+
+#========================================
+
+if __name__ == "__main__":
+    driver = WavFileDriver(44100, 1024, 2, 1)
+    print(driver.output_file_path)
+    input("It's OK...")
+
+#----------------------------------------
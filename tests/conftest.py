@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+    File: conftest.py
+    Pytest configuration: makes the flat modules of src importable
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+    File: helpers.py
+    Shared helpers of the tests: test players and tracks, block playback, reference generators
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import math
+import tracemalloc
+import numpy as np
+
+from adik_player import AdikPlayer
+from adik_sound import AdikSound
+from adik_track import AdikTrack
+
+#----------------------------------------
+
+def make_noise_track(num_frames, num_channels=2, sample_rate=44100):
+    """ Crée une piste contenant un bruit blanc, avec volume et gains gauche/droite. """
+    track = AdikTrack(name="Test", sample_rate=sample_rate, num_channels=num_channels)
+    audio_data = np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32)
+    track.set_audio_sound(AdikSound(name="Test Sound", audio_data=audio_data,
+                                    sample_rate=sample_rate, num_channels=num_channels))
+    track.volume = 0.8
+    track.left_gain = 0.7
+    track.right_gain = 0.9
+    return track
+
+#----------------------------------------
+
+def make_noise_player(num_tracks, block_size, num_blocks, num_channels=2, sample_rate=44100):
+    """ Crée un player (pilote null) avec des pistes de bruit blanc de 2 * num_blocks blocs. """
+    player = AdikPlayer(sample_rate, block_size, num_channels, 1, "null")
+    for _ in range(num_tracks):
+        track = player.add_track()
+        audio_data = np.random.uniform(-0.5, 0.5, block_size * num_blocks * 2 * num_channels).astype(np.float32)
+        track.set_audio_sound(AdikSound(name="Test Sound", audio_data=audio_data,
+                                        sample_rate=sample_rate, num_channels=num_channels))
+    player._update_params()
+    return player
+
+#----------------------------------------
+
+def mix_blocks(track_list, mix_mode, block_size, num_blocks, num_channels):
+    """ Mixe toutes les pistes bloc par bloc depuis le début avec le noyau 'mix_mode', et retourne le mix complet. """
+    saved_mode = AdikTrack.mix_mode
+    AdikTrack.mix_mode = mix_mode
+    try:
+        for track in track_list:
+            track.set_playback_position(0)
+        mix_buffer = np.zeros(num_blocks * block_size * num_channels, dtype=np.float32)
+        for block_idx in range(num_blocks):
+            start_idx = block_idx * block_size * num_channels
+            output_buffer = mix_buffer[start_idx : start_idx + block_size * num_channels]
+            for track in track_list:
+                track.mix_sound_data(output_buffer, block_size)
+    finally:
+        AdikTrack.mix_mode = saved_mode
+    return mix_buffer
+
+#----------------------------------------
+
+def play_blocks(player, num_blocks, start_frame=0):
+    """ Joue 'num_blocks' blocs avec le callback de sortie depuis 'start_frame', et retourne la sortie (frames, canaux). """
+    engine = player.audio_engine
+    block_size = engine.block_size
+    outdata = np.zeros((block_size, engine.num_output_channels), dtype=np.float32)
+    player.set_position(start_frame)
+    player.transport._playing = True
+    output_blocks = []
+    for _ in range(num_blocks):
+        engine._audio_output_callback(outdata, block_size, None, None)
+        output_blocks.append(outdata.copy())
+    player.transport._playing = False
+    return np.concatenate(output_blocks)
+
+#----------------------------------------
+
+def measure_callback_allocations(player, num_blocks):
+    """ Retourne le pic d'allocation tracemalloc (en octets) d'un seul bloc du callback de sortie, après une chauffe. """
+    engine = player.audio_engine
+    block_size = engine.block_size
+    outdata = np.zeros((block_size, engine.num_output_channels), dtype=np.float32)
+    player.set_position(0)
+    player.transport._playing = True
+    for _ in range(4):
+        engine._audio_output_callback(outdata, block_size, None, None)
+
+    max_peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(num_blocks):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            engine._audio_output_callback(outdata, block_size, None, None)
+            _, peak = tracemalloc.get_traced_memory()
+            max_peak = max(max_peak, peak - current)
+    finally:
+        tracemalloc.stop()
+        player.transport._playing = False
+    return max_peak
+
+#----------------------------------------
+
+def read_track(track):
+    """ Retourne tout le contenu d'une piste, sans gain, en (frames, canaux). """
+    track_data = AdikSound.new_audio_data(track.length_frames * track.num_channels)
+    track.read_audio_block(track.start_frame, track.length_frames, track_data, apply_gain=False)
+    return track_data.reshape(-1, track.num_channels)
+
+#----------------------------------------
+
+def loop_sine_wave(freq, dur, amp, sample_rate, num_channels):
+    """ Générateur sinus de référence (boucles Python, un math.sin par frame), comme avant la vectorisation. """
+    num_frames = int(sample_rate * dur)
+    audio_buffer = np.zeros(num_frames * num_channels, dtype=np.float32)
+    for frame_idx in range(num_frames):
+        current_time = float(frame_idx) / sample_rate
+        sample_value = amp * math.sin(current_time * 2 * math.pi * freq)
+        for channel_idx in range(num_channels):
+            audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
+    return audio_buffer
+
+#----------------------------------------
+
+def loop_square_wave(freq, dur, amp, sample_rate, num_channels, duty_cycle):
+    """ Générateur d'onde carrée de référence (boucles Python), comme avant la vectorisation. """
+    num_frames = int(sample_rate * dur)
+    audio_buffer = np.zeros(num_frames * num_channels, dtype=np.float32)
+    for frame_idx in range(num_frames):
+        current_time = float(frame_idx) / sample_rate
+        sample_value = amp if math.fmod(current_time * freq, 1.0) < duty_cycle else -amp
+        for channel_idx in range(num_channels):
+            audio_buffer[frame_idx * num_channels + channel_idx] = sample_value
+    return audio_buffer
+
+#----------------------------------------
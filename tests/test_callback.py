@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+    File: test_callback.py
+    Correctness tests for the audio callback (allocations, render pool, compact sounds)
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_compact_sound import AdikCompactSound
+from helpers import make_noise_player, measure_callback_allocations, play_blocks
+
+#----------------------------------------
+
+def test_callback_allocates_no_audio_buffer():
+    """
+    Avec les buffers de travail préalloués, le callback ne crée plus que de petits objets Python par bloc
+    (en-têtes des vues NumPy, entiers des positions): leur pic ne dépend pas de la taille de bloc,
+    alors qu'un buffer audio alloué dans le callback grandirait avec elle.
+    """
+    num_tracks, block_size, num_blocks = 8, 1024, 20
+    pool_peaks = []
+    for size in (block_size, block_size * 16):
+        player = make_noise_player(num_tracks, size, num_blocks, 2, 44100)
+        player.audio_engine.set_scratch_buffers_mode(True)
+        pool_peaks.append(measure_callback_allocations(player, num_blocks))
+    assert pool_peaks[0] == pool_peaks[1]
+    # Sans buffers préalloués, un bloc alloue au moins un buffer audio
+    player = make_noise_player(num_tracks, block_size, num_blocks, 2, 44100)
+    player.audio_engine.set_scratch_buffers_mode(False)
+    assert measure_callback_allocations(player, num_blocks) >= block_size * 2 * 4
+
+#----------------------------------------
+
+def test_render_pool_same_output():
+    """ Les pistes lues par le pool de threads de rendu donnent la même sortie que le callback seul. """
+    player = make_noise_player(8, 256, 10, 2, 44100)
+    serial_output = play_blocks(player, 10)
+    player.set_render_threads(2, min_tracks=1)
+    try:
+        parallel_output = play_blocks(player, 10)
+    finally:
+        player.set_render_threads(0)
+    assert np.array_equal(serial_output, parallel_output)
+
+#----------------------------------------
+
+def test_compact_sounds_output():
+    """ L'int16 rejoue exactement des samples 16 bits; le float16 reste proche du float32. """
+    player = make_noise_player(4, 512, 20, 2, 44100)
+    # Des sons 16 bits, comme ceux d'un fichier PCM 16 bits
+    float_sounds = []
+    for track in player.track_list:
+        sound = track.clips[0].sound
+        sound.set_audio_data(np.round(sound.audio_data * 32768.0).astype(np.float32) / np.float32(32768.0))
+        float_sounds.append(sound)
+
+    outputs = {}
+    for sample_format in ("float32", "int16", "float16"):
+        for track, float_sound in zip(player.track_list, float_sounds):
+            if sample_format == "float32":
+                track.set_audio_sound(float_sound)
+            else:
+                scale = 1.0 / 32768.0 if sample_format == "int16" else None
+                track.set_audio_sound(AdikCompactSound.from_sound(float_sound, sample_format, scale=scale))
+        player._update_params()
+        outputs[sample_format] = play_blocks(player, 20)
+        if sample_format != "float32":
+            assert all(track.clips[0].sound.is_compact for track in player.track_list)
+
+    assert np.array_equal(outputs["float32"], outputs["int16"])
+    assert np.abs(outputs["float32"] - outputs["float16"]).max() < 1e-2
+
+#----------------------------------------
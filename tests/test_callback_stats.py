@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+    File: test_callback_stats.py
+    Deterministic tests of the callback statistics, with synthetic timestamps
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+from types import SimpleNamespace
+import numpy as np
+
+from adik_callback_stats import AdikCallbackStats
+
+# Blocs de 100 frames à 1000 Hz: budget temps réel de 100 ms par bloc
+SAMPLE_RATE = 1000
+NUM_FRAMES = 100
+
+#----------------------------------------
+
+def _run_block(stats, start_ns, block_ns, phase_times):
+    """ Simule un bloc: phase_times est une liste (phase, durée en ns), une phase pouvant revenir plusieurs fois. """
+    stats.begin_block(start_ns)
+    for phase_idx, phase_ns in phase_times:
+        stats.add_phase_time(phase_idx, phase_ns)
+    stats.end_block(NUM_FRAMES, start_ns + block_ns)
+
+#----------------------------------------
+
+def test_end_block_fills_histograms():
+    """ end_block met à jour totaux, maximums, histogrammes des phases et des rapports au budget, et compte les échéances manquées. """
+    stats = AdikCallbackStats(SAMPLE_RATE)
+    # Rapport 0,525: dans le budget
+    _run_block(stats, 0, 52_500_000, [(stats.PHASE_COMMANDS, 500), (stats.PHASE_TRACKS, 3_000)])
+    # Rapport 1,225: échéance manquée; la phase transport est ajoutée deux fois dans le bloc
+    _run_block(stats, 10**9, 122_500_000, [(stats.PHASE_TRACKS, 1_500_000),
+                                            (stats.PHASE_TRANSPORT, 2_000), (stats.PHASE_TRANSPORT, 2_000)])
+    # Rapport 5: dernière case des rapports; durée de phase au-delà de la dernière case du temps
+    _run_block(stats, 2 * 10**9, 500_000_000, [(stats.PHASE_OTHER, 2**40)])
+
+    assert stats.block_count == 3
+    assert stats.deadline_misses == 2
+    assert stats.total_ns == 52_500_000 + 122_500_000 + 500_000_000
+    assert stats.max_block_ns == 500_000_000
+    assert np.isclose(stats.last_ratio, 5.0)
+    assert np.isclose(stats.max_ratio, 5.0)
+
+    # Rapports: cases de 0,05, la dernière reçoit tout ce qui dépasse 2,0
+    expected_ratios = np.zeros(stats.NUM_RATIO_BINS, dtype=np.int64)
+    expected_ratios[[10, 24, stats.NUM_RATIO_BINS - 1]] = 1
+    assert np.array_equal(stats.ratio_histogram, expected_ratios)
+
+    # Chaque phase compte une fois par bloc (une phase absente tombe dans la case 0)
+    assert np.all(stats.phase_histograms.sum(axis=1) == 3)
+    # Case i: durée < 2**i µs
+    assert stats.phase_histograms[stats.PHASE_COMMANDS, 0] == 3
+    assert stats.phase_histograms[stats.PHASE_TRACKS, 2] == 1 # 3 µs
+    assert stats.phase_histograms[stats.PHASE_TRACKS, 11] == 1 # 1500 µs
+    assert stats.phase_histograms[stats.PHASE_TRANSPORT, 3] == 1 # 2 + 2 µs dans le même bloc
+    assert stats.phase_histograms[stats.PHASE_OTHER, stats.NUM_TIME_BINS - 1] == 1
+    assert stats.phase_total_ns[stats.PHASE_TRACKS] == 1_503_000
+    assert stats.phase_max_ns[stats.PHASE_TRACKS] == 1_500_000
+    assert stats.phase_max_ns[stats.PHASE_TRANSPORT] == 4_000
+
+    summary = stats.get_summary()
+    assert summary['block_count'] == 3
+    assert summary['deadline_misses'] == 2
+    assert np.isclose(summary['mean_ratio'], (0.525 + 1.225 + 5.0) / 3)
+    assert np.isclose(summary['phases']['tracks']['mean_us'], 1_503_000 / 3 / 1000)
+    assert np.isclose(summary['max_block_us'], 500_000)
+    assert len(AdikCallbackStats.format_summary(summary)) == 4
+
+#----------------------------------------
+
+def test_status_and_reset():
+    """ Les underflows et overflows du pilote sont comptés; reset() remet tout à zéro. """
+    stats = AdikCallbackStats(SAMPLE_RATE)
+    stats.count_status(None)
+    stats.count_status(SimpleNamespace(output_underflow=True, input_overflow=True))
+    stats.count_status(SimpleNamespace(output_underflow=True))
+    assert (stats.output_underflows, stats.output_overflows, stats.input_underflows, stats.input_overflows) == (2, 0, 0, 1)
+
+    _run_block(stats, 0, 200_000_000, [(stats.PHASE_TRACKS, 10_000)])
+    stats.reset()
+    summary = stats.get_summary()
+    assert summary['block_count'] == 0
+    assert summary['deadline_misses'] == 0
+    assert summary['output_underflows'] == 0
+    assert not stats.phase_histograms.any()
+    assert not stats.ratio_histogram.any()
+
+#----------------------------------------
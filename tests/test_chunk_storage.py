@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+    File: test_chunk_storage.py
+    Tests for the chunked copy-on-write storage of sounds
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_chunk_sound import AdikChunkSound
+from adik_chunk_storage import AdikChunkStorage
+
+CHUNK_FRAMES = 1024
+
+#----------------------------------------
+
+def _make_chunk_sound(num_frames=CHUNK_FRAMES * 4 + 100, num_channels=2):
+    audio_data = np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32)
+    return AdikChunkSound(name="Test Chunks", audio_data=audio_data, sample_rate=44100,
+                          num_channels=num_channels, chunk_frames=CHUNK_FRAMES)
+
+#----------------------------------------
+
+def _shared_chunks(sound_a, sound_b):
+    """ Index des morceaux partagés (même tableau) par deux sons. """
+    return [chunk_idx for chunk_idx, (chunk_a, chunk_b) in enumerate(zip(sound_a.storage.chunks, sound_b.storage.chunks))
+            if chunk_a is chunk_b]
+
+#----------------------------------------
+
+def test_copy_then_erase_keeps_parent():
+    """ Effacer une zone d'un son dérivé ne change pas le parent, et seuls les morceaux touchés sont copiés. """
+    sound = _make_chunk_sound()
+    parent_data = sound.storage.to_array()
+    derived_sound = sound.copy()
+    assert _shared_chunks(sound, derived_sound) == list(range(5))
+
+    derived_sound.erase_range(CHUNK_FRAMES + 10, CHUNK_FRAMES * 2 + 10)
+    assert np.array_equal(sound.storage.to_array(), parent_data)
+    derived_frames = derived_sound.storage.to_array().reshape(-1, 2)
+    assert not derived_frames[CHUNK_FRAMES + 10 : CHUNK_FRAMES * 2 + 10].any()
+    assert _shared_chunks(sound, derived_sound) == [0, 3, 4]
+
+#----------------------------------------
+
+def test_copy_then_write_keeps_parent():
+    """ Écrire dans un son dérivé ne change pas le parent; le parent peut encore écrire dans ses morceaux partagés. """
+    sound = _make_chunk_sound()
+    parent_data = sound.storage.to_array()
+    derived_sound = sound.copy()
+    write_data = np.full(100 * 2, 0.25, dtype=np.float32)
+    derived_sound.write_frames(CHUNK_FRAMES * 3 - 50, write_data)
+    assert np.array_equal(sound.storage.to_array(), parent_data)
+    assert np.array_equal(derived_sound.storage.to_array().reshape(-1, 2)[CHUNK_FRAMES * 3 - 50 : CHUNK_FRAMES * 3 + 50],
+                          write_data.reshape(-1, 2))
+    assert _shared_chunks(sound, derived_sound) == [0, 1, 4]
+
+    # Écriture du parent dans un morceau encore partagé: copié aussi de son côté
+    derived_data = derived_sound.storage.to_array()
+    sound.write_frames(0, write_data)
+    assert np.array_equal(derived_sound.storage.to_array(), derived_data)
+    assert _shared_chunks(sound, derived_sound) == [1, 4]
+
+#----------------------------------------
+
+def test_append_chunk_adopts_full_chunk():
+    """ Un morceau plein sur une frontière est adopté sans copie; sinon, ses frames sont copiées. """
+    storage = AdikChunkStorage(2, CHUNK_FRAMES)
+    chunk = np.random.uniform(-0.5, 0.5, (CHUNK_FRAMES, 2)).astype(np.float32)
+    storage.append_chunk(chunk)
+    assert np.shares_memory(storage.chunks[0], chunk)
+    assert storage.num_frames == CHUNK_FRAMES
+
+    storage.append(np.zeros(10 * 2, dtype=np.float32))
+    other_chunk = np.ones((CHUNK_FRAMES, 2), dtype=np.float32)
+    storage.append_chunk(other_chunk)
+    assert not any(np.shares_memory(stored_chunk, other_chunk) for stored_chunk in storage.chunks)
+    assert storage.num_frames == CHUNK_FRAMES * 2 + 10
+    frames = storage.to_array().reshape(-1, 2)
+    assert np.array_equal(frames[:CHUNK_FRAMES], chunk)
+    assert frames[CHUNK_FRAMES + 10:].min() == 1.0
+
+#----------------------------------------
+
+def test_resize_shrink_then_grow_is_silent():
+    """ Après un raccourcissement, l'allongement donne du silence, pas les anciennes frames du dernier morceau. """
+    sound = _make_chunk_sound()
+    parent_data = sound.storage.to_array().reshape(-1, 2)
+    derived_sound = sound.copy()
+    derived_sound.resize(CHUNK_FRAMES * 2 + 300)
+    derived_sound.resize(CHUNK_FRAMES * 4)
+    frames = derived_sound.storage.to_array().reshape(-1, 2)
+    assert derived_sound.length_frames == CHUNK_FRAMES * 4
+    assert np.array_equal(frames[:CHUNK_FRAMES * 2 + 300], parent_data[:CHUNK_FRAMES * 2 + 300])
+    assert not frames[CHUNK_FRAMES * 2 + 300:].any()
+    # Le morceau partagé n'a pas été effacé chez le parent
+    assert np.array_equal(sound.storage.to_array().reshape(-1, 2), parent_data)
+
+#----------------------------------------
+
+def test_write_negative_start_is_clamped():
+    """ Comme fill(), write() ignore les frames avant le début du stockage, au lieu d'écrire dans le dernier morceau. """
+    storage = AdikChunkStorage(1, CHUNK_FRAMES)
+    storage.append(np.zeros(CHUNK_FRAMES * 2, dtype=np.float32))
+    storage.write(-10, np.arange(1, 21, dtype=np.float32))
+    frames = storage.to_array()
+    assert np.array_equal(frames[:10], np.arange(11, 21, dtype=np.float32))
+    assert not frames[10:].any()
+
+#----------------------------------------
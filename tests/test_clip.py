@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+    File: test_clip.py
+    Tests for the playback views of clips and their rebuild outside the audio callback
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_compact_sound import AdikCompactSound
+from adik_sound import AdikSound
+from adik_track import AdikTrack
+
+#----------------------------------------
+
+def _make_mono_track(sound):
+    """ Piste stéréo jouant un son mono: la vue de lecture du clip est une conversion de canaux. """
+    track = AdikTrack(name="Test", sample_rate=44100, num_channels=2)
+    track.set_audio_sound(sound)
+    return track
+
+#----------------------------------------
+
+def _play_block(track, frame_pos, num_frames=512):
+    """ Lit un bloc comme le callback, et retourne le canal gauche. """
+    track.set_playback_position(frame_pos)
+    block = np.zeros(num_frames * 2, dtype=np.float32)
+    return track.get_audio_block(num_frames, out=block).reshape(-1, 2)[:, 0].copy()
+
+#----------------------------------------
+
+def _forbid_conversion(monkeypatch):
+    """ Fait échouer toute conversion de canaux du son entier (allocation interdite dans le callback). """
+    def convert_channels(*args, **kwargs):
+        raise AssertionError("Conversion du son entier pendant la lecture d'un bloc")
+    monkeypatch.setattr(AdikSound, "convert_channels", staticmethod(convert_channels))
+
+#----------------------------------------
+
+def test_callback_never_rebuilds_view(monkeypatch):
+    """ Un buffer remplacé sans passer par set_audio_data est lu bloc par bloc, sans reconstruire la vue. """
+    sound = AdikSound(name="Test", audio_data=np.zeros(44100, dtype=np.float32), sample_rate=44100, num_channels=1)
+    track = _make_mono_track(sound)
+    clip = track.clips[0]
+    assert clip.get_playback_data(2) is not None
+
+    new_data = np.linspace(-0.5, 0.5, 44100, dtype=np.float32)
+    sound.audio_data = new_data
+    _forbid_conversion(monkeypatch)
+    assert clip.get_playback_data(2) is None
+    assert np.array_equal(_play_block(track, 1000), new_data[1000:1512])
+
+#----------------------------------------
+
+def test_set_audio_data_rebuilds_view():
+    """ set_audio_data reconstruit la vue de lecture des clips du son, dans le thread appelant. """
+    sound = AdikSound(name="Test", audio_data=np.zeros(44100, dtype=np.float32), sample_rate=44100, num_channels=1)
+    track = _make_mono_track(sound)
+    new_data = np.linspace(-0.5, 0.5, 44100, dtype=np.float32)
+    sound.set_audio_data(new_data)
+    playback_data = track.clips[0].get_playback_data(2)
+    assert playback_data is not None
+    assert np.array_equal(playback_data[:, 1], new_data)
+
+#----------------------------------------
+
+def test_compact_decode_rebuilds_view(monkeypatch):
+    """ Le décodage complet d'un son compact reconstruit la vue de lecture: le callback ne convertit rien. """
+    float_sound = AdikSound(name="Test", audio_data=np.linspace(-0.5, 0.5, 44100, dtype=np.float32),
+                            sample_rate=44100, num_channels=1)
+    sound = AdikCompactSound.from_sound(float_sound, "float16")
+    track = _make_mono_track(sound)
+    assert track.clips[0].get_playback_data(2) is None
+
+    decoded_data = sound.audio_data
+    assert not sound.is_compact
+    _forbid_conversion(monkeypatch)
+    assert track.clips[0].get_playback_data(2) is not None
+    assert np.array_equal(_play_block(track, 2000), decoded_data[2000:2512])
+
+#----------------------------------------
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+    File: test_clip_index.py
+    Clip index lookups checked against a brute-force overlap scan
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_clip import AdikClip
+from adik_clip_index import AdikClipIndex
+from adik_sound import AdikSound
+
+NUM_FRAMES = 200000
+
+#----------------------------------------
+
+def _make_index(rng):
+    """
+    Index de clips superposés, triés par début: des clips courts et rapprochés,
+    et quelques longs clips qui en recouvrent beaucoup (le maximum cumulé des fins ne suit pas le dernier clip).
+    """
+    sound = AdikSound(name="Test Sound", audio_data=np.zeros(NUM_FRAMES, dtype=np.float32), num_channels=1)
+    clips = [AdikClip(sound, int(rng.integers(0, 100000)), 0, int(rng.integers(1, 3000))) for _ in range(150)]
+    clips += [AdikClip(sound, int(rng.integers(0, 60000)), 0, int(rng.integers(20000, 60000))) for _ in range(4)]
+    clips.sort(key=lambda clip: clip.timeline_start)
+    return AdikClipIndex(clips)
+
+#----------------------------------------
+
+def _check_range(index, frame_pos, num_frames, first, last):
+    """ Compare l'intervalle (first, last) avec un parcours de tous les clips. """
+    block_end = frame_pos + num_frames
+    clips = index.clips
+    overlapping = [clip_idx for clip_idx, clip in enumerate(clips)
+                   if clip.timeline_start < block_end and clip.timeline_end > frame_pos]
+    # Tous les clips qui recouvrent le bloc sont dans l'intervalle
+    assert all(first <= clip_idx < last for clip_idx in overlapping)
+    # last: nombre de clips qui commencent avant la fin du bloc
+    assert last == sum(clip.timeline_start < block_end for clip in clips)
+    # first: premier clip dont la fin, ou celle d'un clip précédent, dépasse le début du bloc
+    expected_first = len(clips)
+    max_end = None
+    for clip_idx, clip in enumerate(clips):
+        max_end = clip.timeline_end if max_end is None else max(max_end, clip.timeline_end)
+        if max_end > frame_pos:
+            expected_first = clip_idx
+            break
+    assert first == expected_first
+
+#----------------------------------------
+
+def test_find_matches_brute_force():
+    """ find() retourne l'intervalle attendu pour des blocs placés au hasard, avant, dans et après les clips. """
+    rng = np.random.default_rng(0)
+    index = _make_index(rng)
+    # Des clips courts finissent avant un long clip qui commence plus tôt
+    assert sum(clip.timeline_end < max_end for clip, max_end in zip(index.clips, index.max_ends)) > 10
+    for _ in range(300):
+        frame_pos = int(rng.integers(-1000, 170000))
+        num_frames = int(rng.integers(1, 4096))
+        first, last = index.find(frame_pos, num_frames)
+        _check_range(index, frame_pos, num_frames, first, last)
+
+#----------------------------------------
+
+def test_find_from_cursor_matches_find():
+    """
+    find_from_cursor() donne le même intervalle que find() en lecture séquentielle,
+    avec des blocs qui se recouvrent, des seeks en avant et en arrière, et un changement d'index.
+    """
+    rng = np.random.default_rng(1)
+    index = _make_index(rng)
+    other_index = _make_index(rng)
+    cursor = [None, 0, 0, 0, 0]
+    frame_pos = 0
+    num_frames = 512
+    for step in range(2000):
+        action = rng.integers(0, 10)
+        block_end = frame_pos + num_frames
+        num_frames = int(rng.choice([64, 512, 1024]))
+        if action == 0:
+            frame_pos = int(rng.integers(0, 160000)) # Seek, en avant ou en arrière
+        elif action == 1:
+            frame_pos = max(0, frame_pos - int(rng.integers(1, 5000))) # Retour en arrière
+        elif action == 2:
+            # Bloc qui commence avant le précédent et finit après lui
+            frame_pos = max(0, frame_pos - int(rng.integers(1, 256)))
+            num_frames = block_end - frame_pos + int(rng.integers(0, 512))
+        elif action == 3:
+            frame_pos += int(rng.integers(0, num_frames)) # Bloc qui recouvre le précédent
+        else:
+            frame_pos = block_end
+        block_index = other_index if step % 97 == 0 else index
+        expected = block_index.find(frame_pos, num_frames)
+        assert block_index.find_from_cursor(frame_pos, num_frames, cursor) == expected
+        _check_range(block_index, frame_pos, num_frames, *expected)
+        assert cursor[0] is block_index
+        if frame_pos > 170000:
+            frame_pos = 0
+
+#----------------------------------------
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+    File: test_command_queue.py
+    Tests for the command queue between the UI thread and the audio thread
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import time
+
+from adik_command_queue import AdikCommandQueue
+from adik_player import AdikPlayer
+
+#----------------------------------------
+
+def test_queue_runs_commands_in_order():
+    """ drain() exécute les commandes postées dans leur ordre d'arrivée, et vide la file. """
+    queue = AdikCommandQueue()
+    executed = []
+    for command_idx in range(5):
+        queue.post(executed.append, command_idx)
+    assert len(queue) == 5
+    assert executed == []
+    assert queue.drain() == 5
+    assert executed == [0, 1, 2, 3, 4]
+    assert len(queue) == 0
+    assert queue.drain() == 0
+    assert (queue.posted_count, queue.executed_count) == (5, 5)
+
+#----------------------------------------
+
+def test_drain_isolates_failing_command():
+    """ Une commande en erreur est comptée, et n'empêche pas l'exécution des suivantes. """
+    queue = AdikCommandQueue()
+    executed = []
+    def failing_command():
+        raise ValueError("commande en erreur")
+    queue.post(executed.append, "avant")
+    queue.post(failing_command)
+    queue.post(executed.append, "après")
+    assert queue.drain() == 3
+    assert executed == ["avant", "après"]
+    assert len(queue) == 0
+
+#----------------------------------------
+
+def test_post_command_runs_directly_when_stopped():
+    """ Sans stream actif, post_command et send_command exécutent la commande tout de suite, dans le thread appelant. """
+    engine = AdikPlayer(44100, 512, 2, 1, "null").audio_engine
+    assert not engine.is_running()
+    threads = []
+    engine.post_command(lambda: threads.append(threading.current_thread()))
+    assert threads == [threading.current_thread()]
+    assert len(engine._command_queue) == 0
+    assert engine.send_command(lambda value: value * 2, 21) == 42
+
+#----------------------------------------
+
+def test_commands_run_in_audio_thread():
+    """ Stream actif: les commandes sont exécutées dans l'ordre par le callback, et send_command retourne leur résultat. """
+    player = AdikPlayer(44100, 512, 2, 1, "null")
+    engine = player.audio_engine
+    player._start_engine()
+    try:
+        executed = []
+        for command_idx in range(10):
+            engine.post_command(executed.append, command_idx)
+        audio_thread = engine.send_command(threading.current_thread)
+    finally:
+        player._stop_engine()
+    assert executed == list(range(10))
+    assert audio_thread is not None and audio_thread is not threading.current_thread()
+
+#----------------------------------------
+
+def test_send_command_timeout():
+    """
+    Stream marqué actif mais qui ne rend aucun bloc: send_command retourne None après son délai,
+    et la commande reste en file jusqu'à l'arrêt du stream, qui l'exécute.
+    """
+    engine = AdikPlayer(44100, 512, 2, 1, "null").audio_engine
+    executed = []
+    engine._is_running_output = True
+    start_time = time.perf_counter()
+    assert engine.send_command(lambda: executed.append("commande") or True, timeout=0.05) is None
+    assert time.perf_counter() - start_time >= 0.05
+    assert executed == []
+    assert len(engine._command_queue) == 1
+
+    engine.stop_output_stream()
+    assert executed == ["commande"]
+    assert len(engine._command_queue) == 0
+
+#----------------------------------------
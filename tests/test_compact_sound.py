@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+    File: test_compact_sound.py
+    Tests for the full decode of compact sounds while the audio callback reads them
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import numpy as np
+
+from adik_compact_sound import AdikCompactSound
+from adik_sound import AdikSound
+
+#----------------------------------------
+
+class _SpyCompactSound(AdikCompactSound):
+    """ Son compact qui note chaque état vu par le callback pendant une conversion complète. """
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ('is_compact', 'compact_data', '_audio_data') and 'compact_data' in self.__dict__:
+            self.__dict__.setdefault('states', []).append(
+                (self.__dict__.get('is_compact', type(self).is_compact), self.compact_data is not None,
+                 self.__dict__.get('_audio_data') is not None))
+
+#----------------------------------------
+
+def _make_float_sound(num_frames=44100 * 2):
+    audio_data = np.round(np.random.uniform(-0.5, 0.5, num_frames * 2) * 32768.0).astype(np.float32) / np.float32(32768.0)
+    return AdikSound(name="Test", audio_data=audio_data, sample_rate=44100, num_channels=2)
+
+#----------------------------------------
+
+def test_decode_keeps_a_readable_buffer():
+    """ Pendant la conversion complète, un son compact a toujours un buffer lisible par le callback. """
+    float_sound = _make_float_sound()
+    compact_data = AdikCompactSound.from_sound(float_sound, "int16", scale=1.0 / 32768.0).compact_data
+    sound = _SpyCompactSound(name="Spy", compact_data=compact_data, scale=1.0 / 32768.0, sample_rate=44100, num_channels=2)
+    sound.states = []
+    sound.audio_data
+    assert sound.states
+    for is_compact, has_compact_data, has_audio_data in sound.states:
+        # Compact: le buffer compact est là; sinon: le buffer float32 est déjà installé
+        assert has_compact_data if is_compact else has_audio_data
+
+#----------------------------------------
+
+def test_read_during_decode():
+    """ Le callback lit des blocs justes pendant qu'un autre thread convertit tout le son. """
+    float_sound = _make_float_sound()
+    expected = float_sound.audio_data.reshape(-1, 2)
+    errors = []
+    for _ in range(5):
+        sound = AdikCompactSound.from_sound(float_sound, "int16", scale=1.0 / 32768.0)
+        stop_event = threading.Event()
+
+        def read_blocks():
+            out = np.zeros((512, 2), dtype=np.float32)
+            frame_pos = 0
+            try:
+                while not stop_event.is_set():
+                    frames_read = sound.read_frames(frame_pos, 512, out)
+                    if not np.array_equal(out[:frames_read], expected[frame_pos : frame_pos + frames_read]):
+                        errors.append(frame_pos)
+                    frame_pos = (frame_pos + 512) % (sound.length_frames - 512)
+            except Exception as e:
+                errors.append(e)
+
+        reader = threading.Thread(target=read_blocks)
+        reader.start()
+        sound.audio_data
+        stop_event.set()
+        reader.join()
+        assert not sound.is_compact
+    assert errors == []
+
+#----------------------------------------
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+    File: test_generators.py
+    Correctness tests for the waveform generators and the peak pyramid
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+from adik_sound import AdikSound
+from helpers import loop_sine_wave, loop_square_wave
+
+#----------------------------------------
+
+def test_sine_wave_matches_loop():
+    """ Le sinus vectorisé donne les mêmes samples que l'ancien générateur. """
+    sound = AdikSound.sine_wave(freq=440, dur=0.5, amp=0.2, sample_rate=44100, num_channels=2)
+    assert np.array_equal(loop_sine_wave(440, 0.5, 0.2, 44100, 2), sound.audio_data)
+
+#----------------------------------------
+
+def test_square_wave_matches_loop():
+    """ L'onde carrée vectorisée donne les mêmes samples que l'ancien générateur. """
+    sound = AdikSound.square_wave(freq=220, dur=0.5, amp=0.1, sample_rate=44100, num_channels=1, duty_cycle=0.6)
+    assert np.array_equal(loop_square_wave(220, 0.5, 0.1, 44100, 1, 0.6), sound.audio_data)
+
+#----------------------------------------
+
+def test_white_noise():
+    """ Le bruit blanc reste dans l'amplitude demandée, et il est reproductible avec une graine. """
+    noise_a = AdikSound.white_noise(dur=1, amp=0.5, sample_rate=44100, num_channels=2, seed=42)
+    noise_b = AdikSound.white_noise(dur=1, amp=0.5, sample_rate=44100, num_channels=2, seed=42)
+    assert noise_a.audio_data.size == 44100 * 2
+    assert np.abs(noise_a.audio_data).max() <= 0.5
+    assert np.array_equal(noise_a.audio_data, noise_b.audio_data)
+
+#----------------------------------------
+
+def test_peak_overview_matches_raw_data():
+    """ La vue d'ensemble par la pyramide de crêtes a les mêmes maxima que les données brutes. """
+    num_frames, width = 44100 * 10, 120
+    sound = AdikSound(name="Test Peaks", audio_data=np.random.uniform(-0.5, 0.5, num_frames * 2).astype(np.float32),
+                      sample_rate=44100, num_channels=2)
+    _, peak_maxs, _ = sound.get_peaks().get_peaks(0, num_frames, width)
+    assert np.array_equal(sound.audio_data.reshape(-1, 2).max(axis=0), peak_maxs.max(axis=0))
+
+#----------------------------------------
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+    File: test_import.py
+    Tests for block-by-block WAV import: progress, cancellation, and install on the UI thread
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import threading
+import numpy as np
+import pytest
+import soundfile as sf
+
+import adik_app
+from adik_app import AdikApp
+from adik_wave_handler import AdikWaveHandler
+
+NUM_FRAMES = AdikWaveHandler.READ_BLOCK_FRAMES * 3 + 100
+
+#----------------------------------------
+
+class _RecordingUI:
+    """ Interface de test: garde chaque message avec le thread qui l'a affiché. """
+    def __init__(self):
+        self.messages = []
+
+    def display_message(self, msg, on_status_bar=False):
+        self.messages.append((msg, threading.current_thread()))
+
+#----------------------------------------
+
+@pytest.fixture
+def wav_path(tmp_path):
+    file_path = str(tmp_path / "import.wav")
+    sf.write(file_path, np.random.uniform(-0.5, 0.5, (NUM_FRAMES, 2)).astype(np.float32), 44100, subtype='PCM_16')
+    return file_path
+
+#----------------------------------------
+
+@pytest.fixture
+def app():
+    app = AdikApp(_RecordingUI())
+    app.init_app(audio_driver="null")
+    yield app
+    app.close_app()
+
+#----------------------------------------
+
+def test_import_wav_progress(wav_path):
+    progress_calls = []
+    sound = AdikWaveHandler.import_wav(wav_path, progress_callback=lambda frames_read, num_frames: progress_calls.append((frames_read, num_frames)))
+    assert sound is not None and sound.length_frames == NUM_FRAMES
+    frames_read = [call[0] for call in progress_calls]
+    assert len(progress_calls) == 4
+    assert frames_read == sorted(frames_read) and frames_read[-1] == NUM_FRAMES
+    assert all(call[1] == NUM_FRAMES for call in progress_calls)
+
+#----------------------------------------
+
+def test_import_wav_cancel_from_progress(wav_path):
+    """ Une fonction de progression qui retourne False annule le chargement: import_wav retourne None. """
+    progress_calls = []
+    def on_progress(frames_read, num_frames):
+        progress_calls.append(frames_read)
+        return len(progress_calls) < 2
+    assert AdikWaveHandler.import_wav(wav_path, progress_callback=on_progress) is None
+    assert len(progress_calls) == 2
+
+#----------------------------------------
+
+def test_import_sound_installs_on_ui_thread(app, wav_path):
+    """ Le thread d'import ne fait que décoder: la piste est créée et le son installé par process_events. """
+    player = app.player
+    install_threads = []
+    add_track = player.add_track
+    def spy_add_track(*args, **kwargs):
+        install_threads.append(threading.current_thread())
+        return add_track(*args, **kwargs)
+    player.add_track = spy_add_track
+    num_tracks = len(player.track_list)
+    app._ui_app.messages.clear()
+
+    assert app.import_sound(wav_path)
+    app._import_thread.join()
+    # Rien n'est installé ni affiché par le thread d'import
+    assert len(player.track_list) == num_tracks
+    assert all(thread is threading.main_thread() for _, thread in app._ui_app.messages)
+
+    assert app.process_events() > 0
+    assert install_threads == [threading.main_thread()]
+    assert len(player.track_list) == num_tracks + 1
+    assert player.track_list[-1].length_frames == NUM_FRAMES
+    assert all(thread is threading.main_thread() for _, thread in app._ui_app.messages)
+    assert any("100%" in msg for msg, _ in app._ui_app.messages)
+
+#----------------------------------------
+
+def test_cancel_import(app, wav_path, monkeypatch):
+    """ cancel_import() pendant le décodage: aucune piste n'est ajoutée, et l'annulation est affichée. """
+    open_wav = AdikWaveHandler.open_wav
+    def cancelled_open_wav(file_path, **kwargs):
+        app.cancel_import()
+        return open_wav(file_path, **kwargs)
+    monkeypatch.setattr(adik_app.AdikWaveHandler, "open_wav", cancelled_open_wav)
+    num_tracks = len(app.player.track_list)
+
+    assert app.import_sound(wav_path)
+    app.wait_import()
+    assert len(app.player.track_list) == num_tracks
+    assert any("annulé" in msg for msg, _ in app._ui_app.messages)
+
+#----------------------------------------
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+    File: test_mix.py
+    Correctness tests for the mixing kernels and the offline mixdown
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+
+import adik_bounce
+from adik_bounce import AdikParallelBounce
+from adik_player import AdikPlayer
+from adik_sound import AdikSound
+from adik_track import AdikTrack
+from helpers import make_noise_track, mix_blocks
+
+#----------------------------------------
+
+def test_vectorized_mix_matches_loop():
+    """ Le mixage vectorisé donne la même sortie que l'ancien mixage échantillon par échantillon. """
+    block_size, num_blocks = 256, 8
+    track_list = [make_noise_track(block_size * num_blocks) for _ in range(3)]
+    loop_mix = mix_blocks(track_list, AdikTrack.MIX_MODE_LOOP, block_size, num_blocks, 2)
+    vec_mix = mix_blocks(track_list, AdikTrack.MIX_MODE_VECTORIZED, block_size, num_blocks, 2)
+    assert np.allclose(loop_mix, vec_mix, atol=1e-5)
+
+#----------------------------------------
+
+def test_mix_range_matches_block_mix():
+    """ Le mixage sur toute la plage (mix_range) donne le même son que le mixage bloc par bloc. """
+    sample_rate, num_frames = 44100, 44100 * 5
+    player = AdikPlayer(sample_rate, 512, 2, 1, "null")
+    for track_idx in range(4):
+        track = player.add_track()
+        # Pistes stéréo et sons mono, avec des clips séparés par un trou
+        sound_channels = 1 if track_idx % 2 else 2
+        track.set_audio_sound(AdikSound(name="Test Sound", audio_data=np.random.uniform(-0.5, 0.5, num_frames * sound_channels).astype(np.float32),
+                                        sample_rate=sample_rate, num_channels=sound_channels), offset_frames=track_idx * 1000)
+        track.erase_range(num_frames // 3, num_frames // 3 + sample_rate)
+        track.pan = (track_idx % 5 - 2) * 0.2
+    player._update_params()
+    tracks_to_mix = list(player.track_list)
+    block_mix = player.track_edit._mix_tracks_by_blocks(tracks_to_mix, 0, num_frames)
+    range_mix = player.track_edit._mix_tracks(tracks_to_mix, 0, num_frames)
+    assert np.allclose(block_mix, range_mix, atol=1e-5)
+
+#----------------------------------------
+
+def test_parallel_bounce_same_mix(monkeypatch):
+    """
+    Le mixage hors ligne sur un pool de processus (mémoire partagée) donne le même mix qu'un seul processus.
+    La tranche minimale est abaissée, pour que le mix de 2 s soit réparti sur plusieurs processus.
+    """
+    sample_rate, num_frames = 44100, 44100 * 2
+    track_list = []
+    for track_idx in range(6):
+        track = AdikTrack(name=f"Test {track_idx + 1}", sample_rate=sample_rate, num_channels=2)
+        track.set_audio_sound(AdikSound(name="Test Sound", audio_data=np.random.uniform(-0.5, 0.5, num_frames * 2).astype(np.float32),
+                                        sample_rate=sample_rate, num_channels=2))
+        track.pan = (track_idx % 5 - 2) * 0.2
+        track_list.append(track)
+    reference_mix = AdikParallelBounce(1).render(track_list, 0, num_frames, 2)
+
+    pools = []
+    class CountingExecutor(adik_bounce.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs.get('max_workers'))
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(adik_bounce, "ProcessPoolExecutor", CountingExecutor)
+    bounce = AdikParallelBounce(2)
+    bounce.MIN_SLICE_FRAMES = 16384
+    assert len(bounce.get_slices(num_frames)) >= 2
+    mix_data = bounce.render(track_list, 0, num_frames, 2)
+    assert pools == [2]
+    assert np.allclose(mix_data, reference_mix, atol=1e-5)
+
+#----------------------------------------
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+    File: test_peaks.py
+    Tests for the waveform peak pyramid: partial updates and the sidecar file
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import os
+import numpy as np
+import soundfile as sf
+
+from adik_peaks import AdikPeaks
+from adik_sound import AdikSound
+
+#----------------------------------------
+
+def _make_sound(num_frames=44100 * 4 + 100, num_channels=2):
+    """ Son de bruit blanc dont la dernière case de chaque niveau est incomplète. """
+    audio_data = np.random.uniform(-0.5, 0.5, num_frames * num_channels).astype(np.float32)
+    return AdikSound(name="Test Peaks", audio_data=audio_data, sample_rate=44100, num_channels=num_channels)
+
+#----------------------------------------
+
+def _assert_same_peaks(peaks, expected):
+    assert peaks.num_frames == expected.num_frames
+    for level_idx in range(len(AdikPeaks.BIN_SIZES)):
+        assert np.array_equal(peaks.mins[level_idx], expected.mins[level_idx])
+        assert np.array_equal(peaks.maxs[level_idx], expected.maxs[level_idx])
+        assert np.allclose(peaks.sum_squares[level_idx], expected.sum_squares[level_idx])
+
+#----------------------------------------
+
+def test_update_range_matches_compute():
+    """ Après une écriture au milieu du son, update_range sur la zone donne la pyramide d'un calcul complet. """
+    sound = _make_sound()
+    peaks = AdikPeaks(sound).compute()
+    frames = sound.audio_data.reshape(-1, 2)
+    frames[100000:130000] = np.random.uniform(-0.9, 0.9, (30000, 2))
+    peaks.update_range(100000, 130000)
+    _assert_same_peaks(peaks, AdikPeaks(sound).compute())
+
+#----------------------------------------
+
+def test_update_range_after_length_change():
+    """ Après une suppression (son plus court) ou un ajout, la pyramide suit la nouvelle longueur. """
+    sound = _make_sound()
+    peaks = AdikPeaks(sound).compute()
+    frames = sound.audio_data.reshape(-1, 2)
+    edited_sound = AdikSound(name="Edited", audio_data=np.concatenate([frames[:50000], frames[90000:]]).reshape(-1),
+                             sample_rate=44100, num_channels=2)
+    edited_peaks = peaks.copy_for(edited_sound)
+    edited_peaks.update_range(50000, None)
+    _assert_same_peaks(edited_peaks, AdikPeaks(edited_sound).compute())
+
+    edited_sound.append_data(np.random.uniform(-0.5, 0.5, 70000 * 2).astype(np.float32))
+    edited_peaks.update_range(edited_sound.length_frames - 70000)
+    _assert_same_peaks(edited_peaks, AdikPeaks(edited_sound).compute())
+    # La pyramide d'origine n'a pas changé
+    _assert_same_peaks(peaks, AdikPeaks(sound).compute())
+
+#----------------------------------------
+
+def _write_wav(tmp_path, sound):
+    file_path = str(tmp_path / "sound.wav")
+    sf.write(file_path, sound.audio_data.reshape(-1, sound.num_channels), sound.sample_rate, subtype='FLOAT')
+    return file_path
+
+#----------------------------------------
+
+def test_sidecar_round_trip(tmp_path):
+    sound = _make_sound()
+    file_path = _write_wav(tmp_path, sound)
+    peaks = AdikPeaks(sound).compute()
+    assert peaks.save(file_path)
+    assert os.path.exists(AdikPeaks.get_sidecar_path(file_path))
+    loaded_peaks = AdikPeaks.load(file_path, sound)
+    assert loaded_peaks is not None
+    _assert_same_peaks(loaded_peaks, peaks)
+
+#----------------------------------------
+
+def test_sidecar_rejected_after_mtime_change(tmp_path):
+    sound = _make_sound()
+    file_path = _write_wav(tmp_path, sound)
+    AdikPeaks(sound).compute().save(file_path)
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert AdikPeaks.load(file_path, sound) is None
+
+#----------------------------------------
+
+def test_sidecar_rejected_after_size_change(tmp_path):
+    sound = _make_sound()
+    file_path = _write_wav(tmp_path, sound)
+    AdikPeaks(sound).compute().save(file_path)
+    stat = os.stat(file_path)
+    with open(file_path, 'ab') as f:
+        f.write(b"\0" * 16)
+    # Même date qu'à l'enregistrement: seule la taille a changé
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert AdikPeaks.load(file_path, sound) is None
+
+#----------------------------------------
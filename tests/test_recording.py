@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+    File: test_recording.py
+    End-to-end recording test without a sound card (WavFile driver)
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import time
+import numpy as np
+
+from adik_player import AdikPlayer
+from adik_sound import AdikSound
+from adik_wave_handler import AdikWaveHandler
+from wav_file_audio_driver import WavFileDriver
+from helpers import read_track
+
+#----------------------------------------
+
+def test_headless_recording(tmp_path):
+    """
+    Le pilote WavFile lit l'entrée depuis un fichier WAV au rythme des blocs, la prise est écrite sur disque,
+    puis comparée au fichier source, et la piste doit contenir toute la prise, même transport arrêté.
+    Le stream d'entrée démarre juste avant l'enregistrement: la prise peut commencer
+    quelques blocs après le début du fichier, on cherche donc ce décalage.
+    """
+    block_size, num_frames, sample_rate = 512, 22050, 44100
+    input_path = str(tmp_path / "input.wav")
+    source_data = (0.5 * np.sin(2 * np.pi * 440 * np.arange(num_frames) / sample_rate)).astype(np.float32)
+    AdikWaveHandler.save_wav(input_path, AdikSound(name="Test Input", audio_data=source_data,
+                                                   sample_rate=sample_rate, num_channels=1))
+
+    driver = WavFileDriver(sample_rate, block_size, 2, 1, output_file_path=str(tmp_path / "output.wav"),
+                           input_file_path=input_path, realtime=True)
+    player = AdikPlayer(sample_rate, block_size, 2, 1, audio_driver=driver)
+    try:
+        player.set_record_to_disk(True, str(tmp_path))
+        track = player.add_track()
+        track.set_armed(True)
+        player.select_track(0)
+        player.start_recording()
+        while driver.blocks_processed * block_size < num_frames:
+            time.sleep(0.01)
+        player.stop_recording()
+
+        recorded_sound = AdikWaveHandler.map_wav(player.transport.recording_file_path)
+        assert recorded_sound is not None
+        recorded_data = recorded_sound.audio_data
+        # Le fichier source est en PCM 16 bits: tolérance d'un pas de quantification
+        assert any(recorded_data.size >= source_data.size - skipped_frames
+                   and np.allclose(recorded_data[:source_data.size - skipped_frames], source_data[skipped_frames:], atol=1e-4)
+                   for skipped_frames in range(0, num_frames, block_size))
+
+        track_2d = read_track(track)
+        assert track.length_frames == recorded_data.size
+        for channel_idx in range(track.num_channels):
+            assert np.array_equal(track_2d[:, channel_idx], recorded_data)
+    finally:
+        player.stop()
+        player._stop_engine()
+
+#----------------------------------------
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+    File: test_renderer.py
+    Offline render checked against the realtime callback output
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+import soundfile as sf
+
+from helpers import make_noise_player, play_blocks
+
+BLOCK_SIZE = 512
+NUM_BLOCKS = 240 # ~2,8 s: plusieurs temps du métronome à 120 BPM
+
+#----------------------------------------
+
+def _make_player():
+    """ Player (pilote null) de 3 pistes de bruit, dont une muette, rendu hors ligne par petits blocs. """
+    player = make_noise_player(3, BLOCK_SIZE, NUM_BLOCKS)
+    player.track_list[1].pan = -0.5
+    player.track_list[2].set_muted(True)
+    player.metronome.update_tempo(120)
+    # Blocs de rendu plus petits que la plage, et non multiples du bloc temps réel
+    player.renderer.block_frames = 10000
+    return player
+
+#----------------------------------------
+
+def _play_realtime(player, include_click):
+    """ Joue NUM_BLOCKS blocs avec le callback de sortie depuis le début, avec ou sans métronome. """
+    metronome = player.metronome
+    metronome.stop_click()
+    if include_click:
+        metronome.start_click()
+    metronome.playback_frame = 0
+    metronome._click_playing = False
+    return play_blocks(player, NUM_BLOCKS)
+
+#----------------------------------------
+
+def test_render_matches_realtime():
+    """ render() et iter_render() donnent la même sortie que le callback temps réel (mute, pan). """
+    player = _make_player()
+    num_frames = BLOCK_SIZE * NUM_BLOCKS
+    realtime_output = _play_realtime(player, include_click=False)
+
+    rendered = player.renderer.render(0, num_frames).reshape(num_frames, 2)
+    assert np.allclose(rendered, realtime_output, atol=1e-5)
+
+    # iter_render: blocs consécutifs sur la timeline, de block_frames au plus
+    timeline_pos = 0
+    for block_start, block in player.renderer.iter_render(0, num_frames):
+        assert block_start == timeline_pos
+        assert block.shape[0] <= player.renderer.block_frames
+        assert np.allclose(block, realtime_output[block_start : block_start + block.shape[0]], atol=1e-5)
+        timeline_pos += block.shape[0]
+    assert timeline_pos == num_frames
+
+#----------------------------------------
+
+def test_export_wav_matches_realtime(tmp_path):
+    """ export_wav() écrit bloc par bloc la même sortie que le callback temps réel. """
+    player = _make_player()
+    num_frames = BLOCK_SIZE * NUM_BLOCKS
+    realtime_output = _play_realtime(player, include_click=False)
+
+    file_path = str(tmp_path / "export.wav")
+    progress = []
+    assert player.renderer.export_wav(file_path, 0, num_frames, subtype='FLOAT',
+                                      progress_callback=lambda done, total: progress.append((done, total)))
+    exported, sample_rate = sf.read(file_path, dtype='float32')
+    assert sample_rate == player.sample_rate
+    assert exported.shape == (num_frames, 2)
+    assert np.allclose(exported, realtime_output, atol=1e-5)
+    assert progress[-1] == (num_frames, num_frames)
+
+#----------------------------------------
+
+def test_render_click_matches_realtime():
+    """
+    include_click ajoute les mêmes clics que le métronome temps réel, un temps fort tous les 4 temps.
+    Le rendu place chaque clic exactement sur son temps; en temps réel, il part du début du bloc
+    au cours duquel le temps est franchi (le premier clic part de la frame 0).
+    """
+    player = _make_player()
+    num_frames = BLOCK_SIZE * NUM_BLOCKS
+    metronome = player.metronome
+    realtime_click = _play_realtime(player, include_click=True) - _play_realtime(player, include_click=False)
+    rendered_click = (player.renderer.render(0, num_frames, include_click=True)
+                      - player.renderer.render(0, num_frames)).reshape(num_frames, 2)
+
+    frames_per_beat = metronome.frames_per_beat
+    assert frames_per_beat % BLOCK_SIZE != 0
+    num_beats = -(-num_frames // frames_per_beat)
+    assert num_beats >= 5
+    click_length = metronome.strong_beat_click_data.length_frames
+    expected_click = np.zeros_like(rendered_click)
+    for beat_idx in range(num_beats):
+        click_sound = metronome.strong_beat_click_data if beat_idx % 4 == 0 else metronome.weak_beat_click_data
+        beat_frame = beat_idx * frames_per_beat
+        click_data = click_sound.audio_data.reshape(-1, 2)[:num_frames - beat_frame]
+        expected_click[beat_frame : beat_frame + click_data.shape[0]] = click_data
+        # Début du clic temps réel: bloc qui franchit le temps
+        block_start = (beat_frame - 1) // BLOCK_SIZE * BLOCK_SIZE if beat_frame > 0 else 0
+        if block_start + click_length <= num_frames:
+            assert np.allclose(realtime_click[block_start : block_start + click_length], click_data, atol=1e-5)
+    assert np.allclose(rendered_click, expected_click, atol=1e-5)
+    assert np.isclose(np.abs(rendered_click).sum(), np.abs(realtime_click).sum(), rtol=1e-3)
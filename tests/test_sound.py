@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+    File: test_sound.py
+    Tests for the memory accounting of sounds mapped from WAV files
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+import soundfile as sf
+
+from adik_chunk_storage import AdikChunkStorage
+from adik_sound import AdikSound
+from adik_wave_handler import AdikWaveHandler
+
+#----------------------------------------
+
+def _write_take(directory, num_frames=88200):
+    """ Écrit une prise mono float32, comme l'enregistrement sur disque, et retourne son chemin. """
+    file_path = str(directory / "take.wav")
+    sf.write(file_path, np.random.uniform(-0.5, 0.5, num_frames).astype(np.float32), 44100, subtype='FLOAT')
+    return file_path
+
+#----------------------------------------
+
+def test_mapped_take_uses_no_memory(tmp_path):
+    """ Une prise relue par map_wav est une vue d'un np.memmap: elle n'occupe pas de mémoire. """
+    sound = AdikWaveHandler.map_wav(_write_take(tmp_path))
+    assert sound.length_frames == 88200
+    assert AdikSound.is_file_mapped(sound.audio_data)
+    assert sound.get_memory_size() == 0
+
+#----------------------------------------
+
+def test_in_memory_sound_uses_memory():
+    """ Un son en mémoire compte toute la taille de son buffer, même vu par une tranche. """
+    audio_data = np.zeros(1000, dtype=np.float32)
+    sound = AdikSound(name="Test", audio_data=audio_data, sample_rate=44100, num_channels=1)
+    assert not AdikSound.is_file_mapped(audio_data[10:])
+    assert sound.get_memory_size() == audio_data.nbytes
+
+#----------------------------------------
+
+def test_chunked_mapped_take_uses_no_memory(tmp_path):
+    """ Les morceaux d'un stockage créé sans copie sur une prise projetée ne comptent pas. """
+    sound = AdikWaveHandler.map_wav(_write_take(tmp_path, AdikChunkStorage.CHUNK_FRAMES * 2))
+    storage = AdikChunkStorage.from_array(sound.audio_data, 1, copy=False)
+    assert len(storage.chunks) == 2
+    assert storage.nbytes == 0
+
+#----------------------------------------
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+    File: test_streaming.py
+    Correctness tests for streamed WAV playback and prefetching
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import gc
+import time
+import numpy as np
+import soundfile as sf
+
+from adik_player import AdikPlayer
+from adik_track import AdikTrack
+from adik_wave_handler import AdikWaveHandler
+
+#----------------------------------------
+
+def _write_noise_files(directory, num_files, num_frames, subtypes, num_channels=2, sample_rate=44100):
+    """ Écrit des fichiers WAV de bruit blanc et retourne leurs chemins. """
+    file_paths = []
+    for file_idx in range(num_files):
+        file_path = str(directory / f"noise_{file_idx}.wav")
+        sf.write(file_path, np.random.uniform(-0.5, 0.5, (num_frames, num_channels)).astype(np.float32),
+                 sample_rate, subtype=subtypes[file_idx % len(subtypes)])
+        file_paths.append(file_path)
+    return file_paths
+
+#----------------------------------------
+
+def test_stream_playback_matches_load(tmp_path):
+    """ Les fichiers (PCM 16 et 24 bits, float 32 bits) lus en streaming donnent les mêmes blocs que chargés en mémoire. """
+    block_size, num_blocks = 512, 100
+    file_paths = _write_noise_files(tmp_path, 3, 44100 * 2, ('PCM_16', 'PCM_24', 'FLOAT'))
+    outputs = []
+    for open_func in (AdikWaveHandler.load_wav, AdikWaveHandler.stream_wav):
+        track_list = []
+        for file_path in file_paths:
+            track = AdikTrack(name="Test", sample_rate=44100, num_channels=2)
+            track.set_audio_sound(open_func(file_path), offset_frames=block_size // 3)
+            track.volume = 0.5
+            track_list.append(track)
+        output = np.zeros((num_blocks, block_size * 2), dtype=np.float32)
+        block = np.zeros(block_size * 2, dtype=np.float32)
+        for block_idx in range(num_blocks):
+            for track in track_list:
+                output[block_idx] += track.get_audio_block(block_size, out=block)
+        outputs.append(output)
+    assert track_list[0].clips[0].sound.is_streaming
+    assert np.array_equal(outputs[0], outputs[1])
+
+#----------------------------------------
+
+def test_stream_prefetch_without_underrun(tmp_path):
+    """ Des pistes en streaming jouées en temps réel, avec une boucle et un déplacement, sans underrun du préchargement. """
+    num_frames = 44100 * 10
+    player = AdikPlayer(44100, 512, 2, 1, "null")
+    for file_path in _write_noise_files(tmp_path, 4, num_frames, ('PCM_24',)):
+        player.add_track().set_audio_sound(AdikWaveHandler.stream_wav(file_path))
+    player._update_params()
+    player.set_loop_points(0, 44100)
+
+    # Les players des tests précédents (cycles de références) ne doivent pas être libérés pendant la lecture
+    gc.collect()
+    player._start_engine()
+    try:
+        player.transport._playing = True
+        time.sleep(1.0)
+        player.set_position(num_frames // 2)
+        time.sleep(1.0)
+        player.transport._playing = False
+    finally:
+        player._stop_engine()
+    stats = player.get_prefetch_stats()
+    assert stats['chunks_loaded'] > 0
+    assert stats['underruns'] == 0
+
+#----------------------------------------
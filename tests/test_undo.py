@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+    File: test_undo.py
+    Tests for the undo/redo history of track edits and its memory budget
+    Date: Sat, 17/10/2026
+    Author: Coolbrother
+"""
+import numpy as np
+import soundfile as sf
+
+from adik_player import AdikPlayer
+from adik_sound import AdikSound
+from adik_track import AdikTrack
+from adik_wave_handler import AdikWaveHandler
+from helpers import read_track
+
+#----------------------------------------
+
+def _make_player(num_frames=20000, spill_dir=None):
+    """ Player avec une piste mono contenant une rampe, pour reconnaître chaque frame. """
+    player = AdikPlayer(44100, 512, 2, 1, "null")
+    if spill_dir is not None:
+        player.undo_manager.spill_dir = str(spill_dir)
+    track = player.add_track()
+    audio_data = np.linspace(-0.5, 0.5, num_frames, dtype=np.float32)
+    track.set_audio_sound(AdikSound(name="Ramp", audio_data=audio_data, sample_rate=44100, num_channels=1))
+    player._update_params()
+    return player, track
+
+#----------------------------------------
+
+def _arrange_take(player, track, take_sound, start_frame):
+    """ Arrange une prise sur la piste et l'enregistre dans l'historique, comme la fin d'un enregistrement. """
+    before_clips = track.get_clips()
+    track.arrange_take_sound(take_sound, start_frame, start_frame + take_sound.length_frames, AdikTrack.RECORDING_MODE_REPLACE)
+    player.undo_manager.record_clips(track, before_clips, "Prise")
+    player._update_params()
+
+#----------------------------------------
+
+def test_undo_redo_delete():
+    player, track = _make_player()
+    original_data = read_track(track)
+    player.delete_audio_from_track(0, 5000, 8000)
+    deleted_data = read_track(track)
+    assert track.length_frames == 17000
+    assert np.array_equal(deleted_data, np.concatenate([original_data[:5000], original_data[8000:]]))
+
+    assert player.undo() == "Suppression"
+    assert np.array_equal(read_track(track), original_data)
+    assert player.redo() == "Suppression"
+    assert np.array_equal(read_track(track), deleted_data)
+
+#----------------------------------------
+
+def test_undo_redo_erase():
+    player, track = _make_player()
+    original_data = read_track(track)
+    player.erase_audio_from_track(0, 5000, 8000)
+    erased_data = read_track(track)
+    assert track.length_frames == 20000
+    assert not erased_data[5000:8000].any()
+    assert np.array_equal(erased_data[8000:], original_data[8000:])
+
+    player.undo()
+    assert np.array_equal(read_track(track), original_data)
+    player.redo()
+    assert np.array_equal(read_track(track), erased_data)
+
+#----------------------------------------
+
+def test_undo_redo_bounce():
+    player, track = _make_player()
+    player.bounce_to_track()
+    assert len(player.track_list) == 2
+    bounced_track = player.track_list[1]
+    bounced_data = read_track(bounced_track)
+
+    assert player.undo() == "Mixage"
+    assert player.track_list == [track]
+    assert player.redo() == "Mixage"
+    assert player.track_list == [track, bounced_track]
+    assert np.array_equal(read_track(bounced_track), bounced_data)
+
+#----------------------------------------
+
+def test_undo_redo_arrange_take():
+    player, track = _make_player()
+    original_data = read_track(track)
+    take_data = np.full(4000, 0.25, dtype=np.float32)
+    _arrange_take(player, track, AdikSound(name="Take", audio_data=take_data, sample_rate=44100, num_channels=1), 6000)
+    taken_data = read_track(track)
+    assert np.array_equal(taken_data[6000:10000, 0], take_data)
+
+    assert player.undo() == "Prise"
+    assert np.array_equal(read_track(track), original_data)
+    assert player.redo() == "Prise"
+    assert np.array_equal(read_track(track), taken_data)
+
+#----------------------------------------
+
+def test_budget_ignores_disk_take(tmp_path):
+    """ Une prise déjà sur le disque (map_wav) ne compte pas dans le budget et n'est pas recopiée. """
+    player, track = _make_player(spill_dir=tmp_path / "undo")
+    take_path = str(tmp_path / "take.wav")
+    sf.write(take_path, np.random.uniform(-0.5, 0.5, 4000).astype(np.float32), 44100, subtype='FLOAT')
+    _arrange_take(player, track, AdikWaveHandler.map_wav(take_path), 6000)
+    undo_manager = player.undo_manager
+    undo_manager.set_memory_budget(0)
+    player.undo()
+    # La prise n'est plus gardée que par l'historique
+    summary = undo_manager.get_summary()
+    assert summary['memory_usage'] == 0
+    assert summary['spilled_sounds'] == 0
+
+#----------------------------------------
+
+def test_budget_spills_memory_take(tmp_path):
+    """ Au-delà du budget, une prise en mémoire est écrite sur le disque, et reste jouable après rétablissement. """
+    player, track = _make_player(spill_dir=tmp_path / "undo")
+    take_data = np.random.uniform(-0.5, 0.5, 4000).astype(np.float32)
+    take_sound = AdikSound(name="Take", audio_data=take_data, sample_rate=44100, num_channels=1)
+    _arrange_take(player, track, take_sound, 6000)
+    taken_data = read_track(track)
+    undo_manager = player.undo_manager
+    player.undo()
+    assert undo_manager.get_memory_usage() == take_data.nbytes
+
+    undo_manager.set_memory_budget(0)
+    summary = undo_manager.get_summary()
+    assert summary['spilled_sounds'] == 1
+    assert summary['memory_usage'] == 0
+    assert AdikSound.is_file_mapped(take_sound.audio_data)
+
+    player.redo()
+    assert np.array_equal(read_track(track), taken_data)
+    # Lecture bloc par bloc, comme le callback, depuis la projection mémoire
+    track.volume = 1.0
+    track.set_playback_position(6000)
+    block = np.zeros(512 * track.num_channels, dtype=np.float32)
+    block = track.get_audio_block(512, out=block)
+    assert np.array_equal(block.reshape(-1, track.num_channels)[:, 0], take_data[:512])
+    undo_manager.clear()
+
+#----------------------------------------